@@ -0,0 +1,66 @@
+"""Compares iterate_df with the previous transpose based version on performance frames: one frame per slot,
+a row per data type and a column per window.
+
+python -m benchmarks.iterate_df [frames] [rows]
+"""
+import sys
+import time
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+
+import api_helpers  # noqa: F401 replay_parsing can't be imported before api_helpers
+from parsing_utils.pd_helpers import iterate_df
+from replay_parsing.modules.match_splitter import WINDOWS_BASE
+
+
+def _iterate_df_transposed(df: pd.DataFrame, use_offset: bool = True, index_offset: int = 1):
+    for index, values in df.T.to_dict().items():
+        if use_offset:
+            index += index_offset
+        yield (index, values)
+
+
+def get_performance_frames(frames: int = 10, rows: int = 150) -> List[pd.DataFrame]:
+    rng = np.random.default_rng(0)
+    columns = [name for name in WINDOWS_BASE if not name.startswith('_')] + ['ltotal', 'gtotal']
+    return [pd.DataFrame(rng.random((rows, len(columns))), columns=columns,
+                         index=pd.MultiIndex.from_product([[f'interval|data {x}' for x in range(rows)], [f'_{slot}']],
+                                                          names=['data', 'slot']))
+            for slot in range(frames)]
+
+
+def _best_time(func: Callable, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmark(frames: List[pd.DataFrame]) -> List[list]:
+    output = []
+    for name, iterator in [('transpose', _iterate_df_transposed), ('itertuples', iterate_df)]:
+        def iterate_all():
+            for df in frames:
+                for _ in iterator(df, use_offset=False):
+                    pass
+
+        output.append([name, round(_best_time(iterate_all) * 1000, 2)])
+
+    baseline = output[0][1]
+    for row in output:
+        row.append(round(baseline / row[1], 1))
+    return output
+
+
+if __name__ == '__main__':
+    frames_number, rows_number = [int(x) for x in sys.argv[1:3]] if len(sys.argv) > 2 else (10, 150)
+
+    print(f'{frames_number} frames of {rows_number} rows')
+    print(tabulate(run_benchmark(get_performance_frames(frames_number, rows_number)),
+                   headers=['iterator', 'time (ms)', 'speedup'],
+                   tablefmt='psql'))
@@ -0,0 +1,70 @@
+"""Compares JSON backends on replay lines: every line decoded fully vs only the used lines (type sniffing)
+decoded with the schemas of LineDecoder.
+
+python -m benchmarks.json_decoders [replays/{match_id}/{match_id}.jsonl]
+
+A synthetic replay is generated when no path is given (see benchmarks/replay_fixture.py)
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from tabulate import tabulate
+
+import api_helpers  # noqa: F401 replay_parsing can't be imported before api_helpers
+from benchmarks.replay_fixture import generate_replay
+from replay_parsing.modules.replay_lines import EVENT_TYPES, LineDecoder, get_line_type
+from utils.json_decoder import get_available_backends, get_loads
+
+
+def _best_time(func: Callable, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmark(lines: List[bytes]) -> List[list]:
+    size_mb = sum(len(line) for line in lines) / 1024 / 1024
+    typed_lines = [(line, get_line_type(line)) for line in lines]
+    used_lines = [(line, line_type) for line, line_type in typed_lines if line_type in EVENT_TYPES]
+
+    output = []
+    for backend in get_available_backends():
+        loads = get_loads(backend)
+        decoder = LineDecoder(backend)
+
+        def decode_all():
+            for line in lines:
+                loads(line)
+
+        def decode_used():
+            for line, line_type in typed_lines:
+                if line_type in EVENT_TYPES:
+                    decoder.decode(line, line_type)
+
+        all_time = _best_time(decode_all)
+        used_time = _best_time(decode_used)
+        output.append([backend,
+                       round(all_time, 3), round(size_mb / all_time, 1),
+                       round(used_time, 3), round(len(used_lines) / used_time / 1000, 1)])
+    return output
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        replay_path = Path(sys.argv[1])
+    else:
+        replay_path = generate_replay(Path(tempfile.mkdtemp()) / 'fixture.jsonl')
+
+    with open(replay_path, 'rb') as file:
+        replay_lines = file.readlines()
+
+    print(f'{replay_path}: {len(replay_lines)} lines')
+    print(tabulate(run_benchmark(replay_lines),
+                   headers=['backend', 'all lines (s)', 'all lines (MB/s)', 'used lines (s)', 'used lines (k/s)'],
+                   tablefmt='psql'))
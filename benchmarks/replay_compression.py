@@ -0,0 +1,86 @@
+"""Compares storage formats of replays: file size, write time, read throughput (lines only) and a full scan
+with ReplayScanner.
+
+python -m benchmarks.replay_compression [replays/{match_id}/{match_id}.jsonl]
+
+A synthetic replay is generated when no path is given (see benchmarks/replay_fixture.py)
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from tabulate import tabulate
+
+import api_helpers  # noqa: F401 replay_parsing can't be imported before api_helpers
+from benchmarks.replay_fixture import generate_replay
+from replay_parsing.modules.replay_scanner import ReplayScanner
+from utils.replay_files import COMPRESSION_SUFFIXES, open_replay, zstandard
+
+
+FORMATS = [
+    ('none', 0),
+    ('gzip', 1),
+    ('gzip', 3),
+    ('gzip', 6),
+    ('zstd', 1),
+    ('zstd', 3),
+    ('zstd', 9),
+]
+
+
+def _best_time(func: Callable, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmark(replay_path: Path, folder: Path) -> List[list]:
+    with open(replay_path, 'rb') as file:
+        lines = file.readlines()
+    size_mb = sum(len(line) for line in lines) / 1024 / 1024
+
+    output = []
+    for compression, level in FORMATS:
+        if compression == 'zstd' and zstandard is None:
+            continue
+
+        path = folder / f'{compression}_{level}.jsonl{COMPRESSION_SUFFIXES[compression]}'
+
+        def write():
+            with open_replay(path, 'wb', level=level) as file:
+                for line in lines:
+                    file.write(line)
+
+        def read():
+            with open_replay(path) as file:
+                for _ in file:
+                    pass
+
+        write_time = _best_time(write, repeat=1)
+        read_time = _best_time(read)
+        scan_time = _best_time(lambda: ReplayScanner().scan_file(path), repeat=1)
+
+        file_mb = os.path.getsize(path) / 1024 / 1024
+        output.append([compression, level or '',
+                       round(file_mb, 1), round(size_mb / file_mb, 1),
+                       round(write_time, 2), round(size_mb / read_time, 1), round(scan_time, 2)])
+    return output
+
+
+if __name__ == '__main__':
+    temp_folder = Path(tempfile.mkdtemp())
+    if len(sys.argv) > 1:
+        replay_path = Path(sys.argv[1])
+    else:
+        replay_path = generate_replay(temp_folder / 'fixture.jsonl')
+
+    print(f'{replay_path}: {os.path.getsize(replay_path) / 1024 / 1024:.1f} MB')
+    print(tabulate(run_benchmark(replay_path, temp_folder),
+                   headers=['compression', 'level', 'size (MB)', 'ratio', 'write (s)', 'read (MB/s)', 'scan (s)'],
+                   tablefmt='psql'))
@@ -0,0 +1,163 @@
+"""Synthetic replay in the format of the odota parser output. It's used by the benchmarks when there is no
+parsed replay at hand: ten heroes, interval lines for every second, combat log with modifiers, damage, gold, xp,
+deaths and building kills, wards and pings.
+
+python -m benchmarks.replay_fixture replays/fixture.jsonl 48
+"""
+import json
+import random
+import sys
+from pathlib import Path
+
+HEROES = [
+    (1, 'CDOTA_Unit_Hero_AntiMage', 'npc_dota_hero_antimage'),
+    (11, 'CDOTA_Unit_Hero_Nevermore', 'npc_dota_hero_nevermore'),
+    (53, 'CDOTA_Unit_Hero_Furion', 'npc_dota_hero_furion'),
+    (80, 'CDOTA_Unit_Hero_Lone_Druid', 'npc_dota_hero_lone_druid'),
+    (5, 'CDOTA_Unit_Hero_Crystal_Maiden', 'npc_dota_hero_crystal_maiden'),
+    (2, 'CDOTA_Unit_Hero_Axe', 'npc_dota_hero_axe'),
+    (8, 'CDOTA_Unit_Hero_Juggernaut', 'npc_dota_hero_juggernaut'),
+    (69, 'CDOTA_Unit_Hero_DoomBringer', 'npc_dota_hero_doom_bringer'),
+    (86, 'CDOTA_Unit_Hero_Rubick', 'npc_dota_hero_rubick'),
+    (26, 'CDOTA_Unit_Hero_Lion', 'npc_dota_hero_lion'),
+]
+
+OTHERS = ['npc_dota_creep_badguys_melee', 'npc_dota_creep_goodguys_ranged', 'npc_dota_neutral_kobold',
+          'npc_dota_goodguys_tower1_top', 'npc_dota_badguys_tower2_mid', 'npc_dota_badguys_range_rax_bot',
+          'npc_dota_furion_treant', 'npc_dota_lone_druid_bear1', 'npc_dota_roshan', 'npc_dota_goodguys_fort']
+BUILDINGS = ['npc_dota_goodguys_tower1_top', 'npc_dota_badguys_tower1_mid', 'npc_dota_badguys_tower1_bot',
+             'npc_dota_goodguys_tower2_bot', 'npc_dota_badguys_tower2_mid', 'npc_dota_badguys_melee_rax_mid',
+             'npc_dota_badguys_range_rax_mid', 'npc_dota_goodguys_tower1_mid']
+GOLD_REASONS = [0, 1, 6, 11, 12, 13, 13, 13, 14, 14, 15, 16, 17, 19, 20, 21]
+
+
+def _dump(line: dict) -> str:
+    return json.dumps(line, separators=(',', ':'))
+
+
+def _combat_line(t: int, type_: str, src: str, tgt: str, value: int, rnd: random.Random, **kw) -> dict:
+    src_hero = src.startswith('npc_dota_hero_')
+    tgt_hero = tgt.startswith('npc_dota_hero_')
+    attacker = src
+    if src_hero and rnd.random() < 0.1:
+        attacker = 'npc_dota_furion_treant'
+        src_hero = False
+    line = {'time': t, 'type': type_, 'value': value,
+            'attackername': attacker, 'targetname': tgt, 'sourcename': src, 'targetsourcename': tgt,
+            'attackerhero': src_hero and attacker == src, 'targethero': tgt_hero,
+            'attackerillusion': rnd.random() < 0.03, 'targetillusion': rnd.random() < 0.03,
+            'inflictor': 'dota_unknown', 'gold_reason': 0, 'xp_reason': 0}
+    line.update(kw)
+    return line
+
+
+def generate_replay(path: str | Path, minutes: int = 48, seed: int = 7, density: float = 1.0) -> Path:
+    rnd = random.Random(seed)
+    end = minutes * 60
+    lines = []
+    names = [h[2] for h in HEROES]
+    all_units = names + OTHERS
+    ehandle = 1000
+    live_wards = []
+    state = {s: dict(gold=600, lh=0, xp=0, level=1, kills=0, deaths=0, assists=0, obs=0, sen=0, stacked=0,
+                     camps=0, runes=0, towers=0, rosh=0, nw=600, x=100.0, y=100.0) for s in range(10)}
+    lines.append({'time': -200, 'type': 'player_slot', 'key': '0', 'value': 0})
+    lines.append({'time': -150, 'type': 'cosmetics', 'key': '{"1":{"item_id":1}}'})
+    lines.append({'time': -150, 'type': 'dotaplus', 'key': '{}'})
+    for t in range(-120, end + 1):
+        for s, (hid, cdota, npc) in enumerate(HEROES):
+            st = state[s]
+            if t > -90:
+                st['gold'] += rnd.randint(0, 5)
+                st['xp'] += rnd.randint(0, 8)
+                st['nw'] += rnd.randint(0, 6)
+                if rnd.random() < 0.05:
+                    st['lh'] += 1
+                st['x'] += rnd.uniform(-3, 3)
+                st['y'] += rnd.uniform(-3, 3)
+                if rnd.random() < 0.003:
+                    st['level'] = min(30, st['level'] + 1)
+            line = {'time': t, 'type': 'interval', 'slot': s, 'unit': cdota}
+            if t > -110:
+                line['hero_id'] = hid
+            line.update(gold=st['gold'], lh=st['lh'], xp=st['xp'], x=round(st['x'], 2), y=round(st['y'], 2),
+                        stuns=0.0, life_state=0, level=st['level'], kills=st['kills'], deaths=st['deaths'],
+                        assists=st['assists'], denies=0, obs_placed=st['obs'], sen_placed=st['sen'],
+                        creeps_stacked=st['stacked'], camps_stacked=st['camps'], rune_pickups=st['runes'],
+                        teamfight_participation=round(rnd.random(), 3), towers_killed=st['towers'],
+                        roshans_killed=st['rosh'], networth=st['nw'])
+            lines.append(line)
+        if t <= -90:
+            continue
+
+        for _ in range(int(rnd.randint(10, 30) * density)):
+            src, tgt = rnd.choice(all_units), rnd.choice(all_units)
+            lines.append(_combat_line(t, rnd.choice(['DOTA_COMBATLOG_MODIFIER_ADD', 'DOTA_COMBATLOG_MODIFIER_REMOVE']),
+                                src, tgt, 0, rnd, inflictor='modifier_x'))
+        for _ in range(int(rnd.randint(2, 12) * density)):
+            src, tgt = rnd.choice(all_units), rnd.choice(all_units)
+            lines.append(_combat_line(t, 'DOTA_COMBATLOG_DAMAGE', src, tgt, rnd.randint(1, 300), rnd))
+        if rnd.random() < 0.4 * density:
+            s = rnd.randrange(10)
+            r = rnd.choice(GOLD_REASONS)
+            lines.append(_combat_line(t, 'DOTA_COMBATLOG_GOLD', 'dota_unknown', names[s], rnd.randint(-200, 300), rnd,
+                                gold_reason=r))
+        if rnd.random() < 0.4 * density:
+            s = rnd.randrange(10)
+            lines.append(_combat_line(t, 'DOTA_COMBATLOG_XP', 'dota_unknown', names[s], rnd.randint(1, 300), rnd,
+                                xp_reason=rnd.randint(0, 3)))
+        if rnd.random() < 0.2:
+            lines.append(_combat_line(t, 'DOTA_COMBATLOG_PURCHASE', names[rnd.randrange(10)], 'item_tango', 0, rnd))
+        if rnd.random() < 0.05:
+            lines.append({'time': t, 'type': 'pings', 'slot': rnd.randrange(10)})
+        if rnd.random() < 0.1:
+            lines.append({'time': t, 'type': 'actions', 'slot': rnd.randrange(10), 'key': '1', 'value': 1})
+        if rnd.random() < 0.01:
+            lines.append({'time': t, 'type': 'CHAT_MESSAGE_RUNE_PICKUP', 'player1': rnd.randrange(10), 'value': 1})
+        if rnd.random() < 0.012:
+            s = rnd.randrange(10)
+            wt = rnd.choice(['obs', 'sen'])
+            ehandle += 1
+            live_wards.append((ehandle, wt, s))
+            lines.append({'time': t, 'type': wt, 'slot': s, 'x': 1.0, 'y': 2.0, 'z': 3.0,
+                          'entityleft': False, 'ehandle': ehandle})
+        if live_wards and rnd.random() < 0.01:
+            eh, wt, s = live_wards.pop(rnd.randrange(len(live_wards)))
+            attacker = rnd.choice([names[s], names[rnd.randrange(10)], 'npc_dota_creep_badguys_melee'])
+            line = {'time': t, 'type': f'{wt}_left', 'x': 1.0, 'y': 2.0, 'z': 3.0, 'entityleft': True,
+                    'ehandle': eh, 'attackername': attacker}
+            if rnd.random() < 0.5:
+                line['slot'] = s
+            lines.append(line)
+        if rnd.random() < 0.006:
+            v = rnd.randrange(10)
+            k = rnd.choice([rnd.randrange(10), None])
+            src = names[k] if k is not None and k != v else 'npc_dota_creep_badguys_melee'
+            if k is not None and k != v:
+                state[k]['kills'] += 1
+            state[v]['deaths'] += 1
+            lines.append(_combat_line(t, 'DOTA_COMBATLOG_DEATH', src, names[v], 0, rnd))
+        if rnd.random() < 0.002:
+            lines.append(_combat_line(t, 'DOTA_COMBATLOG_DEATH', names[rnd.randrange(10)], 'npc_dota_lone_druid_bear1', 0,
+                                rnd, targethero=True))
+        if rnd.random() < 0.03:
+            lines.append(_combat_line(t, 'DOTA_COMBATLOG_DEATH', names[rnd.randrange(10)], 'npc_dota_creep_badguys_melee',
+                                0, rnd))
+        if t in (1300, 2100):
+            lines.append(_combat_line(t, 'DOTA_COMBATLOG_DEATH', names[rnd.randrange(10)], 'npc_dota_roshan', 0, rnd))
+        if t > 600 and t % 233 == 0 and BUILDINGS:
+            b = BUILDINGS.pop(0)
+            lines.append(_combat_line(t, 'DOTA_COMBATLOG_TEAM_BUILDING_KILL', 'dota_unknown', b,
+                                2 if 'rax' in b else 1, rnd))
+    lines.append({'time': end + 1, 'type': 'epilogue', 'key': '{"gameInfo_":{"dota_":{"matchId_":1}}}'})
+    with open(path, 'w') as file:
+        for line in lines:
+            file.write(_dump(line) + '\n')
+
+    return Path(path)
+
+
+if __name__ == '__main__':
+    generate_replay(sys.argv[1],
+                    minutes=int(sys.argv[2]) if len(sys.argv) > 2 else 48,
+                    density=float(sys.argv[3]) if len(sys.argv) > 3 else 1.0)
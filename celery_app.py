@@ -4,9 +4,11 @@ import os
 
 from celery import Celery
 from celery.schedules import crontab
-from celery.signals import after_setup_logger, after_setup_task_logger, task_prerun
+from celery.signals import after_setup_logger, after_setup_task_logger, task_prerun, worker_init
 from dotenv import load_dotenv
 
+from utils.metrics import start_metrics_server
+
 
 load_dotenv()
 
@@ -64,6 +66,11 @@ def setup_task_loggers(logger, *args, **kwargs):
     logger.addHandler(fh)
 
 
+@worker_init.connect
+def setup_metrics(*args, **kwargs):
+    start_metrics_server()
+
+
 @task_prerun.connect
 def setup_task_post_run(task, *args, **kwargs):
     logger.info(f"{task.name}|{task.request.id}|args: {args}|kwargs: {kwargs['kwargs']}")
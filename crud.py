@@ -152,7 +152,8 @@ async def get_league_header(db: AsyncSession, ) -> list:
 
 async def get_league_games(db_session: AsyncSession, league_id: int):
     league_objs = await (db_session.exec(select(Game)
-                                         .where(Game.league_id == league_id)
+                                         .where(Game.league_id == league_id,
+                                                Game.broken_replay.is_not(True))
                                          .order_by(Game.id)))
 
     return [{'value': str(league.id), 'label': league.name or str(league.id), } for league in league_objs.all()]
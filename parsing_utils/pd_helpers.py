@@ -1,3 +1,5 @@
+from typing import Any, Iterator, Tuple
+
 import pandas as pd
 from tabulate import tabulate
 
@@ -12,8 +14,11 @@ def print_table(df: pd.DataFrame) -> None:
     return None
 
 
-def iterate_df(df: pd.DataFrame, use_offset: bool = True, index_offset: int = 1) -> (int, dict):
-    for index, values in df.T.to_dict().items():
+def iterate_df(df: pd.DataFrame, use_offset: bool = True, index_offset: int = 1) -> Iterator[Tuple[Any, dict]]:
+    """(index, {column: value}) for every row. Rows are read with itertuples, the frame isn't transposed into
+    an object matrix. Values are python scalars like in DataFrame.to_dict"""
+    columns = df.columns.tolist()
+    for index, *values in df.itertuples(index=True, name=None):
         if use_offset:
             index += index_offset
-        yield (index, values)
+        yield (index, dict(zip(columns, values)))
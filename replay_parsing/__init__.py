@@ -1,6 +1,9 @@
 from .modules import (MatchAnalyser, MatchSplitter, MatchPlayersData, ODOTAPositionNormaliser, WINDOWS_BASE,
-                      TotalPerformanceAnalyser, PerformanceMaskHandler)
+                      TotalPerformanceAnalyser, PerformanceMaskHandler, HeroNameIndex,
+                      MatchWindow, PlayerInfo, validate_replay, check_replay_tail, MetricPlan, MetricSpec,
+                      MetricCube)
 from .postprocessor import postprocess_data
 from .processors import process_interval_windows, process_pings_windows, process_wards_windows, \
     process_deward_windows, process_damage_windows, process_xp_windows, process_gold_windows, \
-    process_building, process_hero_deaths, process_roshan_deaths
+    process_economy_windows, process_building, process_hero_deaths, process_roshan_deaths, get_consumed_events, \
+    run_processors
@@ -1,5 +1,11 @@
 from .match_analyser import MatchAnalyser, MatchPlayersData
+from .descriptors import MatchWindow, PlayerInfo
+from .hero_names import HeroNameIndex
 from .match_splitter import MatchSplitter, WINDOWS_BASE
+from .metric_plan import MetricPlan, MetricSpec
+from .metric_cube import MetricCube
+from .replay_scanner import MemoryBudgetException
+from .replay_validation import validate_replay, check_replay_tail
 from .total_performance_analyser import TotalPerformanceAnalyser
 from .odota_position_normaliser import ODOTAPositionNormaliser
 from .empty_performance import PerformanceMaskHandler
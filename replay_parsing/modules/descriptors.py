@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class MatchWindow:
+    """Time window of a match. Created once the game time is known and shared without copies,
+    events are matched to the windows by MatchSplitter.get_window_codes"""
+    name: str
+    window_type: str
+    index: int
+
+    start_time: Optional[int]  # first and last interval time of the window
+    end_time: Optional[int]
+
+    window_start: int
+    window_end: int
+    window_length: int
+
+    length: int
+    minutes: int
+
+    exists: bool
+    empty: Optional[bool]
+    incomplete: bool
+
+
+@dataclass(frozen=True, slots=True)
+class PlayerInfo:
+    """Player of a match slot. MatchPlayersData replaces the object on every update"""
+    slot: int
+    slot_text: str
+    side: str
+
+    hero_npc_name: Optional[str] = None
+    hero_npc_name_alias: Optional[str] = None
+    hero_name_cdota: Optional[str] = None
+    hero_id: Optional[int] = None
+
+    position: Optional[int] = None
+    position_id: Optional[int] = None
+    position_name: Optional[str] = None
+
+    player: Optional[str] = None
+    player_id: Optional[int] = None
+
+    opponents: Tuple[int, ...] = ()
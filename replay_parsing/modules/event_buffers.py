@@ -0,0 +1,237 @@
+from array import array
+from typing import Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+
+# Column kinds:
+# int - required integer field, lines without it are not stored
+# float - numeric field that can be missing in a line (NaN is used instead)
+# coordinate - float that keeps double precision in the frames, movement is computed from position differences
+# bool - flag, a missing flag is False
+# name - string that is stored as an integer code of a NameTable, NO_NAME if it's missing in a line
+# Rows of ACCUMULATED_TABLES are totals by second (see EventAccumulator), count is the number of their events
+EVENT_COLUMNS: Dict[str, Dict[str, str]] = {
+    'interval': {
+        'time': 'int',
+        'slot': 'int',
+        **{column: 'coordinate' if column in ['x', 'y'] else 'float'
+           for column in ['gold', 'lh', 'xp', 'x', 'y', 'level', 'kills', 'deaths', 'assists', 'obs_placed',
+                          'sen_placed', 'creeps_stacked', 'camps_stacked', 'rune_pickups', 'teamfight_participation',
+                          'towers_killed', 'roshans_killed', 'networth', ]},
+    },
+    'pings': {'time': 'int', 'type': 'name', 'slot': 'int', },
+    'wards': {'time': 'int', 'type': 'name', 'slot': 'int', },
+    'deward': {'time': 'int', 'type': 'name', 'slot': 'int', 'entityleft': 'bool', 'attackername': 'name', },
+    'building_kill': {'time': 'int', 'value': 'int', 'targetname': 'name', },
+    'xp': {'time': 'int', 'value': 'int', 'targetname': 'name', 'xp_reason': 'int', 'count': 'int', },
+    'gold': {'time': 'int', 'value': 'int', 'targetname': 'name', 'gold_reason': 'int', 'count': 'int', },
+    'damage': {
+        'time': 'int',
+        'value': 'int',
+        'count': 'int',
+        'attackername': 'name',
+        'targetname': 'name',
+        'sourcename': 'name',
+        'targetsourcename': 'name',
+        'inflictor': 'name',
+        'attackerhero': 'bool',
+        'targethero': 'bool',
+        'attackerillusion': 'bool',
+        'targetillusion': 'bool',
+    },
+    'roshan_deaths': {'time': 'int', 'sourcename': 'name', },
+    'hero_deaths': {'time': 'int', 'sourcename': 'name', 'targetname': 'name', },
+}
+
+# tables reduced while the replay is scanned, the processors only need the sums and the counts of the events
+ACCUMULATED_TABLES = ['xp', 'gold', 'damage']
+
+# dtypes of the frame columns by column kind. Name columns are categoricals of the match NameTable
+FRAME_DTYPES: Dict[str, Any] = {
+    'int': np.int32,
+    'float': np.float32,
+    'coordinate': np.float64,
+    'bool': np.bool_,
+}
+
+
+# code of a missing name. It's NaN in the categoricals, index arrays of name codes with an item for it at the end
+NO_NAME = -1
+
+
+class NameTable:
+    """Maps every unit/type name of the match to a small integer. The table is shared by all the buffers
+    so one name has the same code in every event table"""
+    def __init__(self, names: List[str] | None = None):
+        self._codes: Dict[str, int] = dict()
+        self.names: List[str] = []
+
+        for name in names or []:
+            self.get_code(name)
+
+
+    def get_code(self, name: str) -> int:
+        code = self._codes.get(name, None)
+        if code is None:
+            code = len(self.names)
+            self._codes[name] = code
+            self.names.append(name)
+        return code
+
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Turn codes into an object array, None for NO_NAME. Strings are shared, so it's cheap compared to
+        one str per row"""
+        return np.array(self.names + [None], dtype=object)[codes]
+
+
+    def to_categorical(self, codes: np.ndarray) -> pd.Categorical:
+        """Categorical with all the names of the table as categories, the codes are used as is (NO_NAME is NaN)"""
+        return pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(self.names))
+
+
+class EventBuffer:
+    """Columnar storage for one event type. Values are appended to typed arrays instead of keeping a dict
+    per event"""
+    def __init__(self, columns: Dict[str, str], name_table: NameTable):
+        self.columns = columns
+        self.name_table = name_table
+
+        self._required = [column for column, kind in columns.items() if kind == 'int']
+        self._data: Dict[str, Any] = dict()
+        for column, kind in columns.items():
+            if kind == 'int':
+                self._data[column] = array('q')
+            elif kind in ['float', 'coordinate']:
+                self._data[column] = array('d')
+            elif kind == 'bool':
+                self._data[column] = bytearray()
+            elif kind == 'name':
+                self._data[column] = array('i')
+            else:
+                raise ValueError(f"Unknown column kind {kind}")
+
+
+    def __len__(self) -> int:
+        return len(self._data['time'])
+
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(values) * (values.itemsize if isinstance(values, array) else 1)
+                   for values in self._data.values())
+
+
+    def append(self, p_line: Dict[str, Any]) -> None:
+        # a row is kept only with all its integer fields, the columns have to stay the same length
+        if any(p_line.get(column, None) is None for column in self._required):
+            return
+
+        for column, kind in self.columns.items():
+            values = self._data[column]
+            if kind == 'int':
+                values.append(p_line[column])
+            elif kind in ['float', 'coordinate']:
+                value = p_line.get(column, None)
+                values.append(np.nan if value is None else value)
+            elif kind == 'bool':
+                values.append(1 if p_line.get(column, False) else 0)
+            else:
+                name = p_line.get(column, None)
+                values.append(NO_NAME if name is None else self.name_table.get_code(name))
+
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Name columns are returned as codes of the name table"""
+        output = dict()
+        for column, kind in self.columns.items():
+            values = self._data[column]
+            if kind == 'int':
+                output[column] = np.frombuffer(values, dtype=np.int64)
+            elif kind in ['float', 'coordinate']:
+                output[column] = np.frombuffer(values, dtype=np.float64)
+            elif kind == 'bool':
+                output[column] = np.frombuffer(values, dtype=np.bool_)
+            else:
+                output[column] = np.frombuffer(values, dtype=np.int32)
+        return output
+
+
+    def to_frame(self) -> pd.DataFrame:
+        return arrays_to_frame(self.to_arrays(), self.columns, self.name_table)
+
+
+class EventAccumulator(EventBuffer):
+    """EventBuffer of the totals by second: events with the same time and the same values of the other columns
+    are stored as one row with the sum of their values and their count. Totals of the current second are kept
+    in a dict and stored when a line of another second comes, so a second of unordered lines (or of two replay
+    chunks) can have several rows. The sums and the counts of the rows stay the same"""
+    def __init__(self, columns: Dict[str, str], name_table: NameTable):
+        if 'count' not in columns:
+            raise ValueError("Accumulated tables need the count column")
+
+        super().__init__(columns, name_table)
+        self._keys = [column for column in columns if column not in ['value', 'count']]
+        self._has_value = 'value' in columns
+        self._time = None
+        self._totals: Dict[tuple, List[int]] = dict()  # key of the current second -> [sum, count]
+
+
+    def __len__(self) -> int:
+        return super().__len__() + len(self._totals)
+
+
+    def append(self, p_line: Dict[str, Any]) -> None:
+        if any(p_line.get(column, None) is None for column in self._required if column != 'count'):
+            return
+
+        if p_line['time'] != self._time:
+            self._store_totals()
+            self._time = p_line['time']
+
+        key = []
+        for column in self._keys:
+            kind = self.columns[column]
+            if kind == 'name':
+                name = p_line.get(column, None)
+                key.append(NO_NAME if name is None else self.name_table.get_code(name))
+            elif kind == 'bool':
+                key.append(1 if p_line.get(column, False) else 0)
+            elif kind == 'int':
+                key.append(p_line[column])
+            else:
+                value = p_line.get(column, None)
+                key.append(np.nan if value is None else value)
+        key = tuple(key)
+
+        value = p_line['value'] if self._has_value else 0
+        total = self._totals.get(key, None)
+        if total is None:
+            self._totals[key] = [value, 1]
+        else:
+            total[0] += value
+            total[1] += 1
+
+
+    def _store_totals(self) -> None:
+        for key, (value, count) in self._totals.items():
+            for column, key_value in zip(self._keys, key):
+                self._data[column].append(key_value)
+            if self._has_value:
+                self._data['value'].append(value)
+            self._data['count'].append(count)
+        self._totals.clear()
+
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        self._store_totals()
+        return super().to_arrays()
+
+
+def arrays_to_frame(arrays: Dict[str, np.ndarray], columns: Dict[str, str], name_table: NameTable) -> pd.DataFrame:
+    """Build a DataFrame from the output of EventBuffer.to_arrays (name columns as codes) with FRAME_DTYPES"""
+    return pd.DataFrame({column: name_table.to_categorical(arrays[column]) if kind == 'name'
+                         else arrays[column].astype(FRAME_DTYPES[kind], copy=False)
+                         for column, kind in columns.items()})
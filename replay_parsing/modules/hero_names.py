@@ -0,0 +1,96 @@
+import re
+from typing import Dict, List, Any, Iterable, Optional
+
+from fuzzywuzzy import fuzz
+
+from .descriptors import PlayerInfo
+
+
+# names below this ratio are not matched to a hero by the fuzzy fallback
+FUZZY_MIN_RATIO = 80
+
+HERO_NAME_PREFIX = 'npc_dota_hero_'
+
+
+def _process_name(text: str) -> str:
+    for pattern in ['npc_dota_hero_', 'CDOTA_Unit_Hero_', '_']:
+        text = re.sub(pattern, '', text)
+    return text.lower()
+
+
+class HeroNameIndex:
+    """Exact lookups of hero names from the heroes table: npc name / alias -> hero id and cdota name -> hero id.
+    Build it once per worker with from_heroes and share it between matches"""
+    def __init__(self,
+                 npc_names: Optional[Dict[str, int]] = None,
+                 cdota_names: Optional[Dict[str, int]] = None,
+                 main_names: Optional[set] = None, ):
+        self.npc_names = npc_names or dict()
+        self.cdota_names = cdota_names or dict()
+        self.main_names = main_names or set()  # npc_name of the heroes, the rest are aliases
+
+
+    @classmethod
+    def from_heroes(cls, heroes: Iterable[Any]) -> 'HeroNameIndex':
+        """:param heroes: objects with id, npc_name, npc_name_alias and cdota_name (models.Hero)"""
+        npc_names = dict()
+        cdota_names = dict()
+        main_names = set()
+        for hero in heroes:
+            for name in [hero.npc_name, hero.npc_name_alias]:
+                if name:
+                    npc_names[name] = hero.id
+            if hero.npc_name:
+                main_names.add(hero.npc_name)
+            if hero.cdota_name:
+                cdota_names[hero.cdota_name] = hero.id
+
+        return cls(npc_names=npc_names, cdota_names=cdota_names, main_names=main_names)
+
+
+    def resolve(self, players: List[PlayerInfo], names: Iterable[str]) -> Dict[str, Any]:
+        """Match npc hero names of a replay to the slots of the players.
+        Names that are not in the index are compared with the cdota names of the players: exact comparison
+        after normalisation first, fuzzy ratio as the last resort.
+
+        :return: {'slots': {name: slot}, 'exact': [...], 'normalised': [...], 'fuzzy': [...], 'unresolved': [...]}
+        """
+        slot_by_hero = dict()
+        for player in players:
+            hero_id = player.hero_id or self.cdota_names.get(player.hero_name_cdota, None)
+            if hero_id is not None:
+                slot_by_hero[hero_id] = player.slot
+
+        processed_cdota = {_process_name(player.hero_name_cdota): player.slot
+                           for player in players if player.hero_name_cdota}
+
+        output = {'slots': dict(), 'exact': [], 'normalised': [], 'fuzzy': [], 'unresolved': [], }
+        # main names go first so they are not taken for aliases
+        for name in sorted(names, key=lambda x: (x not in self.main_names, x)):
+            hero_id = self.npc_names.get(name, None)
+            if hero_id is not None:
+                # a known hero that isn't in the match (summoned illusion, spell owner, etc.)
+                if hero_id not in slot_by_hero:
+                    output['unresolved'].append(name)
+                    continue
+
+                output['slots'][name] = slot_by_hero[hero_id]
+                output['exact'].append(name)
+                continue
+
+            processed_name = _process_name(name)
+            slot = processed_cdota.get(processed_name, None)
+            if slot is not None:
+                output['slots'][name] = slot
+                output['normalised'].append(name)
+                continue
+
+            ratios = [(fuzz.ratio(cdota_name, processed_name), slot) for cdota_name, slot in processed_cdota.items()]
+            ratio, slot = max(ratios, default=(0, None))
+            if ratio >= FUZZY_MIN_RATIO:
+                output['slots'][name] = slot
+                output['fuzzy'].append(name)
+            else:
+                output['unresolved'].append(name)
+
+        return output
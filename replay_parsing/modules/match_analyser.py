@@ -1,110 +1,92 @@
-import copy
-import json
 import math
 import pathlib
-import re
-from typing import Dict, List, Any, Tuple, Optional
+from dataclasses import replace
+from typing import Dict, List, Any, Tuple, Optional, Iterator, Mapping
 
+import numpy as np
 import pandas as pd
-from fuzzywuzzy import fuzz
 
 from replay_parsing.ingame_data import POSITION_NAMES, POSITION_OPPONENTS
+from .descriptors import MatchWindow, PlayerInfo
+from .event_buffers import EVENT_COLUMNS, NameTable, arrays_to_frame
+from .hero_names import HeroNameIndex
+from .replay_cache import load_replay_cache, save_replay_cache
+from .replay_lines import LineDecoder
+from .replay_scanner import ReplayScanner, scan_replay_parallel, check_memory_budget
+from .unit_codes import CODED_NAME_COLUMNS, get_code_column_names, get_name_codes
 from utils import get_both_slot_values
+from utils.replay_files import get_compression
 
 
 # MATCH PLAYER DATA
 class MatchPlayersData:
     def __init__(self):
-        for x in range(10):
-            setattr(self, f'_{x}', {
-                'slot': x,
-                'slot_text': f'_{x}',
-                'side': 'sentinel' if x < 5 else 'dire',
-
-                'hero_npc_name': None,
-                'hero_npc_name_alias': None,
-                'hero_name_cdota': None,
-                'hero_id': None,
-
-
-                'position': None,
-                'position_id': None,
-                'position_name': None,
-
-                'player': None,
-                'player_id': None,
-
-                'opponents': [],
-
-            })
+        self._players: List[PlayerInfo] = [PlayerInfo(slot=x,
+                                                      slot_text=f'_{x}',
+                                                      side='sentinel' if x < 5 else 'dire', ) for x in range(10)]
 
 
     def update_slot_info(self, slot: int, **kwargs) -> None:
-        info = getattr(self, f'_{slot}')
-        setattr(self, f'_{slot}', {**info, **kwargs})
+        self._players[slot] = replace(self._players[slot], **kwargs)
 
 
     def update_slot_name(self, slot: int, name: str) -> None:
-        info = getattr(self, f'_{slot}')
-        if not info['hero_npc_name']:
-            info['hero_npc_name'] = name
-        elif not info['hero_npc_name_alias']:
-            info['hero_npc_name_alias'] = name
+        info = self._players[slot]
+        if not info.hero_npc_name:
+            self.update_slot_info(slot, hero_npc_name=name)
+        elif not info.hero_npc_name_alias:
+            self.update_slot_info(slot, hero_npc_name_alias=name)
         else:
             raise ValueError('Hero has too many names!')
 
-        setattr(self, f'_{slot}', info)
-
 
     def get_pos_to_slot_by_side(self) -> Dict[str, Dict[int, int]]:
-        all_players = self.get_all()
         data = {
             'sentinel': dict(),
             'dire': dict(),
         }
-        for player in all_players:
-            data[player['side']][player['position']] = player['slot']
+        for player in self._players:
+            data[player.side][player.position] = player.slot
 
         return data
 
 
     def get_name_slot_dict(self) -> Dict[str, int]:
-        items = self.get_all()
-        names = {x['hero_npc_name']: x['slot'] for x in items}
-        alias = {x['hero_npc_name_alias']: x['slot'] for x in items if x['hero_npc_name_alias']}
+        names = {x.hero_npc_name: x.slot for x in self._players}
+        alias = {x.hero_npc_name_alias: x.slot for x in self._players if x.hero_npc_name_alias}
         return {**names, **alias}
 
 
-    def get_all(self) -> List[Dict[str, Any]]:
-        return [getattr(self, f'_{x}') for x in range(10)]
+    def get_all(self) -> List[PlayerInfo]:
+        return list(self._players)
 
 
-    def get_dire(self) -> list:
-        return [getattr(self, f'_{x}') for x in range(10) if x >= 5]
+    def get_dire(self) -> List[PlayerInfo]:
+        return self._players[5:]
 
 
-    def _get_by_name(self, key_name: str, value_name: str) -> dict:
-        for item in self.get_all():
-            if item[key_name] == value_name:
+    def _get_by_name(self, key_name: str, value_name: str) -> PlayerInfo:
+        for item in self._players:
+            if getattr(item, key_name) == value_name:
                 return item
         raise KeyError
 
 
-    def get_by_cdata_name(self, name: str) -> dict:
-        return self._get_by_name('name_cdata', name)
+    def get_by_cdata_name(self, name: str) -> PlayerInfo:
+        return self._get_by_name('hero_name_cdota', name)
 
 
-    def get_by_ingame_name(self, name: str) -> dict:
-        return self._get_by_name('name_ingame', name)
+    def get_by_ingame_name(self, name: str) -> PlayerInfo:
+        return self._get_by_name('hero_npc_name', name)
 
 
     def __repr__(self):
-        return '\n'.join([str(x) for x in self.get_all()])
+        return '\n'.join([str(x) for x in self._players])
 
 
-    def __getitem__(self, slot: int) -> Dict[str, Any]:
+    def __getitem__(self, slot: int) -> PlayerInfo:
         if 0 <= slot < 10:
-            return getattr(self, f'_{slot}')
+            return self._players[slot]
         else:
             raise KeyError(f"No slot {slot}! Only ten players are in the game")
 
@@ -115,52 +97,90 @@ class MatchPlayersData:
         """
         for k, v in positions.items():
             slot_text, slot = get_both_slot_values(k)
-            player = getattr(self, slot_text)
-            player['position'] = v
-            player['position_name'] = POSITION_NAMES[v]
+            self.update_slot_info(slot, position=v, position_name=POSITION_NAMES[v])
         self._set_opponents()
 
 
     def _new_data_check(self):
-        test_player = getattr(self, '_0')
-        if test_player['position']:
+        if self._players[0].position:
             self._set_position_names()
             self._set_opponents()
 
 
     def set_player_data_from_dict(self, players_info: Dict[int, Dict[str, Any]]):
-        players = self.get_all()
-        for player in players:
-            player.update(players_info[player['slot']])
+        for player in self._players:
+            self.update_slot_info(player.slot, **players_info[player.slot])
         self._new_data_check()
 
 
     def _set_position_names(self):
-        players = self.get_all()
-        for player in players:
-            player['position_name'] = POSITION_NAMES[player['position']]
-        return
+        for player in self._players:
+            self.update_slot_info(player.slot, position_name=POSITION_NAMES[player.position])
 
 
     def set_position_from_list(self, opponents: List[int]):
-        players = self.get_all()
-        for player, pos in zip(players, opponents):
-            player['position'] = pos
-            player['position_name'] = POSITION_NAMES[pos]
+        for slot, pos in enumerate(opponents):
+            self.update_slot_info(slot, position=pos, position_name=POSITION_NAMES[pos])
         self._set_opponents()
 
 
     def _set_opponents(self):
-        players = self.get_all()
+        players = self._players
+        opponents = dict()
         for player in players:
-            player_position = player['position']
-            player_opponents_positions = POSITION_OPPONENTS[player_position]
+            player_opponents_positions = POSITION_OPPONENTS[player.position]
+            opponents[player.slot] = tuple(opponent.slot for opponent in players
+                                           if player.side != opponent.side
+                                           and opponent.position in player_opponents_positions)
+
+        for slot, slot_opponents in opponents.items():
+            self.update_slot_info(slot, opponents=self._players[slot].opponents + slot_opponents)
+
+
+def get_event_columns(events: Dict[str, List[str]]) -> Dict[str, Dict[str, str]]:
+    """Subset of EVENT_COLUMNS for the events of get_match_data. Slot and category columns are replaced by their
+    name columns. The time column and the interval table are always included, match windows are built from them.
+    Accumulated tables always have their count column"""
+    derived_columns = dict()
+    for table_name, name_columns in CODED_NAME_COLUMNS.items():
+        for name_column in name_columns:
+            for column in get_code_column_names(name_column):
+                derived_columns[(table_name, column)] = name_column
+
+    output = {'interval': {'time': 'int'}}
+    for table_name, table_columns in events.items():
+        if table_name not in EVENT_COLUMNS:
+            raise KeyError(f"Unknown event table {table_name}")
+
+        output.setdefault(table_name, {column: EVENT_COLUMNS[table_name][column] for column in ['time', 'count']
+                                       if column in EVENT_COLUMNS[table_name]})
+        for column in table_columns:
+            column = derived_columns.get((table_name, column), column)
+            if column not in EVENT_COLUMNS[table_name]:
+                raise KeyError(f"Unknown column {column} of {table_name}")
+            output[table_name][column] = EVENT_COLUMNS[table_name][column]
+    return output
 
-            for opponent in players:
-                if player['side'] == opponent['side'] or opponent['position'] not in player_opponents_positions:
-                    continue
 
-                player['opponents'].append(opponent['slot'])
+class MatchFrames(Mapping):
+    """Event frames of get_match_data. A frame is built on the first access to its table"""
+    def __init__(self, match: 'MatchAnalyser', columns: Dict[str, Dict[str, str]]):
+        self._match = match
+        self._columns = columns
+
+
+    def __getitem__(self, table_name: str) -> pd.DataFrame:
+        if table_name not in self._columns:
+            raise KeyError(f"Table {table_name} wasn't requested")
+        return self._match._get_frame(table_name, self._columns[table_name])
+
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+
+    def __len__(self) -> int:
+        return len(self._columns)
 
 
 # MATCH ANALYSER
@@ -172,23 +192,12 @@ class MatchAnalyserGameLengthException(Exception):
     pass
 
 
-def _process_name(text: str) -> str:
-    for pattern in ['npc_dota_hero_', 'CDOTA_Unit_Hero_', '_']:
-        text = re.sub(pattern, '', text)
-    return text.lower()
-
-
-def _compare_name_simple(cdota_name, npc_name) -> bool:
-    cdota_name_processed = _process_name(cdota_name)
-    npc_name_processed = _process_name(npc_name)
-    return cdota_name_processed == npc_name_processed
-
+class MatchAnalyserFeedException(Exception):
+    pass
 
-def _compare_name_complex(cdota_name, npc_name) -> int:
-    cdota_name_processed = _process_name(cdota_name)
-    npc_name_processed = _process_name(npc_name)
 
-    return fuzz.ratio(cdota_name_processed, npc_name_processed)
+class MatchAnalyserEventsException(Exception):
+    pass
 
 
 early_game_windows = [(1, 'l2', 'lane', -90, 60 * 2,),  # first 2 minutes
@@ -208,16 +217,34 @@ class MatchAnalyser:
     def __init__(self,
                  path: str | pathlib.Path,
                  windows: List[Tuple[int, int, str]] = None,
-                 match_id: Optional[int] = None, ):
+                 match_id: Optional[int] = None,
+                 use_cache: bool = True,
+                 parse_workers: int = 0,
+                 hero_names: Optional[HeroNameIndex] = None,
+                 memory_budget: Optional[int] = None, ):
         self.path = path
         self.match_id = match_id
+        self.use_cache = use_cache  # extracted data is saved next to the replay and reused by later runs
+        self.parse_workers = parse_workers  # more than one splits the replay into chunks parsed in processes
+        self.hero_names = hero_names or HeroNameIndex()
+        self.names_resolution: Dict[str, List[str]] = dict()  # npc hero names by the way they were resolved
+        # bytes of the event data. Parsing stops with MemoryBudgetException as soon as it's exceeded
+        self.memory_budget = memory_budget
+        self.memory_usage: int = 0  # bytes of the frames built so far
 
         self.players = MatchPlayersData()
-        self._fill_cdata()
-        self._fill_npc_data()
         self._game_total_length = None  # In game time aka the time the clock in the game is showing
 
         self._is_match_windows_set = False
+        self._windows: Tuple[MatchWindow, ...] = ()
+        self._name_table: Optional[NameTable] = None
+        self._hero_npc_names: List[str] = []
+        self._frames: Dict[Tuple[str, Tuple[str, ...]], pd.DataFrame] = dict()  # (table, columns) -> frame
+        self._frames_memory: Dict[Tuple[str, Tuple[str, ...]], int] = dict()
+        self._tables: Optional[Dict[str, Dict[str, np.ndarray]]] = None
+        self._columns: Dict[str, Dict[str, str]] = EVENT_COLUMNS  # tables and columns of _tables
+        self._decoder = LineDecoder()
+        self._scanner: Optional[ReplayScanner] = None  # lines that are fed while the replay is being received
 
         if not windows:
             windows = early_game_windows + late_game_windows
@@ -238,13 +265,12 @@ class MatchAnalyser:
 
                                 'exists': False,
                                 'empty': None,
-                                'incomplete': False,
-                                'df': None, } for window in windows]
+                                'incomplete': False, } for window in windows]
 
         self._windows_types = list(set([window['window_type'] for window in self._match_windows]))
 
 
-    def get_players(self) -> List[dict]:
+    def get_players(self) -> List[PlayerInfo]:
         return self.players.get_all()
 
 
@@ -252,67 +278,15 @@ class MatchAnalyser:
         return self.players
 
 
-    def _fill_cdata(self) -> None:
-        slots_added = set()
-        re_interval = re.compile(r'"interval"')
-        with open(self.path, 'r') as file:
-            for line in file.readlines():
-                if not re_interval.search(line):
-                    continue
-
-                pline = json.loads(line)
-                if pline.get("hero_id", None) and pline['slot'] not in slots_added:
-                    temp = {
-                        'hero_name_cdota': pline["unit"],
-                        'hero_id': pline['hero_id'],
-                    }
-
-                    slots_added.add(pline["slot"])
-                    self.players.update_slot_info(pline["slot"], **temp)
-
-                if len(slots_added) == 10:
-                    break
-        return None
-
-
     def _combine_names(self, names: list):
-        cdata_by_name = {x['hero_name_cdota']: x['slot'] for x in self.players.get_all()}
-        most_fitting_word = None
-
-        for npc_name in names:
-            for k_cdota_name, v_slot in cdata_by_name.items():
-                most_fitting_word = {
-                    'score': 0,
-                    'word': '',
-                    'slot': None,
-                    'found': False,
-                }
-
-                if _compare_name_simple(npc_name, k_cdota_name):
-                    self.players.update_slot_name(v_slot, npc_name)
-                    most_fitting_word['found'] = True
-                    break
-
-                ratio = _compare_name_complex(k_cdota_name, npc_name)
-                if ratio > most_fitting_word['score']:
-                    most_fitting_word['score'] = ratio
-                    most_fitting_word['word'] = npc_name
-                    most_fitting_word['slot'] = v_slot
-
-            if not most_fitting_word['found']:
-                self.players.update_slot_name(most_fitting_word['slot'], most_fitting_word['word'])
-
+        resolution = self.hero_names.resolve(self.players.get_all(), names)
+        for name, slot in resolution.pop('slots').items():
+            try:
+                self.players.update_slot_name(slot, name)
+            except ValueError:
+                resolution['unresolved'].append(name)
 
-    def _fill_npc_data(self) -> None:
-        npc_names = set()
-        re_hero_name = re.compile('"(npc_dota_hero_.*?)"')
-        with open(self.path, 'r') as file:
-            for line in file.readlines():
-                for name in re_hero_name.findall(line):
-                    npc_names.add(name)
-
-        self._combine_names(list(npc_names))
-        return None
+        self.names_resolution = resolution
 
 
     def _update_game_time_data(self,
@@ -351,9 +325,9 @@ class MatchAnalyser:
 
 
     @property
-    def match_windows(self) -> List[Dict[str, Any]]:
+    def match_windows(self) -> Tuple[MatchWindow, ...]:
         if self._is_match_windows_set:
-            return copy.deepcopy(self._match_windows)
+            return self._windows
         raise MatchAnalyserWindowsException("Match windows are not created yet!")
 
 
@@ -369,144 +343,159 @@ class MatchAnalyser:
                     break
 
 
-    def get_match_data(self) -> Dict[str, pd.DataFrame]:
-        current_window_index = None
+    def _set_match_windows(self) -> None:
+        """Freeze the windows, they don't change after the game time is known"""
+        self._windows = tuple(MatchWindow(**window) for window in self._match_windows)
+        self._is_match_windows_set = True
 
-        interval = []  # interval
-        pings = []  # pings
-        wards = []  # obs / sen / sen_left / obs_left
-        deward = []  # sen_left / obs_left
 
-        # CHAT_MESSAGE_ITEM_PURCHASE
-        # CHAT_MESSAGE_RUNE_PICKUP
-        # CHAT_MESSAGE_SCAN_USED
-        # CHAT_MESSAGE_TOWER_KILL
-        # CHAT_MESSAGE_COURIER_LOST
-        # chat_messages = []
+    def _get_cache_meta(self) -> Dict[str, Any]:
+        # npc names are resolved again on load, the heroes table may change. Match windows are built again from
+        # the interval times, the windows of the analyser may differ from the ones of the cached parse
+        hero_fields = ['hero_name_cdota', 'hero_id', ]
+        return {
+            'players': {player.slot: {x: getattr(player, x) for x in hero_fields} for player in self.players.get_all()},
+            'hero_npc_names': self._hero_npc_names,
+            'columns': self._columns,
+        }
 
-        # DOTA_COMBATLOG_DEATH
-        hero_deaths = []
 
-        roshan_deaths = []
+    def _load_cache(self, columns: Dict[str, Dict[str, str]]) -> Optional[Dict[str, Dict[str, np.ndarray]]]:
+        """Tables of the cached parse if it has all the columns"""
+        cache = load_replay_cache(self.path)
+        if cache is None:
+            return None
 
-        # DOTA_COMBATLOG_DAMAGE
-        # DOTA_COMBATLOG_GOLD
-        # DOTA_COMBATLOG_XP
-        # DOTA_COMBATLOG_PURCHASE
-        # DOTA_COMBATLOG_ITEM
-        # combat_log = []
+        meta = cache['meta']
+        for table_name, table_columns in columns.items():
+            if any(column not in meta['columns'].get(table_name, dict()) for column in table_columns):
+                return None
 
-        # DOTA_COMBATLOG_TEAM_BUILDING_KILL
-        building_kill = []
+        tables = cache['tables']
+        self._columns = meta['columns']
+        for slot, hero_info in meta['players'].items():
+            self.players.update_slot_info(int(slot), **hero_info)
 
-        # DOTA_COMBATLOG_XP
-        xp = []
+        self._name_table = NameTable(cache['names'])
+        self._hero_npc_names = meta['hero_npc_names']
+        self._combine_names(self._hero_npc_names)
+        self._set_windows_from_times(tables['interval']['time'])
+        return tables
 
-        # DOTA_COMBATLOG_DAMAGE
-        damage = []
 
-        # DOTA_COMBATLOG_GOLD
-        gold = []
+    def feed_line(self, line: bytes) -> None:
+        """Parse a replay line while the replay is still being written. finish_feed has to be called after
+        the last line"""
+        if self._tables is not None:
+            raise MatchAnalyserFeedException("Replay is already parsed!")
 
-        from_cdata = dict()
-        from_ingame = dict()
+        if self._scanner is None:
+            self._scanner = ReplayScanner(self._decoder, memory_budget=self.memory_budget)
+        self._scanner.scan_line(line)
 
-        for item in self.players.get_all():
-            from_cdata[item['hero_name_cdota']] = item
 
-            from_ingame[item['hero_npc_name']] = item
-            if item['hero_npc_name_alias']:
-                from_ingame[item['hero_npc_name_alias']] = item
+    def finish_feed(self) -> None:
+        """Apply the fed lines. The replay file has to be complete at this point if the cache is used"""
+        scanner = self._scanner or ReplayScanner(self._decoder)
+        self._scanner = None
 
-        wards_ehandle = dict()
+        self._tables = self._apply_scan_result(scanner.get_result())
+        if self.use_cache:
+            save_replay_cache(self.path, self._tables, self._name_table.names, self._get_cache_meta())
 
-        with open(self.path, 'r') as file:
-            for line in file.readlines():
-                for pattern in ['"epilogue"',  #
-                                '"dotaplus"',  # dota plus info
-                                '"cosmetics"',  # items id's
-                                '"actions"',  # button press
-                                '"DOTA_COMBATLOG_MODIFIER_ADD"',  # add buff
-                                '"DOTA_COMBATLOG_MODIFIER_REMOVE"', ]:  # remove buff
 
-                    if re.search(pattern, line, re.IGNORECASE):
-                        continue
+    def get_match_data(self, events: Optional[Dict[str, List[str]]] = None) -> MatchFrames:
+        """Event frames of the match, a frame is built when its table is accessed.
 
-                p_line = json.loads(line)
-                line_type: str = p_line['type']
-                line_time: int = p_line['time']
+        :param events: tables and columns to extract, see processors.get_consumed_events. Lines of other types
+            are not decoded. A cached parse is used if it has these columns
+        """
+        if events is not None:
+            columns = get_event_columns(events)
+        else:
+            columns = EVENT_COLUMNS
 
-                if line_time <= -90:
-                    continue
+        if self._tables is None:
+            tables = self._load_cache(columns) if self.use_cache else None
+            if tables is None:
+                tables = self._scan_replay(columns)
+                self._columns = columns
 
-                if line_type == 'interval':
-                    interval.append(p_line)
+                if self.use_cache:
+                    save_replay_cache(self.path, tables, self._name_table.names, self._get_cache_meta())
 
-                    current_window_index = self._update_game_time_data(current_window_index=current_window_index,
-                                                                       time=line_time, )
+            self._tables = tables
 
-                if line_type == 'DOTA_COMBATLOG_GOLD' and p_line['gold_reason'] == 5:
-                    break
+        for table_name, table_columns in columns.items():
+            if any(column not in self._columns.get(table_name, dict()) for column in table_columns):
+                raise MatchAnalyserEventsException(f"Table {table_name} wasn't extracted with these columns!")
 
-                elif line_type == 'pings':
-                    pings.append(p_line)
+        return MatchFrames(self, columns)
 
-                elif line_type in ['sen_left', 'obs_left', 'obs', 'sen', ]:
-                    if 'slot' not in p_line:
-                        p_line['slot'] = wards_ehandle[p_line['ehandle']]
 
-                    if line_type.endswith('_left'):
-                        deward.append({x: p_line[x] for x in ['time', 'type', 'slot', 'entityleft', 'attackername', ]})
-                    else:
-                        wards.append({x: p_line[x] for x in ['time', 'type', 'slot', ]})
+    def _get_frame(self, name: str, table_columns: Dict[str, str]) -> pd.DataFrame:
+        """Event frame with slot and category codes of the unit names (see unit_codes.CODED_NAME_COLUMNS).
+        Column dtypes follow event_buffers.FRAME_DTYPES. A frame is built on the first request of its table and
+        columns, later requests get the same frame"""
+        key = (name, tuple(table_columns))
+        if key in self._frames:
+            return self._frames[key]
 
-                    wards_ehandle[p_line['ehandle']] = p_line['slot']
+        table = self._tables[name]
+        frame = arrays_to_frame(table, table_columns, self._name_table)
+        slots, categories = self.get_unit_codes()
+        for column in CODED_NAME_COLUMNS.get(name, []):
+            if column not in table_columns:
+                continue
 
+            slot_column, category_column = get_code_column_names(column)
+            frame[slot_column] = slots[table[column]]
+            frame[category_column] = categories[table[column]]
 
-                # deprecated
-                elif line_type in ['CHAT_MESSAGE_ITEM_PURCHASE',
-                                   'CHAT_MESSAGE_RUNE_PICKUP',
-                                   'CHAT_MESSAGE_SCAN_USED',
-                                   'CHAT_MESSAGE_TOWER_KILL',
-                                   'CHAT_MESSAGE_COURIER_LOST', ]:
-                    # chat_messages.append(p_line)
-                    continue
+        self._frames[key] = frame
+        self._frames_memory[key] = int(frame.memory_usage(deep=True).sum())
+        self.memory_usage = sum(self._frames_memory.values())
+        check_memory_budget(self.memory_usage, self.memory_budget)
+        return frame
 
-                elif line_type in ['DOTA_COMBATLOG_DAMAGE', ]:
-                    damage.append(p_line)
 
-                elif line_type in ['DOTA_COMBATLOG_GOLD', ]:
-                    gold.append({x: p_line[x] for x in
-                                 ['time', 'value', 'targetname', 'gold_reason']})
+    def get_unit_codes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Slot and category of every name code of the match, see unit_codes.get_name_codes"""
+        return get_name_codes(self._name_table.names, self.players.get_name_slot_dict())
 
-                elif line_type in ['DOTA_COMBATLOG_XP', ]:
-                    xp.append({x: p_line[x] for x in
-                               ['time', 'value', 'targetname', 'xp_reason']})
 
-                elif line_type in ['DOTA_COMBATLOG_TEAM_BUILDING_KILL', ]:
-                    building_kill.append({x: p_line[x] for x in
-                                          ['time', 'value', 'targetname']})
+    def _scan_replay(self, columns: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, np.ndarray]]:
+        # compressed replays can't be split into chunks without reading them
+        if self.parse_workers > 1 and get_compression(self.path) == 'none':
+            result = scan_replay_parallel(self.path, self.parse_workers, columns, self.memory_budget)
+        else:
+            scanner = ReplayScanner(self._decoder, columns=columns, memory_budget=self.memory_budget)
+            scanner.scan_file(self.path)
+            result = scanner.get_result()
 
-                elif line_type == 'DOTA_COMBATLOG_DEATH' and p_line['targethero']:
-                    hero_deaths.append({x: p_line[x] for x in ['time', 'sourcename', 'targetname', ]})
+        return self._apply_scan_result(result)
 
-                elif line_type == 'DOTA_COMBATLOG_DEATH' and p_line['targetname'] == 'npc_dota_roshan':
-                    roshan_deaths.append({x: p_line[x] for x in ['time', 'sourcename', ]})
 
-        self._is_match_windows_set = True
-        self._set_incomplete_status()
+    def _apply_scan_result(self, result: Dict[str, Any]) -> Dict[str, Dict[str, np.ndarray]]:
+        self._name_table = result['name_table']
+        self._hero_npc_names = result['hero_npc_names']
+        tables = result['tables']
 
-        return {
-            'interval': pd.DataFrame(interval),
-            'pings': pd.DataFrame(pings),
-            'wards': pd.DataFrame(wards),
-            'deward': pd.DataFrame(deward),
-            # 'chat_messages': pd.DataFrame(chat_messages),
-            #  'combat_log': pd.DataFrame(combat_log),
-            'building_kill': pd.DataFrame(building_kill),
-            'xp': pd.DataFrame(xp),
-            'gold': pd.DataFrame(gold),
-            'damage': pd.DataFrame(damage),
-            'roshan_deaths': pd.DataFrame(roshan_deaths),
-            'hero_deaths': pd.DataFrame(hero_deaths),
-        }
+        for slot, hero_info in result['heroes'].items():
+            self.players.update_slot_info(slot, **hero_info)
+
+        self._combine_names(self._hero_npc_names)
+        self._set_windows_from_times(tables['interval']['time'])
+
+        return tables
+
+
+    def _set_windows_from_times(self, interval_times: np.ndarray) -> None:
+        """Game length and match windows from the times of the interval lines"""
+        current_window_index = None
+        for line_time in interval_times.tolist():
+            current_window_index = self._update_game_time_data(current_window_index=current_window_index,
+                                                               time=line_time, )
+
+        self._set_incomplete_status()
+        self._set_match_windows()
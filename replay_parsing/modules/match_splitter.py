@@ -1,9 +1,11 @@
-import copy
 from decimal import Decimal
-from typing import Dict, Any, Callable, List
+from typing import Dict, Any, List, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 
+from .descriptors import MatchWindow
+
 
 WINDOWS_BASE: Dict[str, int | None | Decimal] = {
     'l2': 0,
@@ -24,30 +26,25 @@ WINDOWS_BASE: Dict[str, int | None | Decimal] = {
 }
 
 
-def _copy_and_set(dict_to_copy: dict, non_existing_windows: List[str], **kwargs_to_set) -> Dict[str, Any]:
-    new_dict = copy.deepcopy(dict_to_copy)
-    for k, v in kwargs_to_set.items():
-        new_dict[k] = v
-
-    for window_name in non_existing_windows:
-        new_dict[window_name] = None
-
-    return new_dict
-
-
-def _to_str(cname: Any) -> str:
-    if isinstance(cname, str):
-        return cname
-    return '__'.join(list(cname))
-
-
 class MatchSplitter:
-    def __init__(self, game_length: int, match_windows: List, base_window: Dict[str, Any] | None = None):
+    def __init__(self,
+                 game_length: int,
+                 match_windows: Sequence[MatchWindow],
+                 base_window: Dict[str, Any] | None = None):
         """The variable _game_total_length doesn't need _offset.
         It breaks proper calculation in _calculate_time_in_window"""
         self._game_length = game_length
         self.match_windows = match_windows
 
+        # (indexes, start times, end times) of the existing windows of every type, see get_window_codes
+        self._window_bounds: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        for window_type in sorted(set(window.window_type for window in match_windows)):
+            indexes = [idx for idx, window in enumerate(match_windows)
+                       if window.window_type == window_type and window.exists]
+            self._window_bounds.append((np.array(indexes + [-1]),
+                                        np.array([match_windows[idx].start_time for idx in indexes]),
+                                        np.array([match_windows[idx].end_time for idx in indexes])))
+
         if not base_window:
             self._base_window = WINDOWS_BASE
 
@@ -59,37 +56,38 @@ class MatchSplitter:
         return self._game_length
 
 
-    def split_into_windows(self, df: pd.DataFrame, use_index: bool = False) -> List[dict]:
-        """Process interval df for only one player"""
-        windows_for_this_df = copy.deepcopy(self.match_windows)
-
-        for window in windows_for_this_df:
-            if window['exists']:
-                if use_index:
-                    time = df.index
-                else:
-                    time = df['time']
-
-                temp_df = df[(window['start_time'] < time) & (time <= window['end_time'])]
-
-                window['df']: pd.DataFrame = temp_df
-                window['is_empty'] = temp_df.empty
-
-        return windows_for_this_df
-
-
-    @staticmethod
-    def split_by_player(df: pd.DataFrame) -> list:
-        """Separate interval df by slot"""
-        return [{'name': f'_{idx}', 'df': x} for idx, x in df.groupby('slot')]
-
-
-    def create_windows(self, WINDOWS: Dict[str, Any], AN: Callable, ) -> Dict[str, Dict[str, Any]]:
-        not_existing_windows = [w['name'] for w in self.match_windows if not w['exists']]
-
-        player_data = {AN(_to_str(column_name)): _copy_and_set(dict_to_copy=self._base_window,
-                                                               non_existing_windows=not_existing_windows,
-                                                               _db_name=db_name,
-                                                               _parsing_name=_to_str(column_name), )
-                       for db_name, column_name in WINDOWS.items()}
-        return {f'_{x}': copy.deepcopy(player_data) for x in range(10)}
+    def get_window_codes(self, time: np.ndarray) -> List[np.ndarray]:
+        """Index of the match window of every time for every window type, -1 outside the windows of the type.
+        Windows of one type don't overlap: start_time < time <= end_time"""
+        output = []
+        for indexes, starts, ends in self._window_bounds:
+            position = np.searchsorted(starts, time, side='left') - 1
+            if len(starts):
+                inside = (position >= 0) & (time <= ends[position.clip(0)])
+            else:
+                inside = np.zeros(len(time), dtype=bool)
+            output.append(np.where(inside, indexes[position], -1))
+        return output
+
+
+    def assign_windows(self, df: pd.DataFrame, use_index: bool = False) -> pd.DataFrame:
+        """Rows of df with the index of their match window in the window column, so the windows are processed
+        with one groupby. Windows of different types overlap, a row is repeated for every type"""
+        time = df.index.to_numpy() if use_index else df['time'].to_numpy()
+
+        parts = []
+        for codes in self.get_window_codes(time):
+            rows = np.flatnonzero(codes >= 0)
+            parts.append(df.iloc[rows].assign(window=codes[rows]))
+        return pd.concat(parts) if parts else df.iloc[0:0].assign(window=0)
+
+
+    def get_base_values(self) -> np.ndarray:
+        """Values of the windows (window_values_names) before processing: the base window values, NaN in the match
+        windows that don't exist"""
+        window_values = {name: self._base_window[name] for name in self.window_values_names}
+        for window in self.match_windows:
+            if not window.exists:
+                window_values[window.name] = None
+
+        return np.array([np.nan if value is None else value for value in window_values.values()], dtype=np.float64)
@@ -0,0 +1,89 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .match_splitter import MatchSplitter
+
+
+def _to_str(cname: Any) -> str:
+    if isinstance(cname, str):
+        return cname
+    return '__'.join(list(cname))
+
+
+class MetricCube:
+    """(slot, metric, window) values of the window metrics of a match, NaN for the windows without a value.
+
+    Processors fill the cube of their metrics (see from_windows and fill_windows), the cubes of all the processors
+    are put together with concat. Totals and comparisons of postprocess_data are computed on the array, metrics
+    are found by their names (e.g. interval|gold__max)
+    """
+    def __init__(self,
+                 metrics: List[str],
+                 parsing_names: List[str],
+                 db_names: List[str],
+                 windows: List[str],
+                 values: np.ndarray, ):
+        self.metrics = metrics
+        self.parsing_names = parsing_names
+        self.db_names = db_names
+        self.windows = windows
+        self.values = values
+
+        self._positions = {metric: idx for idx, metric in enumerate(metrics)}
+
+
+    @classmethod
+    def from_windows(cls, MS: MatchSplitter, WINDOWS: Dict[str, Any], AN: Callable[[str], str]) -> 'MetricCube':
+        """Cube of the WINDOWS metrics (db name -> parsing name) of a processor with the base values of the windows,
+        see MatchSplitter.get_base_values"""
+        parsing_names = [_to_str(column_name) for column_name in WINDOWS.values()]
+        return cls(metrics=[AN(name) for name in parsing_names],
+                   parsing_names=parsing_names,
+                   db_names=list(WINDOWS),
+                   windows=list(MS.window_values_names),
+                   values=np.tile(MS.get_base_values(), (10, len(WINDOWS), 1)))
+
+
+    @classmethod
+    def concat(cls, *cubes: 'MetricCube') -> 'MetricCube':
+        """Cube of the metrics of all the cubes (e.g. outputs of the processors) in their order"""
+        metrics = [metric for cube in cubes for metric in cube.metrics]
+        if len(set(metrics)) != len(metrics):
+            raise ValueError("Metrics of the cubes overlap")
+        if any(cube.windows != cubes[0].windows for cube in cubes):
+            raise ValueError("Cubes have different windows")
+
+        return cls(metrics=metrics,
+                   parsing_names=[name for cube in cubes for name in cube.parsing_names],
+                   db_names=[name for cube in cubes for name in cube.db_names],
+                   windows=list(cubes[0].windows),
+                   values=np.concatenate([cube.values for cube in cubes], axis=1))
+
+
+    def get_positions(self, metrics: Sequence[str]) -> List[int]:
+        return [self._positions[metric] for metric in metrics]
+
+
+    def get_window_positions(self, windows: Sequence[str]) -> List[int]:
+        return [self.windows.index(window) for window in windows]
+
+
+    def fill_windows(self,
+                     MS: MatchSplitter,
+                     metric: str,
+                     values: np.ndarray,
+                     mask: Optional[np.ndarray] = None, ) -> None:
+        """Writes a (match window, slot) array into the windows of a metric. Only the existing windows where mask
+        is set are written, the other windows keep their values"""
+        exists = np.array([window.exists for window in MS.match_windows])[:, None]
+        windows, slots = np.nonzero(exists & (True if mask is None else mask))
+
+        positions = np.array(self.get_window_positions([window.name for window in MS.match_windows]))
+        self.values[slots, self._positions[metric], positions[windows]] = values[windows, slots]
+
+
+    @property
+    def column_to_category(self) -> Dict[str, str]:
+        """_parsing_name -> _db_name of the metrics"""
+        return dict(zip(self.parsing_names, self.db_names))
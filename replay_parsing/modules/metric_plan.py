@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .match_splitter import MatchSplitter
+from .metric_cube import MetricCube
+from .unit_codes import NO_SLOT
+
+
+REDUCERS = ['count', 'sum', 'mean']
+
+
+@dataclass(frozen=True, slots=True)
+class MetricSpec:
+    """Window metric of the players computed from one event table.
+
+    Rows of the table where the where column equals the where value are grouped by (window, slot column)
+    and reduced: count of the events, sum or mean of the value column. Per minute metrics are divided by
+    the window minutes. Only the groups with rows are written (with skip_zero - only the non zero ones),
+    the other windows keep their base values
+    """
+    name: str  # parsing name of the metric, see windows/*.py
+    table: str
+    slot: str = 'slot'
+    reducer: str = 'count'
+    value: Optional[str] = None
+    where: Optional[Tuple[str, Any]] = None  # (column, value)
+    per_minute: bool = False
+    skip_zero: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class _Pass:
+    """One grouped pass over a table: specs with the same slot and where column share the group keys"""
+    table: str
+    slot: str
+    where_column: Optional[str]
+    where_values: Tuple[Any, ...]  # values of the where column of the specs, the code of a group is the position
+    values: Tuple[str, ...]  # columns summed in the pass
+    specs: Tuple[MetricSpec, ...]
+
+
+class MetricPlan:
+    """Specs compiled into the minimum number of grouped passes: one bincount of the counts and one of every
+    summed column for each (table, slot column, where column).
+
+    :param derived_columns: table -> column -> function of the table df, columns used by the specs that
+        the event tables don't have (e.g. ward type of the ward names)
+    """
+    def __init__(self,
+                 specs: Sequence[MetricSpec],
+                 derived_columns: Optional[Dict[str, Dict[str, Callable[[pd.DataFrame], Any]]]] = None, ):
+        for spec in specs:
+            if spec.reducer not in REDUCERS:
+                raise NameError(f"Reducer {spec.reducer} of {spec.name} does not exist")
+            if spec.reducer != 'count' and spec.value is None:
+                raise ValueError(f"Metric {spec.name} has no value column to {spec.reducer}")
+
+        self.specs = list(specs)
+        self.derived_columns = derived_columns or dict()
+
+        passes: Dict[Tuple[str, str, Optional[str]], List[MetricSpec]] = dict()
+        for spec in specs:
+            passes.setdefault((spec.table, spec.slot, spec.where and spec.where[0]), []).append(spec)
+
+        self.passes = []
+        for (table, slot, where_column), pass_specs in passes.items():
+            where_values = [] if where_column is None else \
+                list(dict.fromkeys(spec.where[1] for spec in pass_specs))
+            values = list(dict.fromkeys(spec.value for spec in pass_specs if spec.value is not None))
+            self.passes.append(_Pass(table, slot, where_column, tuple(where_values), tuple(values),
+                                     tuple(pass_specs)))
+
+
+    @property
+    def tables(self) -> List[str]:
+        return list(dict.fromkeys(spec.table for spec in self.specs))
+
+
+    def _get_column(self, table: str, df: pd.DataFrame, column: str) -> np.ndarray:
+        if column in self.derived_columns.get(table, {}):
+            return np.asarray(self.derived_columns[table][column](df))
+        return df[column].to_numpy()
+
+
+    def _run_pass(self, pass_: _Pass, df: pd.DataFrame, MS: MatchSplitter) -> Dict[str, np.ndarray]:
+        """Counts and sums of the values by (window, slot, where value)"""
+        shape = (len(MS.match_windows), 10, max(len(pass_.where_values), 1))
+
+        slots = self._get_column(pass_.table, df, pass_.slot).astype(np.int64)
+        if pass_.where_column is None:
+            codes = np.zeros(len(df), dtype=np.int64)
+        else:
+            where = pd.Series(self._get_column(pass_.table, df, pass_.where_column))
+            codes = where.map({value: code for code, value in enumerate(pass_.where_values)}) \
+                .fillna(-1).to_numpy(np.int64)
+
+        rows = (slots != NO_SLOT) & (codes >= 0)
+        key = np.ravel_multi_index((df['window'].to_numpy()[rows], slots[rows], codes[rows]), shape)
+
+        # a row of an accumulated table (see event_buffers.EventAccumulator) stands for its count of events
+        weights = df['count'].to_numpy(np.float64)[rows] if 'count' in df else None
+        counts = np.bincount(key, weights=weights, minlength=np.prod(shape)).astype(np.int64)
+        output = {'': counts.reshape(shape)}
+        for column in pass_.values:
+            values = self._get_column(pass_.table, df, column)
+            sums = np.bincount(key, weights=values[rows].astype(np.float64), minlength=np.prod(shape))
+            # sums keep integer values integer like the groupby sums
+            is_integer = values.dtype.kind in 'biu'
+            output[column] = sums.reshape(shape).astype(np.int64) if is_integer else sums.reshape(shape)
+        return output
+
+
+    def execute(self,
+                tables: Dict[str, pd.DataFrame],
+                MS: MatchSplitter,
+                cube: MetricCube,
+                AN: Callable[[str], str], ) -> MetricCube:
+        """Fills the windows of the cube (see MetricCube.from_windows) with the metrics of the event tables"""
+        minutes = np.array([window.minutes if window.exists else np.nan for window in MS.match_windows])
+        assigned = {table: MS.assign_windows(tables[table]) for table in self.tables}
+
+        for pass_ in self.passes:
+            totals = self._run_pass(pass_, assigned[pass_.table], MS)
+            for spec in pass_.specs:
+                code = pass_.where_values.index(spec.where[1]) if spec.where else 0
+                counts = totals[''][..., code]
+
+                if spec.reducer == 'count':
+                    values = counts
+                elif spec.reducer == 'sum':
+                    values = totals[spec.value][..., code]
+                else:
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        values = totals[spec.value][..., code] / counts
+
+                mask = counts > 0
+                if spec.skip_zero:
+                    mask &= values != 0
+                if spec.per_minute:
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        values = values / minutes[:, None]
+
+                cube.fill_windows(MS, AN(spec.name), values, mask)
+
+        return cube
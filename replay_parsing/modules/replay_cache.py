@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+import zipfile
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+
+# Bump it every time the extraction changes (new columns, different filtering, etc.)
+# so the old caches are parsed again
+PARSER_VERSION = 5
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def get_cache_path(replay_path: str | Path) -> Path:
+    """{match_id}.parsed.npz for {match_id}.jsonl and the compressed {match_id}.jsonl.gz / .zst"""
+    replay_path = Path(replay_path)
+    return replay_path.with_name(f"{replay_path.name.split('.')[0]}.parsed.npz")
+
+
+def get_source_key(replay_path: str | Path) -> Dict[str, Any]:
+    """Size and mtime of the replay plus a hash of its first and last megabyte.
+    Hashing the whole file would cost as much as reading it"""
+    stat = os.stat(replay_path)
+    file_hash = hashlib.blake2b(digest_size=16)
+    with open(replay_path, 'rb') as file:
+        file_hash.update(file.read(HASH_CHUNK_SIZE))
+        if stat.st_size > HASH_CHUNK_SIZE:
+            file.seek(max(stat.st_size - HASH_CHUNK_SIZE, HASH_CHUNK_SIZE))
+            file_hash.update(file.read())
+
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'hash': file_hash.hexdigest(),
+        'parser_version': PARSER_VERSION,
+    }
+
+
+def save_replay_cache(replay_path: str | Path,
+                      tables: Dict[str, Dict[str, np.ndarray]],
+                      names: List[str],
+                      meta: Dict[str, Any], ) -> Path:
+    """Save extracted event tables (name columns as codes), the name table and json-serializable match info.
+    The file is written next to the replay and replaced atomically"""
+    cache_path = get_cache_path(replay_path)
+    temp_path = cache_path.with_name(f'{cache_path.stem}.tmp.npz')
+
+    arrays = {f'{table_name}/{column}': values
+              for table_name, table in tables.items() for column, values in table.items()}
+
+    np.savez(temp_path,
+             __key__=np.array(json.dumps(get_source_key(replay_path))),
+             __meta__=np.array(json.dumps(meta)),
+             __names__=np.array(names, dtype=str),
+             **arrays)
+    os.replace(temp_path, cache_path)
+    return cache_path
+
+
+def load_replay_cache(replay_path: str | Path) -> Optional[Dict[str, Any]]:
+    """Returns tables, names and meta saved by save_replay_cache.
+    None is returned if there is no cache or it was made for another file or parser version"""
+    cache_path = get_cache_path(replay_path)
+    if not cache_path.is_file():
+        return None
+
+    try:
+        with np.load(cache_path, allow_pickle=False) as cache:
+            if json.loads(str(cache['__key__'])) != get_source_key(replay_path):
+                return None
+
+            tables = dict()
+            for key in cache.files:
+                if key.startswith('__'):
+                    continue
+                table_name, column = key.split('/')
+                tables.setdefault(table_name, dict())[column] = cache[key]
+
+            return {
+                'tables': tables,
+                'names': cache['__names__'].tolist(),
+                'meta': json.loads(str(cache['__meta__'])),
+            }
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
@@ -0,0 +1,145 @@
+from typing import Optional, Dict, Any, TypedDict
+
+from utils.json_decoder import JSON_BACKEND, get_backend, get_loads, msgspec
+
+
+# Line types that are used by the processors. Everything else (modifiers, cosmetics, actions, etc.) is skipped
+# before decoding. Modifier add/remove lines alone are more than half of a combat log
+EVENT_TYPES = frozenset([
+    b'interval',
+    b'pings',
+    b'obs',
+    b'sen',
+    b'obs_left',
+    b'sen_left',
+    b'DOTA_COMBATLOG_DAMAGE',
+    b'DOTA_COMBATLOG_GOLD',
+    b'DOTA_COMBATLOG_XP',
+    b'DOTA_COMBATLOG_TEAM_BUILDING_KILL',
+    b'DOTA_COMBATLOG_DEATH',
+])
+
+TYPE_KEY = b'"type":'
+
+
+def get_line_type(line: bytes) -> Optional[bytes]:
+    """Get the value of the "type" key from a raw replay line without decoding it.
+    The parser writes "type" as one of the first keys so the search stops early.
+    Nested objects (cosmetics, epilogue) are escaped strings so they can't match the key"""
+    key_index = line.find(TYPE_KEY)
+    if key_index == -1:
+        return None
+
+    value_start = line.find(b'"', key_index + len(TYPE_KEY))
+    if value_start == -1:
+        return None
+
+    value_end = line.find(b'"', value_start + 1)
+    if value_end == -1:
+        return None
+
+    return line[value_start + 1:value_end]
+
+
+# Schemas of the used line types. With msgspec only these fields are decoded and everything else in a line
+# is skipped. Other backends decode full lines
+class IntervalLine(TypedDict, total=False):
+    time: int
+    type: str
+    slot: int
+    unit: str
+    hero_id: int
+
+    gold: float
+    lh: float
+    xp: float
+    x: float
+    y: float
+    level: float
+    kills: float
+    deaths: float
+    assists: float
+    obs_placed: float
+    sen_placed: float
+    creeps_stacked: float
+    camps_stacked: float
+    rune_pickups: float
+    teamfight_participation: float
+    towers_killed: float
+    roshans_killed: float
+    networth: float
+
+
+class PingsLine(TypedDict, total=False):
+    time: int
+    type: str
+    slot: int
+
+
+class WardLine(TypedDict, total=False):
+    time: int
+    type: str
+    slot: int
+    ehandle: int
+    entityleft: bool
+    attackername: str
+
+
+class CombatLogLine(TypedDict, total=False):
+    time: int
+    type: str
+    value: int
+
+    attackername: str
+    targetname: str
+    sourcename: str
+    targetsourcename: str
+    inflictor: str
+
+    attackerhero: bool
+    targethero: bool
+    attackerillusion: bool
+    targetillusion: bool
+
+    gold_reason: int
+    xp_reason: int
+
+
+EVENT_SCHEMAS: Dict[bytes, type] = {
+    b'interval': IntervalLine,
+    b'pings': PingsLine,
+    b'obs': WardLine,
+    b'sen': WardLine,
+    b'obs_left': WardLine,
+    b'sen_left': WardLine,
+    b'DOTA_COMBATLOG_DAMAGE': CombatLogLine,
+    b'DOTA_COMBATLOG_GOLD': CombatLogLine,
+    b'DOTA_COMBATLOG_XP': CombatLogLine,
+    b'DOTA_COMBATLOG_TEAM_BUILDING_KILL': CombatLogLine,
+    b'DOTA_COMBATLOG_DEATH': CombatLogLine,
+}
+
+
+class LineDecoder:
+    """Decodes replay lines with the configured JSON backend (see utils.json_decoder).
+    Lines of known types are decoded with their schema when msgspec is used. If a line doesn't fit its schema
+    it's decoded fully so the output is the same as with the stdlib decoder"""
+    def __init__(self, backend: str = JSON_BACKEND):
+        self.backend = get_backend(backend)
+        self._loads = get_loads(self.backend)
+
+        self._schema_decoders = dict()
+        if self.backend == 'msgspec':
+            decoders = {schema: msgspec.json.Decoder(schema) for schema in set(EVENT_SCHEMAS.values())}
+            self._schema_decoders = {line_type: decoders[schema] for line_type, schema in EVENT_SCHEMAS.items()}
+
+
+    def decode(self, line: bytes, line_type: Optional[bytes] = None) -> Dict[str, Any]:
+        schema_decoder = self._schema_decoders.get(line_type, None)
+        if schema_decoder is not None:
+            try:
+                return schema_decoder.decode(line)
+            except msgspec.ValidationError:
+                pass
+
+        return self._loads(line)
@@ -0,0 +1,365 @@
+import mmap
+import os
+import pathlib
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Any, Tuple, Optional
+
+import numpy as np
+
+from utils.replay_files import open_replay
+from .event_buffers import EVENT_COLUMNS, NO_NAME, ACCUMULATED_TABLES, EventBuffer, EventAccumulator, NameTable
+from .hero_names import HERO_NAME_PREFIX
+from .replay_lines import EVENT_TYPES, LineDecoder, get_line_type
+
+
+WARD_TYPES = ['sen_left', 'obs_left', 'obs', 'sen', ]
+
+# line types of the event tables. Slots of deward lines can come from ward lines, so both tables need all of them
+TABLE_LINE_TYPES: Dict[str, List[bytes]] = {
+    'interval': [b'interval'],
+    'pings': [b'pings'],
+    'wards': [b'obs', b'sen', b'obs_left', b'sen_left'],
+    'deward': [b'obs', b'sen', b'obs_left', b'sen_left'],
+    'building_kill': [b'DOTA_COMBATLOG_TEAM_BUILDING_KILL'],
+    'xp': [b'DOTA_COMBATLOG_XP'],
+    'gold': [b'DOTA_COMBATLOG_GOLD'],
+    'damage': [b'DOTA_COMBATLOG_DAMAGE'],
+    'roshan_deaths': [b'DOTA_COMBATLOG_DEATH'],
+    'hero_deaths': [b'DOTA_COMBATLOG_DEATH'],
+}
+
+# interval lines have hero data and the gold_reason 5 line ends the game, so they are decoded for any tables
+ALWAYS_DECODED_TYPES = frozenset([b'interval', b'DOTA_COMBATLOG_GOLD'])
+
+# npc hero names are matched to the slots. A full parse has them in the name table, lines of the other tables
+# with unit names are searched for them without decoding, so the players are resolved the same way whatever
+# tables are extracted
+HERO_NAME_LINE_TYPES = frozenset(line_type for name, line_types in TABLE_LINE_TYPES.items()
+                                 if 'name' in EVENT_COLUMNS[name].values() for line_type in line_types)
+RE_HERO_NAME = re.compile(rb'"(' + HERO_NAME_PREFIX.encode() + rb'[^"]*)"')
+
+# slot of a ward line that can only be resolved with the ehandles of the previous chunks
+UNKNOWN_SLOT = -1
+
+# decoded lines between the checks of the memory budget
+MEMORY_CHECK_LINES = 50_000
+
+
+class MemoryBudgetException(Exception):
+    pass
+
+
+class ReplayScanner:
+    """Extracts events of a replay line by line: hero data from the interval lines, npc hero names and the events
+    used by the processors. Events after the gold_reason 5 line are not collected.
+
+    Only the tables and columns of columns (a subset of EVENT_COLUMNS) are collected, lines of other types
+    are not decoded. ACCUMULATED_TABLES are summed by second while they are scanned, see EventAccumulator.
+    Damage is kept only if it's dealt or received by a hero (sourcename or targetsourcename).
+
+    With resolve_wards_later the scanner can start in the middle of a replay (see scan_replay_parallel).
+    Ward lines without a slot whose ehandle wasn't seen get UNKNOWN_SLOT and are listed in unresolved_wards.
+
+    MemoryBudgetException is raised as soon as the buffers take more than memory_budget bytes
+    """
+    def __init__(self,
+                 decoder: Optional[LineDecoder] = None,
+                 resolve_wards_later: bool = False,
+                 columns: Optional[Dict[str, Dict[str, str]]] = None,
+                 memory_budget: Optional[int] = None, ):
+        self._decoder = decoder or LineDecoder()
+        self._resolve_wards_later = resolve_wards_later
+        self._memory_budget = memory_budget
+        self._decoded_lines = 0
+
+        columns = columns or EVENT_COLUMNS
+        self._line_types = EVENT_TYPES.intersection(
+            ALWAYS_DECODED_TYPES.union(*[TABLE_LINE_TYPES[name] for name in columns]))
+
+        self._hero_name_types = HERO_NAME_LINE_TYPES.difference(*[TABLE_LINE_TYPES[name] for name in columns])
+
+        # all the names of the match share the same table of codes
+        self.name_table = NameTable()
+        self.buffers = {name: get_buffer(name, table_columns, self.name_table)
+                        for name, table_columns in columns.items()}
+
+        self.heroes: Dict[int, Dict[str, Any]] = dict()  # slot -> first hero data of the slot
+        self.hero_npc_names: Dict[bytes, None] = dict()  # of the lines of the tables that are not collected
+        self.wards_ehandle: Dict[int, int] = dict()
+        self.unresolved_wards: List[Tuple[str, int, int]] = []  # (table, row, ehandle)
+        self.collect_events = True
+
+
+    def _fill_cdata(self, p_line: Dict[str, Any]) -> None:
+        if p_line.get("hero_id", None) and p_line['slot'] not in self.heroes:
+            self.heroes[p_line['slot']] = {
+                'hero_name_cdota': p_line["unit"],
+                'hero_id': p_line['hero_id'],
+            }
+
+
+    def scan_line(self, line: bytes) -> None:
+        # only lines of used types are decoded. The type is unknown only for malformed lines
+        raw_type = get_line_type(line)
+        if raw_type in self._hero_name_types and self.collect_events and b'npc_dota_hero_' in line:
+            self.hero_npc_names.update(dict.fromkeys(RE_HERO_NAME.findall(line)))
+
+        if raw_type is not None and raw_type not in self._line_types:
+            return
+
+        if not self.collect_events:
+            if len(self.heroes) < 10 and raw_type == b'interval':
+                self._fill_cdata(self._decoder.decode(line, raw_type))
+            return
+
+        p_line = self._decoder.decode(line, raw_type)
+        line_type: str = p_line['type']
+
+        self._decoded_lines += 1
+        if self._memory_budget and self._decoded_lines % MEMORY_CHECK_LINES == 0:
+            check_memory_budget(self.nbytes, self._memory_budget)
+        line_time: int = p_line['time']
+
+        if line_type == 'interval' and len(self.heroes) < 10:
+            self._fill_cdata(p_line)
+
+        if line_time <= -90:
+            return
+
+        if line_type == 'interval':
+            self._append('interval', p_line)
+
+        elif line_type == 'DOTA_COMBATLOG_GOLD' and p_line['gold_reason'] == 5:
+            self.collect_events = False
+
+        elif line_type == 'pings':
+            self._append('pings', p_line)
+
+        elif line_type in WARD_TYPES:
+            self._add_ward(p_line)
+
+        elif line_type == 'DOTA_COMBATLOG_DAMAGE':
+            self._add_damage(p_line)
+
+        elif line_type == 'DOTA_COMBATLOG_GOLD':
+            self._append('gold', p_line)
+
+        elif line_type == 'DOTA_COMBATLOG_XP':
+            self._append('xp', p_line)
+
+        elif line_type == 'DOTA_COMBATLOG_TEAM_BUILDING_KILL':
+            self._append('building_kill', p_line)
+
+        elif line_type == 'DOTA_COMBATLOG_DEATH' and p_line['targethero']:
+            self._append('hero_deaths', p_line)
+
+        elif line_type == 'DOTA_COMBATLOG_DEATH' and p_line['targetname'] == 'npc_dota_roshan':
+            self._append('roshan_deaths', p_line)
+
+
+    def _append(self, table: str, p_line: Dict[str, Any]) -> None:
+        buffer = self.buffers.get(table, None)
+        if buffer is not None:
+            buffer.append(p_line)
+
+
+    def _add_damage(self, p_line: Dict[str, Any]) -> None:
+        # only the names of the heroes get slots, damage between the other units isn't used by the processors
+        if (p_line.get('sourcename', None) or '').startswith(HERO_NAME_PREFIX) or \
+                (p_line.get('targetsourcename', None) or '').startswith(HERO_NAME_PREFIX):
+            self._append('damage', p_line)
+            return
+
+        for column in ['attackername', 'targetname']:
+            name = p_line.get(column, None)
+            if name and name.startswith(HERO_NAME_PREFIX):
+                self.hero_npc_names[name.encode()] = None
+
+
+    def _add_ward(self, p_line: Dict[str, Any]) -> None:
+        table = 'deward' if p_line['type'].endswith('_left') else 'wards'
+        buffer = self.buffers.get(table, None)
+        ehandle = p_line['ehandle']
+
+        if 'slot' not in p_line:
+            if not self._resolve_wards_later:
+                p_line['slot'] = self.wards_ehandle[ehandle]
+            else:
+                p_line['slot'] = self.wards_ehandle.get(ehandle, UNKNOWN_SLOT)
+                if p_line['slot'] == UNKNOWN_SLOT and buffer is not None:
+                    self.unresolved_wards.append((table, len(buffer), ehandle))
+
+        if buffer is not None:
+            buffer.append(p_line)
+        self.wards_ehandle[ehandle] = p_line['slot']
+
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in self.buffers.values())
+
+
+    def scan_file(self, path: str | pathlib.Path) -> None:
+        with open_replay(path) as file:
+            for line in file:
+                self.scan_line(line)
+
+
+    def scan_range(self, path: str | pathlib.Path, start: int, end: int) -> None:
+        """Scan the lines in [start, end) bytes of a file. Both ends have to be line boundaries"""
+        with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as replay:
+            position = start
+            while position < end:
+                line_end = replay.find(b'\n', position, end)
+                line_end = end if line_end == -1 else line_end + 1
+                self.scan_line(replay[position:line_end])
+                position = line_end
+
+
+    def get_result(self) -> Dict[str, Any]:
+        return {
+            'tables': {name: buffer.to_arrays() for name, buffer in self.buffers.items()},
+            'name_table': self.name_table,
+            'heroes': self.heroes,
+            'hero_npc_names': get_hero_npc_names(self.name_table, self.hero_npc_names),
+        }
+
+
+def get_buffer(table: str, columns: Dict[str, str], name_table: NameTable) -> EventBuffer:
+    if table in ACCUMULATED_TABLES:
+        return EventAccumulator(columns, name_table)
+    return EventBuffer(columns, name_table)
+
+
+def get_hero_npc_names(name_table: NameTable, found_names: Iterable[bytes]) -> List[str]:
+    """npc hero names of the name table and the names found in the lines that are not decoded"""
+    names = [name for name in name_table.names if name.startswith(HERO_NAME_PREFIX)]
+    return list(dict.fromkeys(names + [name.decode() for name in found_names]))
+
+
+def check_memory_budget(nbytes: int, memory_budget: Optional[int]) -> None:
+    if memory_budget and nbytes > memory_budget:
+        raise MemoryBudgetException(f"Replay events take {nbytes / 2 ** 20:.1f} MB, "
+                                    f"the budget is {memory_budget / 2 ** 20:.1f} MB")
+
+
+def split_replay(path: str | pathlib.Path, parts: int) -> List[Tuple[int, int]]:
+    """Split a file into byte ranges of about the same size. Every range ends after a newline"""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    ranges = []
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as replay:
+        start = 0
+        for part in range(1, parts + 1):
+            if start >= size:
+                break
+
+            end = size if part == parts else replay.find(b'\n', max(size * part // parts, start)) + 1
+            if end <= 0:
+                end = size
+
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _scan_chunk(path: str | pathlib.Path,
+                start: int,
+                end: int,
+                columns: Optional[Dict[str, Dict[str, str]]] = None,
+                memory_budget: Optional[int] = None, ) -> Dict[str, Any]:
+    scanner = ReplayScanner(resolve_wards_later=True, columns=columns, memory_budget=memory_budget)
+    scanner.scan_range(path, start, end)
+
+    return {
+        'tables': {name: buffer.to_arrays() for name, buffer in scanner.buffers.items()},
+        'names': scanner.name_table.names,
+        'heroes': scanner.heroes,
+        'hero_npc_names': list(scanner.hero_npc_names),
+        'wards_ehandle': scanner.wards_ehandle,
+        'unresolved_wards': scanner.unresolved_wards,
+        'stopped': not scanner.collect_events,
+    }
+
+
+def merge_chunks(chunks: List[Dict[str, Any]],
+                 columns: Optional[Dict[str, Dict[str, str]]] = None, ) -> Dict[str, Any]:
+    """Combine the output of _scan_chunk calls (in file order) into the result of ReplayScanner.get_result.
+    Events of the chunks after the gold_reason 5 line are dropped, but hero data is still used"""
+    columns = columns or EVENT_COLUMNS
+    name_table = NameTable()
+    heroes = dict()
+    hero_npc_names = dict()
+    wards_ehandle = dict()
+    tables_parts = {name: [] for name in columns}
+
+    collect_events = True
+    for chunk in chunks:
+        for slot, hero_info in chunk['heroes'].items():
+            heroes.setdefault(slot, hero_info)
+
+        if not collect_events:
+            continue
+
+        hero_npc_names.update(dict.fromkeys(chunk['hero_npc_names']))
+
+        codes = np.array([name_table.get_code(name) for name in chunk['names']] + [NO_NAME], dtype=np.int32)
+        tables = dict()
+        for table_name, table_columns in columns.items():
+            table = dict(chunk['tables'][table_name])
+            for column, kind in table_columns.items():
+                if kind == 'name':
+                    table[column] = codes[table[column]]
+            tables[table_name] = table
+
+        # ward lines without a slot take it from the last ward with the same ehandle
+        for table_name, row, ehandle in chunk['unresolved_wards']:
+            slots = tables[table_name]['slot'] = tables[table_name]['slot'].copy()
+            slots[row] = wards_ehandle[ehandle]
+
+        for ehandle, slot in chunk['wards_ehandle'].items():
+            if slot != UNKNOWN_SLOT:
+                wards_ehandle[ehandle] = slot
+
+        for table_name, table in tables.items():
+            tables_parts[table_name].append(table)
+
+        collect_events = not chunk['stopped']
+
+    output_tables = dict()
+    for table_name, table_columns in columns.items():
+        parts = tables_parts[table_name]
+        if not parts:
+            output_tables[table_name] = get_buffer(table_name, table_columns, name_table).to_arrays()
+            continue
+
+        output_tables[table_name] = {column: np.concatenate([part[column] for part in parts])
+                                     for column in table_columns}
+
+    return {
+        'tables': output_tables,
+        'name_table': name_table,
+        'heroes': heroes,
+        'hero_npc_names': get_hero_npc_names(name_table, hero_npc_names),
+    }
+
+
+def scan_replay_parallel(path: str | pathlib.Path,
+                         workers: int,
+                         columns: Optional[Dict[str, Dict[str, str]]] = None,
+                         memory_budget: Optional[int] = None, ) -> Dict[str, Any]:
+    """Scan byte ranges of a replay in worker processes and merge them.
+    Processes can't be started from a daemonic process (celery prefork pool), gevent and solo pools are fine.
+    Every chunk is checked against the whole memory budget, the merged tables are checked again"""
+    ranges = split_replay(path, workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = list(executor.map(_scan_chunk, [path] * len(ranges), *zip(*ranges), [columns] * len(ranges),
+                                   [memory_budget] * len(ranges)))
+
+    result = merge_chunks(chunks, columns)
+    check_memory_budget(sum(array.nbytes for table in result['tables'].values() for array in table.values()),
+                        memory_budget)
+    return result
@@ -0,0 +1,85 @@
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from utils.replay_files import REPLAY_READ_ERRORS, read_replay_tail
+from .match_analyser import MatchAnalyser
+from .replay_lines import get_line_type
+
+
+# events of the checks: interval lines give the hero data and the windows, gold lines are decoded anyway.
+# Both are a small part of a replay, damage lines are not decoded without other events
+VALIDATION_EVENTS = {
+    'interval': ['time', 'slot'],
+    'gold': ['time', 'targetname'],
+}
+
+# share of the interval seconds every slot must have
+MIN_INTERVAL_COVERAGE = 0.9
+
+
+def check_replay_tail(path: str | Path) -> List[str]:
+    """A complete replay ends with the epilogue line. Only the tail of the file is read"""
+    try:
+        tail = read_replay_tail(path)
+    except REPLAY_READ_ERRORS as e:
+        return [f"Replay can't be read: {repr(e)}"]
+
+    last_line = tail.rstrip(b'\n').rsplit(b'\n', 1)[-1]
+    if get_line_type(last_line) != b'epilogue':
+        return ["Replay doesn't end with the epilogue line"]
+    return []
+
+
+def _check_intervals(interval: pd.DataFrame) -> List[str]:
+    seconds = interval['time'].nunique()
+    if not seconds:
+        return ["Replay has no interval lines"]
+
+    problems = []
+    slot_seconds = interval.groupby('slot')['time'].nunique().to_dict()
+    for slot in range(10):
+        coverage = slot_seconds.get(slot, 0) / seconds
+        if coverage < MIN_INTERVAL_COVERAGE:
+            problems.append(f"Interval lines of slot {slot} cover {coverage:.0%} of the game")
+    return problems
+
+
+def _check_heroes(match: MatchAnalyser) -> List[str]:
+    return [f"Hero of slot {player.slot} ({player.hero_name_cdota}) has no npc name in the replay"
+            for player in match.get_players() if not player.hero_npc_name]
+
+
+def _check_windows(match: MatchAnalyser) -> List[str]:
+    # windows are filled one after another, so nothing is processed without the first one
+    window = match.match_windows[0]
+    return [] if window.exists else [f"Window {window.name} doesn't exist"]
+
+
+def validate_replay(match: MatchAnalyser,
+                    events: Optional[Dict[str, List[str]]] = None,
+                    check_tail: bool = True, ) -> List[str]:
+    """Problems that make processing of a replay pointless, an empty list for a valid replay.
+
+    The replay is checked before any data of the game is written: the last line, interval lines of all the slots,
+    npc names of the heroes and the first window. VALIDATION_EVENTS and the events are extracted. With
+    match.use_cache the parse is saved to the replay cache, so processing of these events loads it instead of
+    reading the replay again (a cached parse, e.g. of tasks.download_replay.parse_replay, is loaded here too).
+
+    :param check_tail: False if check_replay_tail was already called for the replay
+    """
+    if check_tail:
+        problems = check_replay_tail(match.path)
+        if problems:
+            return problems
+
+    events = events or dict()
+    events = {table: list(dict.fromkeys(VALIDATION_EVENTS.get(table, []) + events.get(table, [])))
+              for table in {**VALIDATION_EVENTS, **events}}
+    try:
+        data = match.get_match_data(events=events)
+    except Exception as e:
+        return [f"Replay can't be parsed: {repr(e)}"]
+
+    return _check_intervals(data['interval']) + _check_heroes(match) + _check_windows(match)
@@ -0,0 +1,55 @@
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+# slot code of a name that doesn't belong to a player
+NO_SLOT = -1
+
+# category codes of unit names. Illusions have the names of their heroes, they are marked by the
+# attackerillusion / targetillusion flags of the events
+UNIT_OTHER = 0
+UNIT_HERO = 1
+UNIT_BUILDING = 2
+UNIT_CREEP = 3
+UNIT_ROSHAN = 4
+
+RE_BUILDING = re.compile('_tower|_rax_|_fillers|fort')
+RE_CREEP = re.compile('creep|neutral|siege')
+
+# name columns of the event tables that get slot and category columns: targetname -> targetslot, targetcategory
+CODED_NAME_COLUMNS: Dict[str, List[str]] = {
+    'deward': ['attackername'],
+    'xp': ['targetname'],
+    'gold': ['targetname'],
+    'damage': ['sourcename', 'targetname', 'targetsourcename'],
+    'roshan_deaths': ['sourcename'],
+    'hero_deaths': ['sourcename', 'targetname'],
+}
+
+
+def get_code_column_names(column: str) -> Tuple[str, str]:
+    prefix = column.removesuffix('name')
+    return f'{prefix}slot', f'{prefix}category'
+
+
+def get_unit_category(name: str, is_player: bool) -> int:
+    if is_player:
+        return UNIT_HERO
+    if name == 'npc_dota_roshan':
+        return UNIT_ROSHAN
+    if RE_BUILDING.search(name):
+        return UNIT_BUILDING
+    if RE_CREEP.search(name):
+        return UNIT_CREEP
+    return UNIT_OTHER
+
+
+def get_name_codes(names: List[str], name_to_slot: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Slot and category code of every name of a NameTable. Index the output with name codes of an event table
+    to get the codes of its rows. The last item is NO_SLOT/UNIT_OTHER of a missing name (event_buffers.NO_NAME)"""
+    slots = np.array([name_to_slot.get(name, NO_SLOT) for name in names] + [NO_SLOT], dtype=np.int8)
+    categories = np.array([get_unit_category(name, slot != NO_SLOT) for name, slot in zip(names, slots)]
+                          + [UNIT_OTHER], dtype=np.int8)
+    return slots, categories
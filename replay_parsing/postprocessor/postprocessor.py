@@ -1,69 +1,19 @@
 import copy
-from functools import partial, reduce
-from typing import Dict, List, Tuple, Optional
+import warnings
+from typing import Callable, Dict, List, Tuple
 
 import numpy as np
-import pandas as pd
 
-from utils import get_both_slot_values
 from .columns_to_postprocess import LANE_COLUMNS, GAME_COLUMNS, SUM_TOTAL_DATA, MAX_TOTAL_DATA, AVERAGE_TOTAL_DATA
-from ..modules import MatchPlayersData, MatchSplitter
+from ..modules import MatchPlayersData, MatchSplitter, MetricCube
 
 
-def _flatten_for_pd(data: dict, db_names: list = None, ) -> list:
-    if db_names is None:
-        db_names = []
+TOTAL_COLUMNS = ['ltotal', 'gtotal']
 
-    return [{'slot': slot_k, 'data': ck, **{k: v for k, v in cv.items() if k not in db_names}}
-            for slot_k, slot_v in data.items() for ck, cv in slot_v.items()]
 
-
-def _clean_df_inplace(df_: pd.DataFrame) -> None:
-    df_.reset_index(inplace=True)
-    df_.replace([np.inf, -np.inf, np.nan], None, inplace=True)
-    return None
-
-
-def _get_df_slice(df: pd.DataFrame,  slot: int | str,  empty: bool = False, ) -> pd.DataFrame:
-    slot_str, slot_int = get_both_slot_values(slot)
-
-    df = df.copy().reset_index()
-
-    df_slice = df[df['slot'] == slot_str].copy()
-    del df_slice['slot']
-
-    df_slice.set_index('data', inplace=True)
-    df_slice.sort_index(inplace=True)
-
-    if empty:
-        return pd.DataFrame(np.nan, index=df_slice.index, columns=df_slice.columns)
-
-    return df_slice
-
-
-def _reduce_dfs(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
-    df1_mask = (df1.isna() & ~df2.isna()).copy()
-    df2_mask = (df2.isna() & ~df1.isna()).copy()
-
-    df1[df1_mask] = 0
-    df2[df2_mask] = 0
-
-    return df1.add(df2, fill_value=np.nan).copy()
-
-
-def add_df(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
-    return df1 + df2
-
-
-def sub_df(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
-    return df1 - df2
-
-
-def div_df(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
-    return df1 / df2
-
-
-def compare_position_performance(data_df: pd.DataFrame, MPD: MatchPlayersData, ) -> Dict[int, list]:
+def compare_position_performance(cube: MetricCube, MPD: MatchPlayersData, ) -> Dict[int, list]:
+    """Comparisons of every player with the opponents one to one and with the last opponent divided
+    by their number: (metric, window) arrays of the metrics and windows of the cube"""
     output = {x: [] for x in range(10)}
 
     comparison_base = {
@@ -76,98 +26,73 @@ def compare_position_performance(data_df: pd.DataFrame, MPD: MatchPlayersData, )
         'basic': True,
 
         'is_flat': None,
-        'df': None,
+        'values': None,
     }
 
+    comparisons: List[Tuple[bool, Callable]] = [(False, np.divide), (True, np.subtract)]
     for player in MPD.get_all():
-        player_slot = player['slot']
-        get_df_slice = partial(_get_df_slice, df=data_df)  # columns are turned into index
-
-        player_df = get_df_slice(slot=player_slot)
+        player_values = cube.values[player.slot]
 
-        this_player_data = copy.deepcopy(comparison_base)
-        this_player_data['slot_comparandum'] = player['slot']
-        this_player_data['position_comparandum'] = player['position']
+        this_player_data = copy.copy(comparison_base)
+        this_player_data['slot_comparandum'] = player.slot
+        this_player_data['position_comparandum'] = player.position
 
-        # FIRST - COMPARE PERFORMANCE ONE TO ONE
-        for comp_name, is_flat, comp_func in [('percent', False, div_df), ('flat', True, sub_df), ]:
-            aggregated_df = get_df_slice(slot=player_slot, empty=True)
+        for is_flat, comp_func in comparisons:
             opponents_number = 0
-            opponent_df = None
+            opponent_values = None
             this_player_data['is_flat'] = is_flat
 
-            for opponent_slot in player['opponents']:
-                opponent = MPD[opponent_slot]
-
-                opponent_df = get_df_slice(slot=opponent['slot'])
-
-                this_opponent = copy.deepcopy(this_player_data)
-                with np.errstate(divide='ignore', invalid='ignore'):
-
-                    comparison_df = comp_func(player_df, opponent_df)
-
-                    # COPY AND CLEAN AFTER THE REDUCTION
-                    _clean_df_inplace(comparison_df)
-                    this_opponent['df'] = comparison_df.copy()
-
-                    # AGGREGATION
-                    aggregated_df = add_df(aggregated_df, opponent_df)
-
-                this_opponent['slot_comparans'] = opponent['slot']
-                this_opponent['position_comparans'] = opponent['position']
-
-                output[player_slot].append(this_opponent)
-
-                opponents_number += 1
-
-            # COMBINE AGGREGATED DATA
-            this_player_agged_data = copy.deepcopy(this_player_data)
-            this_player_agged_data['basic'] = False
-
             with np.errstate(divide='ignore', invalid='ignore'):
-                comparison_df = comp_func(player_df, opponent_df / opponents_number)
+                for opponent_slot in player.opponents:
+                    opponent = MPD[opponent_slot]
+                    opponent_values = cube.values[opponent.slot]
 
-                _clean_df_inplace(comparison_df)
-                this_player_agged_data['df'] = comparison_df.copy()
+                    this_opponent = copy.copy(this_player_data)
+                    this_opponent['values'] = comp_func(player_values, opponent_values)
+                    this_opponent['slot_comparans'] = opponent.slot
+                    this_opponent['position_comparans'] = opponent.position
 
-            output[player_slot].append(this_player_agged_data)
+                    output[player.slot].append(this_opponent)
+                    opponents_number += 1
 
-    return output
-
-
-def fill_total_values(data_df: pd.DataFrame) -> pd.DataFrame:
-    data_df.set_index(['data', 'slot'], inplace=True)
-
-    data_df.loc[(SUM_TOTAL_DATA, 'ltotal')] = data_df.loc[(SUM_TOTAL_DATA, LANE_COLUMNS)].sum(axis=1)
-
-    data_df.loc[(SUM_TOTAL_DATA, 'gtotal')] = data_df.loc[(SUM_TOTAL_DATA, GAME_COLUMNS)].sum(axis=1)
+                # COMBINE AGGREGATED DATA
+                this_player_agged_data = copy.copy(this_player_data)
+                this_player_agged_data['basic'] = False
+                this_player_agged_data['values'] = comp_func(player_values, opponent_values / opponents_number)
 
+            output[player.slot].append(this_player_agged_data)
 
-    data_df.loc[(MAX_TOTAL_DATA, 'ltotal')] = data_df.loc[(MAX_TOTAL_DATA, LANE_COLUMNS)].max(axis=1)
-
-    data_df.loc[(MAX_TOTAL_DATA, 'gtotal')] = data_df.loc[(MAX_TOTAL_DATA, GAME_COLUMNS)].max(axis=1)
+    return output
 
 
-    data_df.loc[(AVERAGE_TOTAL_DATA, 'ltotal')] = data_df.loc[(AVERAGE_TOTAL_DATA, LANE_COLUMNS)].mean(axis=1)
+def fill_total_values(cube: MetricCube) -> np.ndarray:
+    """(slot, metric, ltotal/gtotal) sums, maxes and averages of the lane and game windows, NaN for the other
+    metrics. Windows without values are skipped, a sum of them is 0"""
+    totals = np.full(cube.values.shape[:2] + (len(TOTAL_COLUMNS), ), np.nan)
 
-    data_df.loc[(AVERAGE_TOTAL_DATA, 'gtotal')] = data_df.loc[(AVERAGE_TOTAL_DATA, GAME_COLUMNS)].mean(axis=1)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # maxes and averages of windows without values
+        for metrics, func in [(SUM_TOTAL_DATA, np.nansum),
+                              (MAX_TOTAL_DATA, np.nanmax),
+                              (AVERAGE_TOTAL_DATA, np.nanmean)]:
+            rows = cube.get_positions(metrics)
+            for total_idx, columns in enumerate([LANE_COLUMNS, GAME_COLUMNS]):
+                window_values = cube.values[:, rows][..., cube.get_window_positions(columns)]
+                totals[:, rows, total_idx] = func(window_values, axis=-1)
 
-    return data_df
+    return totals
 
 
-def postprocess_data(data: Dict[str, Dict[str, dict]],
+def postprocess_data(cube: MetricCube,
                      MPD: MatchPlayersData,
-                     MS: MatchSplitter, ) -> Tuple[pd.DataFrame, Dict[int, list]]:
-    data_df = pd.DataFrame(_flatten_for_pd(data, ['_parsing_name', '_db_name']), )
-
-    total_columns = ['ltotal', 'gtotal']
-    for col in total_columns:
-        data_df[col] = pd.Series(dtype=np.float64)
-
-    data_df.replace({None: np.nan}, inplace=True)
-    [data_df[col].astype(np.float64) for col in data_df.columns if col in MS.window_values_names]
-
-    filled_totals = fill_total_values(data_df)
-    comparison_data = compare_position_performance(filled_totals.copy(), MPD)
+                     MS: MatchSplitter, ) -> Tuple[MetricCube, Dict[int, list]]:
+    """Cube of the windows and their totals (ltotal, gtotal) and the comparisons of the players"""
+    filled_totals = MetricCube(metrics=cube.metrics,
+                               parsing_names=cube.parsing_names,
+                               db_names=cube.db_names,
+                               windows=cube.windows + TOTAL_COLUMNS,
+                               values=np.concatenate([cube.values, fill_total_values(cube)], axis=-1))
+
+    comparison_data = compare_position_performance(filled_totals, MPD)
 
     return filled_totals, comparison_data
@@ -1,9 +1,12 @@
 from .buildings import process_building
 from .damage import process_damage_windows
 from .deaths import process_hero_deaths, process_roshan_deaths
+from .economy import process_economy_windows
+from .executor import run_processors
 from .gold import process_gold_windows
 from .interval import process_interval_windows
 from .pings import process_pings_windows
-from .processing_utils import normalise_output_type_wrapper, process_output, add_data_type_name
+from .processing_utils import normalise_output_type_wrapper, process_output, add_data_type_name, consumes, \
+    get_consumed_events
 from .wards import process_wards_windows, process_deward_windows
 from .xp import process_xp_windows
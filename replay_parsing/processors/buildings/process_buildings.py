@@ -4,6 +4,8 @@ from typing import List
 
 import pandas as pd
 
+from ..processing_utils import consumes
+
 
 def _detect_tier(value) -> int:
     for x in range(1, 5):
@@ -158,6 +160,7 @@ def process_building_kill_df(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+@consumes(building_kill=['time', 'value', 'targetname'])
 def process_building(df: pd.DataFrame, pos_to_slot: dict) -> (dict, bool, dict):
     new_df = process_building_kill_df(df)
 
@@ -1,3 +1,4 @@
+import warnings
 from functools import partial
 from typing import List, Tuple
 
@@ -5,118 +6,105 @@ import numpy as np
 import pandas as pd
 
 from replay_parsing.modules.match_splitter import MatchSplitter
+from replay_parsing.modules.metric_cube import MetricCube
+from replay_parsing.modules.unit_codes import UNIT_BUILDING
 from ..processing_utils import add_data_type_name
-from ..processing_utils import process_output
+from ..processing_utils import consumes
 from ...windows import DAMAGE_WINDOWS
 
 
 PROCESSED_DATA_NAME = 'damage'
 AN = partial(add_data_type_name, text_to_add=PROCESSED_DATA_NAME)
-PO = partial(process_output, allow_none=False)
 
-
-def _concat_to_slot(slot: int):
-    def _concat(text: str) -> str:
-        return '|'.join([f'{slot}', text])
-
-    return _concat
-
-def _split_damage_by_player(df: pd.DataFrame, players: list) -> pd.DataFrame:
-    df['frombuilding'] = df['sourcename'].str.contains('_tower|_rax_|_fillers|fort', regex=True)
-    df['tobuilding'] = df['targetname'].str.contains('_tower|_rax_|_fillers|fort', regex=True)
-
-    ser_with_summons = df.attackerhero != True
-    ser_to_heroes = df.targethero == True
-    ser_to_buildings = df.tobuilding == True
-    ser_to_creatures = ((df.tobuilding == False) &
-                        (df.targethero == False) &
-                        (df.targetillusion == False))
-    ser_to_illusions = df.targetillusion == True
-
-    ser_from_heroes = df.attackerhero == True
-    ser_from_buildings = df.frombuilding == True
-    ser_from_creatures = ((df.frombuilding == False) &
-                          (df.attackerhero == False) &
-                          (df.attackerillusion == False))
-    ser_from_illusions = df.attackerillusion == True
-
-    new_columns = {}
-    for player in players:
-        name_match = player['hero_npc_name'] + \
-                     (f"|{player['hero_npc_name_alias']}" if player['hero_npc_name_alias'] else '')
-        player_attack = df['sourcename'].str.contains(name_match, regex=True)
-        player_defense = df['targetsourcename'].str.contains(name_match, regex=True)
-
-        concat_ = _concat_to_slot(player['slot'])
-
-        new_columns[concat_('with_summons')] = player_attack & ser_with_summons
-        new_columns[concat_('to_heroes')] = player_attack & ser_to_heroes
-
-        new_columns[concat_('to_buildings')] = player_attack & ser_to_buildings
-        new_columns[concat_('to_creatures')] = player_attack & ser_to_creatures
-        new_columns[concat_('to_illusions')] = player_attack & ser_to_illusions
-        new_columns[concat_('to_all')] = player_attack
-
-        new_columns[concat_('from_heroes')] = player_defense & ser_from_heroes
-        new_columns[concat_('from_buildings')] = player_defense & ser_from_buildings
-        new_columns[concat_('from_creatures')] = player_defense & ser_from_creatures
-        new_columns[concat_('from_illusions')] = player_defense & ser_from_illusions
-        new_columns[concat_('from_all')] = player_defense  # TODO: check zeroes in 7254073428
-
-    new_df = pd.concat(new_columns.values(), axis=1, ignore_index=True)
-    new_df.columns = new_columns.keys()
-
-    new_df[['time', 'value']] = df[['time', 'value']]
-    new_df['minutes'] = np.floor(new_df['time'] / 60)
-
-    return new_df
-
-
-def _get_column_names(columns: List[str]) -> Tuple[list[str], list[str]]:
-    all_damage_columns = [x for x in columns if '|' in x]
-
-    damage_name_columns = [x.split('|')[1] for x in columns if '|' in x]
-    unique_damage_columns = list(set(damage_name_columns))
-    return unique_damage_columns, all_damage_columns
-
-
-def process_damage_windows(df: pd.DataFrame, MS: MatchSplitter, players: list) -> dict:
-    damage_df = _split_damage_by_player(df, players)
-    player_windows = MS.split_into_windows(damage_df, use_index=False)
-
-    unique_name_columns, all_damage_columns = _get_column_names(damage_df.columns)
-
-    agg_types = ['sum', 'mean', 'median', 'dmg_inst']
-
-    data = MS.create_windows(WINDOWS=DAMAGE_WINDOWS, AN=AN)
-
-    for col in all_damage_columns:
-        slot_str, damage_type_name = col.split('|')
-
-        for item in player_windows:
-            if not item['exists']:
-                continue
-
-            this_window = item['name']
-            this_df = item['df']
-
-            this_damage = this_df[this_df[col] == True]
-
-            damage_sum, damage_mean_dmg_pm, damage_median_dmg_pm, damage_inst = 0, 0, 0, 0
-
-            if not this_damage.empty:
-                damage_inst = this_damage['value'].count()
-
-                damage_sum = this_damage['value'].sum()
-                damage_agged = this_damage.groupby('minutes')['value'].sum()
-
-                correction_coef = len(damage_agged) / item['minutes']
-                damage_median_dmg_pm = damage_agged.mean() * correction_coef
-                damage_mean_dmg_pm = damage_agged.median() * correction_coef
-
-            data['_' + slot_str][AN(damage_type_name + f'__{agg_types[0]}')][this_window] = PO(damage_sum)
-            data['_' + slot_str][AN(damage_type_name + f'__{agg_types[1]}')][this_window] = PO(damage_mean_dmg_pm)
-            data['_' + slot_str][AN(damage_type_name + f'__{agg_types[2]}')][this_window] = PO(damage_median_dmg_pm)
-            data['_' + slot_str][AN(damage_type_name + f'__{agg_types[3]}')][this_window] = PO(damage_inst)
-
-    return data
+DAMAGE_TYPES = ['with_summons', 'to_heroes', 'to_buildings', 'to_creatures', 'to_illusions', 'to_all',
+                'from_heroes', 'from_buildings', 'from_creatures', 'from_illusions', 'from_all', ]
+
+
+def _get_damage_type_masks(df: pd.DataFrame, slots: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """(events of the type, slot column) for every damage type of DAMAGE_TYPES. Damage is dealt by
+    the sourceslot player and received by the targetsourceslot player"""
+    attackerhero, targethero = df['attackerhero'].to_numpy(bool), df['targethero'].to_numpy(bool)
+    attackerillusion, targetillusion = df['attackerillusion'].to_numpy(bool), df['targetillusion'].to_numpy(bool)
+    frombuilding = (df['sourcecategory'] == UNIT_BUILDING).to_numpy()
+    tobuilding = (df['targetcategory'] == UNIT_BUILDING).to_numpy()
+
+    source_slots, target_slots = df['sourceslot'].to_numpy(), df['targetsourceslot'].to_numpy()
+    attack, defense = np.isin(source_slots, slots), np.isin(target_slots, slots)
+
+    masks = {
+        'with_summons': attack & ~attackerhero,
+        'to_heroes': attack & targethero,
+        'to_buildings': attack & tobuilding,
+        'to_creatures': attack & ~tobuilding & ~targethero & ~targetillusion,
+        'to_illusions': attack & targetillusion,
+        'to_all': attack,
+
+        'from_heroes': defense & attackerhero,
+        'from_buildings': defense & frombuilding,
+        'from_creatures': defense & ~frombuilding & ~attackerhero & ~attackerillusion,
+        'from_illusions': defense & attackerillusion,
+        'from_all': defense,  # TODO: check zeroes in 7254073428
+    }
+    return [(masks[name], source_slots if name.startswith(('with', 'to')) else target_slots)
+            for name in DAMAGE_TYPES]
+
+
+@consumes(damage=['time', 'value', 'count', 'sourceslot', 'sourcecategory', 'targetcategory', 'targetsourceslot',
+                  'attackerhero', 'targethero', 'attackerillusion', 'targetillusion'])
+def process_damage_windows(df: pd.DataFrame, MS: MatchSplitter, players: list) -> MetricCube:
+    """Sums and counts of damage by (window, slot, damage type, minute) are taken with one bincount per damage
+    type and window type, the window values are reduced over the minutes"""
+    windows = MS.match_windows
+    slots = np.array([player.slot for player in players])
+
+    time = df['time'].to_numpy()
+    value = df['value'].to_numpy(np.float64)
+    # rows are totals by second, see event_buffers.EventAccumulator
+    count = df['count'].to_numpy(np.float64) if 'count' in df else np.ones(len(df))
+    minute = time // 60
+    first_minute = int(minute.min()) if len(minute) else 0
+    minutes_number = int(minute.max()) - first_minute + 1 if len(minute) else 1
+    minute = minute - first_minute
+
+    shape = (len(windows), 10, len(DAMAGE_TYPES), minutes_number)
+    size = int(np.prod(shape))
+    sums, counts = np.zeros(size), np.zeros(size, np.int64)
+    window_codes = MS.get_window_codes(time)
+    for type_code, (mask, slot_column) in enumerate(_get_damage_type_masks(df, slots)):
+        for codes in window_codes:
+            rows = mask & (codes >= 0)
+            key = ((codes[rows] * 10 + slot_column[rows]) * len(DAMAGE_TYPES) + type_code) * minutes_number
+            key += minute[rows]
+            sums += np.bincount(key, weights=value[rows], minlength=size)
+            counts += np.bincount(key, weights=count[rows], minlength=size).astype(np.int64)
+
+    sums, counts = sums.reshape(shape), counts.reshape(shape)
+    damage_minutes = (counts > 0).sum(axis=-1)
+    minute_sums = np.where(counts > 0, sums, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # windows without damage
+        damage_mean = sums.sum(axis=-1) / damage_minutes
+        damage_median = np.nanmedian(minute_sums, axis=-1)
+
+    window_minutes = np.array([window.minutes if window.exists else np.nan for window in windows])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correction_coef = damage_minutes / window_minutes[:, None, None]
+
+    agg_values = {
+        'sum': sums.sum(axis=-1),
+        # the mean of the minutes is stored as the median and vice versa, the saved data relies on it
+        'mean': damage_median * correction_coef,
+        'median': damage_mean * correction_coef,
+        'dmg_inst': counts.sum(axis=-1),
+    }
+
+    # windows of the players without damage of a type are 0
+    cube = MetricCube.from_windows(MS, WINDOWS=DAMAGE_WINDOWS, AN=AN)
+    players_mask = np.isin(np.arange(10), slots)[None, :]
+    for type_code, damage_type_name in enumerate(DAMAGE_TYPES):
+        has_damage = damage_minutes[..., type_code] > 0
+        for agg_type, values in agg_values.items():
+            cube.fill_windows(MS, AN(f'{damage_type_name}__{agg_type}'),
+                              np.where(has_damage, values[..., type_code], 0), players_mask)
+
+    return cube
@@ -1,10 +1,11 @@
 import copy
-import re
-from typing import Dict, List, Tuple
+from typing import List, Tuple
 
 import pandas as pd
 
 from parsing_utils.pd_helpers import iterate_df
+from ..processing_utils import consumes
+from replay_parsing.modules.unit_codes import NO_SLOT
 
 
 def _count_fk(fk_list: List[bool]) -> bool | None:
@@ -15,16 +16,10 @@ def _count_fk(fk_list: List[bool]) -> bool | None:
     return None
 
 
-def is_bear(slot: int | str) -> bool:
-    if re.search(r'lone_druid_bear', str(slot)):
-        return True
-    return False
-
-
-def process_hero_deaths(df: pd.DataFrame, players_to_slot: Dict[str, int]) -> tuple[dict, bool | None, list]:
-    df[['sourcename', 'targetname', ]] = df[['sourcename', 'targetname', ]].replace(players_to_slot)
-
-    df = df[df['targetname'].apply(lambda x: not is_bear(x))]
+@consumes(hero_deaths=['time', 'sourceslot', 'targetslot'])
+def process_hero_deaths(df: pd.DataFrame) -> tuple[dict, bool | None, list]:
+    # only deaths of the players. Spirit bears are marked as heroes as well
+    df = df.loc[df['targetslot'] != NO_SLOT, ['time', 'sourceslot', 'targetslot']]
 
     player_data = {x: {
         'first_blood_claimed': 0.0,
@@ -54,12 +49,12 @@ def process_hero_deaths(df: pd.DataFrame, players_to_slot: Dict[str, int]) -> tu
 
         killer_slot = None
         kill_dire = None
-        if isinstance(item['sourcename'], int):
-            killer_slot = item['sourcename']
+        if item['sourceslot'] != NO_SLOT:
+            killer_slot = item['sourceslot']
             kill_dire = True if killer_slot > 4 else False
             fk_list.append(kill_dire)
 
-        victim_slot = item['targetname']
+        victim_slot = item['targetslot']
         time_time = item['time']
 
         # FIRST BLOOD
@@ -89,7 +84,8 @@ def process_hero_deaths(df: pd.DataFrame, players_to_slot: Dict[str, int]) -> tu
     return (player_data, first_ten_kills_dire, hero_deaths)
 
 
-def process_roshan_deaths(df: pd.DataFrame, players_to_slot: Dict[str, int]) -> Tuple[float | int, list]:
+@consumes(roshan_deaths=['time', 'sourceslot'])
+def process_roshan_deaths(df: pd.DataFrame) -> Tuple[float | int, list]:
     roshan_kill_base = {
         'death_number': None,
         'death_time': None,
@@ -102,15 +98,13 @@ def process_roshan_deaths(df: pd.DataFrame, players_to_slot: Dict[str, int]) ->
     if df.empty:
         return (average_roshan_window_time, roshan_death)
 
-    df['sourcename'] = df['sourcename'].replace(players_to_slot)
-
     killing_time = []
-    for index, item in iterate_df(df):
+    for index, item in iterate_df(df[['time', 'sourceslot']]):
         roshan_kill = copy.deepcopy(roshan_kill_base)
 
         kill_dire = None
-        if isinstance(item['sourcename'], int):
-            kill_dire = True if item['sourcename'] > 4 else False
+        if item['sourceslot'] != NO_SLOT:
+            kill_dire = True if item['sourceslot'] > 4 else False
 
         roshan_kill['death_number'] = index
         roshan_kill['death_time'] = item['time']
@@ -0,0 +1 @@
+from .process_economy_windows import process_economy_windows
@@ -0,0 +1,19 @@
+import pandas as pd
+
+from replay_parsing.modules import MatchSplitter, MetricCube
+from ..gold.process_gold_windows import GOLD_PLAN, AN as GOLD_AN
+from ..processing_utils import consumes
+from ..xp.process_xp_windows import XP_PLAN, AN as XP_AN
+from ...windows import GOLD_WINDOWS, XP_WINDOWS
+
+
+@consumes(gold=['time', 'value', 'count', 'targetslot', 'gold_reason'],
+          xp=['time', 'value', 'count', 'targetslot', 'xp_reason'])
+def process_economy_windows(gold: pd.DataFrame, xp: pd.DataFrame, MS: MatchSplitter) -> MetricCube:
+    """process_xp_windows and process_gold_windows filling one cube of the windows, one grouped pass over
+    (window, slot, reason) for each table"""
+    cube = MetricCube.concat(MetricCube.from_windows(MS, WINDOWS=XP_WINDOWS, AN=XP_AN),
+                             MetricCube.from_windows(MS, WINDOWS=GOLD_WINDOWS, AN=GOLD_AN))
+
+    XP_PLAN.execute({'xp': xp}, MS, cube, XP_AN)
+    return GOLD_PLAN.execute({'gold': gold}, MS, cube, GOLD_AN)
@@ -0,0 +1,42 @@
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Collection, Dict, Tuple
+
+
+def _run_timed(processor: Callable, args: tuple) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    output = processor(*args)
+    return output, time.perf_counter() - start
+
+
+def run_processors(calls: Dict[str, Tuple[Callable, tuple]],
+                   workers: int = 0,
+                   in_processes: Collection[str] = (), ) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Runs independent processors: name -> (processor, args). Returns the outputs in the order of calls and
+    the seconds every processor took.
+
+    :param workers: processors run at once, 0/1 - one after another in the current thread
+    :param in_processes: names of the processors run in a process pool, the rest run in threads. Processes
+        can't be started from a daemonic process (celery prefork pool), gevent and solo pools are fine
+    """
+    if workers <= 1:
+        timed = {name: _run_timed(processor, args) for name, (processor, args) in calls.items()}
+        return {name: x[0] for name, x in timed.items()}, {name: x[1] for name, x in timed.items()}
+
+    process_names = [name for name in calls if name in in_processes]
+    futures: Dict[str, Future] = dict()
+    executors: Dict[str, Executor] = {'thread': ThreadPoolExecutor(max_workers=workers)}
+    if process_names:
+        executors['process'] = ProcessPoolExecutor(max_workers=min(workers, len(process_names)))
+
+    try:
+        for name, (processor, args) in calls.items():
+            executor = executors['process' if name in process_names else 'thread']
+            futures[name] = executor.submit(_run_timed, processor, args)
+
+        timed = {name: future.result() for name, future in futures.items()}
+    finally:
+        for executor in executors.values():
+            executor.shutdown(cancel_futures=True)
+
+    return {name: x[0] for name, x in timed.items()}, {name: x[1] for name, x in timed.items()}
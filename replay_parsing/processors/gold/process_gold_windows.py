@@ -1,10 +1,10 @@
 from functools import partial
-from typing import Dict
 
 import pandas as pd
 
-from replay_parsing.modules import MatchSplitter
-from ..processing_utils import process_output, add_data_type_name
+from replay_parsing.modules import MatchSplitter, MetricCube
+from replay_parsing.modules.metric_plan import MetricPlan
+from ..processing_utils import add_data_type_name, consumes, get_reason_specs
 from ...windows import GOLD_WINDOWS
 
 
@@ -27,22 +27,12 @@ gold_reasons = {
 
 PROCESSED_DATA_NAME = 'gold'
 AN = partial(add_data_type_name, text_to_add=PROCESSED_DATA_NAME)
-PO = partial(process_output, allow_none=False)
 
-def process_gold_windows(df: pd.DataFrame, MS: MatchSplitter, players_to_slot: Dict[str, int]) -> dict:
-    df.replace(players_to_slot, inplace=True)
-    wards_windows = MS.split_into_windows(df, use_index=False)
+# gold and its rate of all the reasons
+GOLD_PLAN = MetricPlan(get_reason_specs('gold', gold_reasons))
 
-    data = MS.create_windows(WINDOWS=GOLD_WINDOWS, AN=AN)
 
-    for window in wards_windows:
-        if window['exists']:
-            agged_df = window['df'].groupby(['targetname', 'gold_reason'])['value'].sum()
-            for k, v in agged_df.to_dict().items():
-                slot, gold_reason = k
-                if gold_reason == 0:
-                    continue
-                data[f'_{slot}'][AN(gold_reasons[gold_reason])][window['name']] = PO(v)
-                data[f'_{slot}'][AN(gold_reasons[gold_reason] + ' pm')][window['name']] = PO(v) / window['minutes']
-
-    return data
+@consumes(gold=['time', 'value', 'count', 'targetslot', 'gold_reason'])
+def process_gold_windows(df: pd.DataFrame, MS: MatchSplitter) -> MetricCube:
+    cube = MetricCube.from_windows(MS, WINDOWS=GOLD_WINDOWS, AN=AN)
+    return GOLD_PLAN.execute({'gold': df}, MS, cube, AN)
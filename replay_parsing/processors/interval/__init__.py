@@ -1,2 +1,2 @@
-from .aggregation_executer import execute_window_aggregation
+from .window_aggregation import aggregate_interval_windows
 from .process_interval_windows import process_interval_windows
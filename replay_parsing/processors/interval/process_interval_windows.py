@@ -1,12 +1,11 @@
 from functools import partial
-from typing import Dict
 
 import numpy as np
 import pandas as pd
 
-from replay_parsing.modules import MatchSplitter
-from . import execute_window_aggregation
-from ..processing_utils import add_data_type_name
+from replay_parsing.modules import MatchSplitter, MetricCube
+from .window_aggregation import aggregate_interval_windows
+from ..processing_utils import add_data_type_name, consumes
 from ...windows import INTERVAL_WINDOWS
 
 
@@ -14,34 +13,20 @@ PROCESSED_DATA_NAME = 'interval'
 AN = partial(add_data_type_name, text_to_add=PROCESSED_DATA_NAME)
 
 
-def process_interval_windows(df: pd.DataFrame, MS: MatchSplitter, ) -> Dict[str, Dict]:
-    output_windows = MS.create_windows(WINDOWS=INTERVAL_WINDOWS, AN=AN)
+@consumes(interval=['time', 'slot', 'gold', 'lh', 'xp', 'x', 'y', 'level', 'kills', 'deaths', 'assists',
+                    'obs_placed', 'sen_placed', 'creeps_stacked', 'camps_stacked', 'rune_pickups',
+                    'teamfight_participation', 'towers_killed', 'roshans_killed', 'networth'])
+def process_interval_windows(df: pd.DataFrame, MS: MatchSplitter, ) -> MetricCube:
+    cube = MetricCube.from_windows(MS, WINDOWS=INTERVAL_WINDOWS, AN=AN)
 
-    agg_by_time_df = (df.groupby('time')
-                      .agg({'gold': 'sum',
-                            'xp': 'sum',
-                            'kills': 'sum',
-                            'deaths': 'sum',
-                            'rune_pickups': 'sum', }))
+    windows, slots, values = aggregate_interval_windows(df, MS, INTERVAL_WINDOWS.values())
+    # (window, slot) groups with rows, the other windows keep their base values
+    mask = np.zeros((len(MS.match_windows), 10), dtype=bool)
+    mask[windows, slots] = True
 
-    agg_player_windows = MS.split_into_windows(agg_by_time_df, use_index=True)
-    dfs_by_player = MS.split_by_player(df)
-    for player_df in dfs_by_player:
-        player_windows = MS.split_into_windows(player_df['df'])
-        for column_db_name, window_names in INTERVAL_WINDOWS.items():
-            column, agg_type = window_names
-            value_type = AN(f'{column}__{agg_type}')
+    for column, agg_type in INTERVAL_WINDOWS.values():
+        window_values = np.zeros(mask.shape)
+        window_values[windows, slots] = values[(column, agg_type)]
+        cube.fill_windows(MS, AN(f'{column}__{agg_type}'), window_values, mask)
 
-            for player_window, agg_window in zip(player_windows, agg_player_windows):
-                if not player_window['exists']:
-                    continue
-
-                with np.errstate(divide='ignore', invalid='ignore'):
-                    value = execute_window_aggregation(df=player_window['df'],
-                                                       column=column,
-                                                       agg_type=agg_type,
-                                                       df_agg=agg_window['df'])
-
-                output_windows[player_df['name']][value_type][player_window['name']] = value
-
-    return output_windows
+    return cube
@@ -0,0 +1,143 @@
+import warnings
+from typing import Callable, Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from replay_parsing.modules.match_splitter import MatchSplitter
+
+
+# columns of the per second sums of all the players, see max_global_perc
+GLOBAL_COLUMNS = ['gold', 'xp', 'kills', 'deaths', 'rune_pickups']
+
+
+class _WindowGroups:
+    """Rows of the interval df sorted by (window, slot), every group is a contiguous slice from starts to ends.
+    Rows of a group keep their time order, the per minute values and the movement depend on it"""
+    def __init__(self, df: pd.DataFrame):
+        window, slot = df['window'].to_numpy(), df['slot'].to_numpy()
+        order = np.lexsort((slot, window))
+        self.df = df.iloc[order]
+
+        window, slot = window[order], slot[order]
+        changes = np.flatnonzero((window[1:] != window[:-1]) | (slot[1:] != slot[:-1])) + 1
+        self.starts = np.concatenate([[0], changes]) if len(window) else np.array([], dtype=np.int64)
+        self.ends = np.concatenate([self.starts[1:], [len(window)]]).astype(np.int64)
+        self.lengths = self.ends - self.starts
+
+        self.windows, self.slots = window[self.starts], slot[self.starts]
+        self._series: Dict[str, np.ndarray] = dict()
+
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+    def get_series(self, column: str) -> np.ndarray:
+        if column not in self._series:
+            df = self.df
+            if column == 'movement':
+                x, y = df['x'].to_numpy(np.float64), df['y'].to_numpy(np.float64)
+                # distance to the previous second of the group, 0 for the first one
+                ser = np.square(np.diff(x, prepend=np.nan)) + np.square(np.diff(y, prepend=np.nan))
+                ser[self.starts] = 0
+            elif column == 'stacked':
+                ser = (df['camps_stacked'] + df['creeps_stacked']).to_numpy()
+            elif column == 'kda':
+                ser = (df['kills'] + (df['assists'] * 0.5)).to_numpy()
+            else:
+                ser = df[column].to_numpy()
+            self._series[column] = ser.astype(np.float64)
+        return self._series[column]
+
+
+    def max(self, column: str) -> np.ndarray:
+        return np.fmax.reduceat(self.get_series(column), self.starts)
+
+
+    def min(self, column: str) -> np.ndarray:
+        return np.fmin.reduceat(self.get_series(column), self.starts)
+
+
+    def sum(self, column: str) -> np.ndarray:
+        return np.add.reduceat(np.nan_to_num(self.get_series(column)), self.starts)
+
+
+    def count(self, column: str) -> np.ndarray:
+        return np.add.reduceat(~np.isnan(self.get_series(column)), self.starts)
+
+
+    def gained_pm_median(self, column: str) -> np.ndarray:
+        """Median of the gains between the seconds taken every 60 seconds back from the last one"""
+        ser = self.get_series(column)
+        diffs_number = (self.lengths - 1) // 60
+        step = np.arange(diffs_number.max())
+
+        last = self.ends[:, None] - 1 - 60 * step[None, :]
+        diffs = ser[last.clip(0)] - ser[(last - 60).clip(0)]
+        diffs[step[None, :] >= diffs_number[:, None]] = np.nan
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # windows shorter than 2 minutes
+            return np.nanmedian(diffs, axis=1)
+
+
+def _get_global_max(df: pd.DataFrame, column: str, groups: _WindowGroups, MS: MatchSplitter) -> np.ndarray:
+    """Max of the per second sums of all the players in the window of every group"""
+    by_time = df.groupby('time')[column].sum()
+
+    window_max = np.full(len(MS.match_windows), np.nan)
+    for codes in MS.get_window_codes(by_time.index.to_numpy()):
+        inside = codes >= 0
+        np.fmax.at(window_max, codes[inside], by_time.to_numpy(np.float64)[inside])
+    return window_max[groups.windows]
+
+
+def _clean_division(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        output = x / y
+    return np.where(np.isnan(x) | np.isnan(y) | (x == 0) | (y == 0), 0, output)
+
+
+def _avg_by_length_pm(groups: _WindowGroups, column: str) -> np.ndarray:
+    if column == 'movement':
+        return groups.sum(column) / (groups.lengths / 60)
+    return (groups.max(column) - groups.min(column)) / (groups.lengths / 60)
+
+
+AGGREGATIONS: Dict[str, Callable[[_WindowGroups, str], np.ndarray]] = {
+    'max': _WindowGroups.max,
+    'gained_pm_median': _WindowGroups.gained_pm_median,
+    'avg_(by_length)_pm': _avg_by_length_pm,
+    'gained_pw': lambda groups, column: groups.max(column) - groups.min(column),
+    'sum': _WindowGroups.sum,
+    'min': _WindowGroups.min,
+    'avg': lambda groups, column: groups.sum(column) / groups.count(column),
+}
+
+
+def aggregate_interval_windows(df: pd.DataFrame,
+                               MS: MatchSplitter,
+                               aggregations: Iterable[Tuple[str, str]],
+                               ) -> Tuple[np.ndarray, np.ndarray, Dict[Tuple[str, str], np.ndarray]]:
+    """Aggregations of the interval columns (see windows.INTERVAL_WINDOWS) for all the (slot, window) groups at once.
+
+    Returns window indexes and slots of the groups with rows, and the values of the groups for every
+    (column, agg_type) of aggregations. Windows without rows of a slot have no group, their value stays 0
+    """
+    groups = _WindowGroups(MS.assign_windows(df))
+    if not len(groups):
+        return groups.windows, groups.slots, {aggregation: np.array([]) for aggregation in aggregations}
+
+    output = dict()
+    for column, agg_type in aggregations:
+        if agg_type == 'max_global_perc':
+            if column not in GLOBAL_COLUMNS:
+                raise NameError(f"Column {column} has no global values")
+            output[(column, agg_type)] = _clean_division(groups.max(column), _get_global_max(df, column, groups, MS))
+        elif agg_type in AGGREGATIONS:
+            output[(column, agg_type)] = AGGREGATIONS[agg_type](groups, column)
+        else:
+            raise NameError(f"Aggregation type {agg_type} does not exist")
+
+    return groups.windows, groups.slots, output
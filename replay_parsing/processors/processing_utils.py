@@ -1,6 +1,8 @@
-from typing import Callable
+from typing import Callable, Dict, List, Optional
 import numpy as np
 
+from replay_parsing.modules.metric_plan import MetricSpec
+
 
 def process_output(output, allow_none: bool = False):
     if output is None or output is np.inf or output is np.nan:
@@ -34,3 +36,36 @@ def is_numeric_type(value, none_is_true: bool = True) -> bool:
 
 def add_data_type_name(text: str, text_to_add: str) -> str:
     return f'{text_to_add}|{text}'
+
+
+def consumes(**events: List[str]) -> Callable:
+    """Declare the event tables and their columns a processor reads: @consumes(pings=['time', 'slot', 'type'])"""
+    def wrapper(func: Callable) -> Callable:
+        func.consumed_events = events
+        return func
+    return wrapper
+
+
+def get_consumed_events(*processors: Callable) -> Dict[str, List[str]]:
+    """Tables and columns needed by the processors. Pass it to MatchAnalyser.get_match_data"""
+    events = dict()
+    for processor in processors:
+        for table, columns in processor.consumed_events.items():
+            events.setdefault(table, [])
+            events[table] += [column for column in columns if column not in events[table]]
+    return events
+
+
+def get_reason_specs(table: str,
+                     reasons: Dict[int, str],
+                     per_minute_reasons: Optional[List[int]] = None, ) -> List[MetricSpec]:
+    """Sum of the values of every reason ({table}_reason column) of the players and its per minute rate.
+    Reasons that are not listed (e.g. starting gold) are skipped"""
+    specs = []
+    for reason, name in reasons.items():
+        where = (f'{table}_reason', reason)
+        specs.append(MetricSpec(name, table=table, slot='targetslot', reducer='sum', value='value', where=where))
+        if per_minute_reasons is None or reason in per_minute_reasons:
+            specs.append(MetricSpec(f'{name} pm', table=table, slot='targetslot', reducer='sum', value='value',
+                                    where=where, per_minute=True, skip_zero=per_minute_reasons is not None))
+    return specs
@@ -1,63 +1,58 @@
-import re
 from functools import partial
-from typing import List
 
+import numpy as np
 import pandas as pd
 
-from replay_parsing.modules import MatchSplitter
-from ..processing_utils import add_data_type_name
+from replay_parsing.modules import MatchSplitter, MetricCube
+from replay_parsing.modules.metric_plan import MetricPlan, MetricSpec
+from ..processing_utils import add_data_type_name, consumes
 from ...windows import WARDS_WINDOWS, DEWARD_WINDOWS
 
 
 PROCESSED_DATA_NAME = 'wards'
 AN = partial(add_data_type_name, text_to_add=PROCESSED_DATA_NAME)
 
-
-def process_wards_windows(df: pd.DataFrame, MS: MatchSplitter) -> dict:
-    wards_windows = MS.split_into_windows(df, use_index=False)
-    wards_data = MS.create_windows(WINDOWS=WARDS_WINDOWS, AN=AN)
-
-    for window_df in wards_windows:
-        if window_df['exists']:
-            groupped_wdf = window_df['df'].groupby(['slot', 'type'])['time'].count()
-            for k, v in groupped_wdf.to_dict().items():
-                slot, ward_type = k
-                wards_data[f'_{slot}'][AN(f'placed_wards_{ward_type}')][window_df['name']] = v
-
-    return wards_data
-
-
-def process_deward_windows(df: pd.DataFrame, MS: MatchSplitter,
-                           players: List[dict], players_to_slot: dict) -> dict:
-    df['slotname'] = df['slot'].replace({x['slot']: x['hero_npc_name'] for x in players})
-    df['killed'] = df['slotname'] != df['attackername']
-
-    df['attackerslot'] = df['attackername'].replace(players_to_slot)
-
-    deward_windows = MS.split_into_windows(df, use_index=False)
-    deward_data = MS.create_windows(WINDOWS=DEWARD_WINDOWS, AN=AN)
-
-    for window_df in deward_windows:
-        if window_df['exists']:
-            groupped_wdf = window_df['df'].groupby(['slot', 'type'])['killed'].agg(['sum', 'count'])
-            groupped_wdf['was_dewarded_perc'] = groupped_wdf['sum'] / groupped_wdf['count']
-            groupped_wdf.rename({'count': 'was_dewarded'}, axis='columns', inplace=True)
-            for name, item in groupped_wdf[['was_dewarded', 'was_dewarded_perc']].to_dict().items():
-                for k, v in item.items():
-                    slot, ward_type = k
-                    new_ward_type = 'sen' if 'sen' in ward_type else 'obs'
-                    deward_data[f'_{slot}'][AN(f'{name}_{new_ward_type}')][window_df['name']] = v
-
-    for window_df in deward_windows:
-        if window_df['exists']:
-            groupped_wdf = window_df['df'].groupby(['attackerslot', 'type'])['killed'].agg('sum').to_dict()
-            for k, v in groupped_wdf.items():
-                slot, ward_type = k
-                if not re.match(r'\d', str(slot)):  # the killer must be a hero
-                    continue
-
-                new_ward_type = 'sen' if 'sen' in ward_type else 'obs'
-                deward_data[f'_{slot}'][AN(f'killed_{new_ward_type}')][window_df['name']] = v
-                deward_data[f'_{slot}'][AN(f'killed_{new_ward_type}_pm')][window_df['name']] = v / window_df['minutes']
-
-    return deward_data
+# ward type names of the windows, deward types are sen_left and obs_left
+WARD_TYPES = ['sen', 'obs']
+
+
+def _get_ward_type(df: pd.DataFrame) -> np.ndarray:
+    """Position in WARD_TYPES of the type of every row. The names are checked once per category of the type column
+    of the name table, rows take the value of their category code"""
+    types = df['type'].astype('category')
+    is_sen = np.asarray(types.cat.categories.astype(str).str.contains('sen'))
+    # the code -1 of a missing type takes the last item, an obs
+    category_types = np.append(np.where(is_sen, WARD_TYPES.index('sen'), WARD_TYPES.index('obs')),
+                               WARD_TYPES.index('obs'))
+    return category_types[types.cat.codes.to_numpy()]
+
+
+WARDS_PLAN = MetricPlan([MetricSpec(f'placed_wards_{ward_type}', table='wards', where=('ward_type', code))
+                         for code, ward_type in enumerate(WARD_TYPES)],
+                        derived_columns={'wards': {'ward_type': _get_ward_type}})
+
+# wards of a slot killed by the other players and wards killed by a slot, the killer must be a hero
+DEWARD_PLAN = MetricPlan(
+    [spec for code, ward_type in enumerate(WARD_TYPES) for spec in [
+        MetricSpec(f'was_dewarded_{ward_type}', table='deward', where=('ward_type', code)),
+        MetricSpec(f'was_dewarded_perc_{ward_type}', table='deward', where=('ward_type', code),
+                   reducer='mean', value='killed'),
+        MetricSpec(f'killed_{ward_type}', table='deward', slot='attackerslot', where=('ward_type', code),
+                   reducer='sum', value='killed'),
+        MetricSpec(f'killed_{ward_type}_pm', table='deward', slot='attackerslot', where=('ward_type', code),
+                   reducer='sum', value='killed', per_minute=True),
+    ]],
+    derived_columns={'deward': {'ward_type': _get_ward_type,
+                                'killed': lambda df: (df['slot'] != df['attackerslot']).to_numpy()}})
+
+
+@consumes(wards=['time', 'slot', 'type'])
+def process_wards_windows(df: pd.DataFrame, MS: MatchSplitter) -> MetricCube:
+    cube = MetricCube.from_windows(MS, WINDOWS=WARDS_WINDOWS, AN=AN)
+    return WARDS_PLAN.execute({'wards': df}, MS, cube, AN)
+
+
+@consumes(deward=['time', 'slot', 'type', 'attackerslot'])
+def process_deward_windows(df: pd.DataFrame, MS: MatchSplitter) -> MetricCube:
+    cube = MetricCube.from_windows(MS, WINDOWS=DEWARD_WINDOWS, AN=AN)
+    return DEWARD_PLAN.execute({'deward': df}, MS, cube, AN)
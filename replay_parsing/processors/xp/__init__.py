@@ -1 +1 @@
-from .process_xp_windows import process_xp_windows
\ No newline at end of file
+from .process_xp_windows import process_xp_windows
@@ -1,11 +1,10 @@
 from functools import partial
-from typing import Dict
 
 import pandas as pd
 
-from replay_parsing.modules import MatchSplitter
-from ..processing_utils import add_data_type_name
-from ..processing_utils import process_output
+from replay_parsing.modules import MatchSplitter, MetricCube
+from replay_parsing.modules.metric_plan import MetricPlan
+from ..processing_utils import add_data_type_name, consumes, get_reason_specs
 from ...windows import XP_WINDOWS
 
 
@@ -19,23 +18,11 @@ xp_reasons = {
     3: 'xp for roshan',
 }
 
-PO = partial(process_output, allow_none=False)
+# xp of all the reasons, rates of heroes and creeps only when there is xp
+XP_PLAN = MetricPlan(get_reason_specs('xp', xp_reasons, per_minute_reasons=[1, 2]))
 
 
-def process_xp_windows(df: pd.DataFrame, MS: MatchSplitter, players_to_slot: Dict[str, int]) -> dict:
-    df.replace(players_to_slot, inplace=True)
-    xp_windows = MS.split_into_windows(df, use_index=False)
-
-    data = MS.create_windows(WINDOWS=XP_WINDOWS, AN=AN)
-
-    for window in xp_windows:
-        if window['exists']:
-            agged_df = window['df'].groupby(['targetname', 'xp_reason'])['value'].sum()
-            for k, v in agged_df.to_dict().items():
-                slot, gold_reason = k
-                data[f'_{slot}'][AN(xp_reasons[gold_reason])][window['name']] = PO(v)
-
-                if gold_reason in [1, 2] and v:
-                    data[f'_{slot}'][AN(xp_reasons[gold_reason] + ' pm')][window['name']] = PO(v / window['minutes'])
-
-    return data
+@consumes(xp=['time', 'value', 'count', 'targetslot', 'xp_reason'])
+def process_xp_windows(df: pd.DataFrame, MS: MatchSplitter) -> MetricCube:
+    cube = MetricCube.from_windows(MS, WINDOWS=XP_WINDOWS, AN=AN)
+    return XP_PLAN.execute({'xp': df}, MS, cube, AN)
@@ -1,21 +1,29 @@
 import bz2
 import json
 import os
-import re
-import subprocess
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Iterable, Iterator
 
 import requests
 from celery import shared_task
 from celery.utils.log import get_task_logger
 
+from replay_parsing import MatchAnalyser
+from utils.json_decoder import load_json_file
+from utils.replay_files import REPLAY_READ_ERRORS, open_replay, find_replay, get_replay_path, read_replay_tail
+
 
 CURRENT_DIR = Path(__file__).parent.parent.absolute()
 BASE_REPLAY_PATH = os.path.join(CURRENT_DIR, Path('./replays'))
 
 assert Path(BASE_REPLAY_PATH).is_dir() == True
 
+PARSER_CHUNK_SIZE = 1024 * 1024
+
+# seconds to connect to the parser and to wait for the next chunk of its output
+PARSER_CONNECT_TIMEOUT = 10
+PARSER_READ_TIMEOUT = int(os.getenv('PARSER_READ_TIMEOUT', default='300') or 300)
+
 logger = get_task_logger(__name__)
 
 
@@ -45,10 +53,9 @@ def clean_up_file(func: Callable) -> Callable:
 @clean_up_file
 def _json_exists_and_valid(file_path: Path) -> bool:
     if file_path.exists() and not _is_empty(file_path):
-        with open(file_path, "r") as file:
-            game_data = json.load(file)
-            if 'error' not in game_data:
-                return True
+        game_data = load_json_file(file_path)
+        if 'error' not in game_data:
+            return True
 
     return False
 
@@ -61,26 +68,27 @@ def _any_file_exists(file_path: Path) -> bool:
     return False
 
 
+# the parser writes these lines at the end of a replay, a replay without them is incomplete
+JSONL_REQUIRED_WORDS = ['"cosmetics"', '"dotaplus"', '"epilogue"']
+
+
 @clean_up_file
 def _jsonl_exists_and_valid(file_path: Path) -> bool:
     if file_path.exists() and not _is_empty(file_path):
-        with open(file_path, 'r') as file:
-            required_words = ['"cosmetics"', '"dotaplus"', '"epilogue"']
-            matched_words = set()
-            for line in file.readlines()[::-1]:
-                for word in required_words:
-                    if re.search(word, line):
-                        matched_words.add(word)
+        try:
+            # raw files are read from the end, compressed ones are streamed without splitting them into lines
+            tail = read_replay_tail(file_path)
+        except REPLAY_READ_ERRORS:
+            return False
 
-                if len(required_words) == len(matched_words):
-                    return True
+        if all(word.encode() in tail for word in JSONL_REQUIRED_WORDS):
+            return True
 
     return False
 
 
 def extract_url_from_json(file_path: Path) -> str:
-    with open(file_path, "r") as match_json:
-        game_data = json.load(match_json)
+    game_data = load_json_file(file_path)
 
     replay_url = game_data.get('replay_url', None)
     if not game_data['replay_url']:
@@ -121,10 +129,67 @@ def unzip_dem(bz2_path: Path, dem_path: Path):
             file_output.write(data)
 
 
-def parse_replay(dem_file: Path, replay_file: Path, port: int = 5600):
-    command = f'curl localhost:{port} --data-binary ' + f'"@{str(dem_file)}" > "{str(replay_file)}"'
-    curl_reponse = subprocess.run(command, shell=True, check=True, capture_output=True)
-    return curl_reponse
+def _iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Split a byte stream into lines. Line endings are kept"""
+    pending = b''
+    for chunk in chunks:
+        pending += chunk
+        start = 0
+        while (end := pending.find(b'\n', start)) != -1:
+            yield pending[start:end + 1]
+            start = end + 1
+        pending = pending[start:]
+
+    if pending:
+        yield pending
+
+
+def parse_replay(dem_file: Path, replay_file: Path, port: int = 5600, match_id: int | None = None) -> bool:
+    """Send the replay to the parser and read its output as it comes. Every line is written to disk (compressed
+    if REPLAY_COMPRESSION is set) and parsed by MatchAnalyser at once, so parsing overlaps with the parser's work.
+    The extracted data is saved to the replay cache and is used by process_game_data instead of reading
+    the file again.
+    Returns False if the output is incomplete"""
+    temp_file = replay_file.with_name(f'{replay_file.stem}.tmp{replay_file.suffix}')
+    match = MatchAnalyser(replay_file, match_id=match_id)
+    required_words = [word.encode() for word in JSONL_REQUIRED_WORDS]
+    matched_words = set()
+
+    completed = False
+    try:
+        with open(dem_file, 'rb') as dem, \
+                requests.post(f'http://localhost:{port}', data=dem, stream=True,
+                              timeout=(PARSER_CONNECT_TIMEOUT, PARSER_READ_TIMEOUT)) as response:
+            response.raise_for_status()
+
+            with open_replay(temp_file, 'wb') as output:
+                for line in _iter_lines(response.iter_content(chunk_size=PARSER_CHUNK_SIZE)):
+                    output.write(line)
+                    matched_words.update(word for word in required_words if word in line)
+
+                    # the replay is parsed again by process_game_data if something goes wrong here
+                    if match is not None:
+                        try:
+                            match.feed_line(line)
+                        except Exception as e:
+                            logger.warning(f"Replay {replay_file.name} is not parsed while downloading: {repr(e)}")
+                            match = None
+
+        if len(matched_words) != len(required_words):
+            return False
+
+        os.replace(temp_file, replay_file)
+        completed = True
+    finally:
+        if not completed and temp_file.is_file():
+            os.remove(temp_file)
+
+    if match is not None:
+        try:
+            match.finish_feed()
+        except Exception as e:
+            logger.warning(f"Replay cache of {replay_file.name} is not saved: {repr(e)}")
+    return True
 
 
 @shared_task(name='get_match_replay', retries=3, default_retry_delay=7)
@@ -155,14 +220,15 @@ def get_match_replay(match_id: int, first_parser: bool = True) -> int:
     if not first_parser:
         parser_port = 5700
 
-    jsonl_file = Path(os.path.join(folder_path, f'./{match_id}.jsonl'))
-    is_valid = _jsonl_exists_and_valid(jsonl_file)
+    jsonl_file = find_replay(folder_path, match_id)
+    is_valid = jsonl_file is not None and _jsonl_exists_and_valid(jsonl_file)
     if not is_valid:
-        curl_response = parse_replay(dem_file, jsonl_file, parser_port)
-        is_valid = _jsonl_exists_and_valid(jsonl_file)
+        # an invalid replay is removed by the check, the new one is written in the configured format
+        jsonl_file = get_replay_path(folder_path, match_id)
+        is_valid = parse_replay(dem_file, jsonl_file, parser_port, match_id=match_id)
 
         if not is_valid:
             logger.error(f"Replay data for match {match_id} is not correct!")
-            raise ReplayDataError(curl_response)
+            raise ReplayDataError(f"Parser output for match {match_id} is incomplete")
 
     return match_id
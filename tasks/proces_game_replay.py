@@ -1,17 +1,62 @@
 import os
-import pathlib
 from logging import Logger
 from pathlib import Path
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Tuple, List, Optional
 
 from models import PerformanceTotalData, GamePerformance
-from replay_parsing import MatchAnalyser, MatchSplitter
+from replay_parsing import MatchAnalyser, MatchSplitter, HeroNameIndex, get_consumed_events, process_interval_windows, \
+    process_pings_windows, process_wards_windows, process_deward_windows, process_damage_windows, \
+    process_economy_windows, process_building, process_hero_deaths, process_roshan_deaths
 from tasks.process_game_replay_addtitional import process_additional_replay_data
 from tasks.process_game_replay_main import process_main_replay_data
+from tasks.reference_data import ReferenceData
+from utils.metrics import HERO_NAMES_COUNTER
+from utils.replay_files import find_replay
 
 
 CURRENT_DIR = Path.cwd().parent.parent.absolute()
 
+# replays are parsed in chunks by this many processes. 0/1 - parsed in the worker itself
+REPLAY_PARSE_WORKERS = int(os.getenv('REPLAY_PARSE_WORKERS', default='0') or 0)
+
+# memory of the event frames of one match (0 - no budget). log - warn when it's exceeded, fail - stop parsing
+REPLAY_MEMORY_BUDGET_MB = int(os.getenv('REPLAY_MEMORY_BUDGET_MB', default='0') or 0)
+REPLAY_MEMORY_BUDGET_ACTION = os.getenv('REPLAY_MEMORY_BUDGET_ACTION', default='log') or 'log'
+
+# processors of one match run at once (0/1 - one after another) and the ones of them run in processes
+REPLAY_PROCESSOR_WORKERS = int(os.getenv('REPLAY_PROCESSOR_WORKERS', default='0') or 0)
+REPLAY_PROCESSOR_PROCESSES = [name.strip() for name in os.getenv('REPLAY_PROCESSOR_PROCESSES', default='').split(',')
+                              if name.strip()]
+
+# tables and columns read by the processors of process_main_replay_data and process_additional_replay_data
+PROCESSED_EVENTS = get_consumed_events(process_interval_windows, process_pings_windows, process_wards_windows,
+                                       process_deward_windows, process_damage_windows, process_economy_windows,
+                                       process_building, process_hero_deaths, process_roshan_deaths)
+
+
+def report_names_resolution(match: MatchAnalyser, logger: Logger) -> None:
+    for resolution, names in match.names_resolution.items():
+        HERO_NAMES_COUNTER.labels(resolution=resolution).inc(len(names))
+
+    if match.names_resolution.get('unresolved', None):
+        logger.warning(f"Unresolved hero names: {match.names_resolution['unresolved']}")
+
+
+def report_memory_usage(match: MatchAnalyser, memory_budget: int, logger: Logger) -> None:
+    logger.info(f'Replay frames take {match.memory_usage / 2 ** 20:.1f} MB')
+    if memory_budget and match.memory_usage > memory_budget:
+        logger.warning(f"Replay frames exceed the memory budget of {REPLAY_MEMORY_BUDGET_MB} MB")
+
+
+def get_match_analyser(match_path: Path, match_id: int, hero_names: HeroNameIndex) -> MatchAnalyser:
+    """Analyser with the parse settings of the workers, validation and processing parse a replay the same way"""
+    memory_budget = REPLAY_MEMORY_BUDGET_MB * 2 ** 20
+    return MatchAnalyser(match_path,
+                         match_id=match_id,
+                         parse_workers=REPLAY_PARSE_WORKERS,
+                         hero_names=hero_names,
+                         memory_budget=memory_budget if REPLAY_MEMORY_BUDGET_ACTION == 'fail' else None)
+
 
 def process_game_replay(db_session,
                         match_id: int,
@@ -19,26 +64,39 @@ def process_game_replay(db_session,
                         PTD_objs_dict: Dict[int, PerformanceTotalData],
                         additional_player_data: Dict[int, Dict[str, Any]],
                         logger: Logger,
+                        reference: Optional[ReferenceData] = None,
                         ) -> Tuple[Dict[int, List[GamePerformance]], Dict[str, Any]]:
+    reference = reference or ReferenceData(db_session)
+
     logger.info('Parsing raw replay data')
-    match_path = os.path.join(match_replay_folder_path, Path(f'./{match_id}.jsonl'))
+    match_path = find_replay(match_replay_folder_path, match_id)
+    if match_path is None:
+        raise FileNotFoundError(f"No replay file for match {match_id}")
 
     # MATCH PARSING
-    match = MatchAnalyser(pathlib.Path(match_path), match_id=match_id)
-    match_data = match.get_match_data()
+    match = get_match_analyser(match_path, match_id, reference.get_hero_names())
+    match_data = match.get_match_data(events=PROCESSED_EVENTS)
+    report_names_resolution(match, logger)
     match.get_players_object().set_player_data_from_dict(additional_player_data)
 
     MS = MatchSplitter(game_length=match.game_length, match_windows=match.match_windows)
 
     logger.info('Processing additional data')
     additional_data = process_additional_replay_data(db_session=db_session, match=match, match_data=match_data,
-                                                     ptd_dict=PTD_objs_dict)
+                                                     ptd_dict=PTD_objs_dict,
+                                                     building_dict=reference.get_building_dict())
 
     logger.info('Processing main replay data')
     GP_objs_dict = process_main_replay_data(db_session=db_session,
                                             match=match,
                                             match_data=match_data,
                                             MS=MS,
-                                            PerTotalData_dict=PTD_objs_dict)
+                                            PerTotalData_dict=PTD_objs_dict,
+                                            PDT_objs=reference.get_PDT_objs(),
+                                            processor_workers=REPLAY_PROCESSOR_WORKERS,
+                                            processor_processes=REPLAY_PROCESSOR_PROCESSES,
+                                            logger=logger)
+    # frames are built by the processors that read them
+    report_memory_usage(match, REPLAY_MEMORY_BUDGET_MB * 2 ** 20, logger)
 
     return (GP_objs_dict, additional_data)
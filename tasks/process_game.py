@@ -1,4 +1,3 @@
-import json
 import os
 import sys
 import warnings
@@ -12,11 +11,13 @@ from sqlmodel import Session
 from db import get_sync_db_session
 from models import Hero
 from models import Player, Team, GameData
-from models import PlayerGameData, Game, PerformanceTotalData, PositionApproximation
+from models import PlayerGameData, Game, PerformanceTotalData
 from tasks.create_league import get_or_create_league
 from tasks.proces_game_replay import process_game_replay
 from tasks.process_game_helpers import fix_odota_data
-from utils import get_all_sqlmodel_objs, none_to_zero, get_or_create, get_positions_approximations
+from tasks.reference_data import ReferenceData
+from utils import none_to_zero, get_or_create
+from utils.json_decoder import load_json_file
 
 
 CURRENT_DIR = Path.cwd().absolute()
@@ -136,11 +137,11 @@ def process_players(db_session, players: List[dict]) -> Dict[int, Player]:
     return players_dict
 
 
-@shared_task(name='process_game_data', ignore_result=True)
-def process_game_data(match_id: int, league_id: int | None = None):
+def process_game(db_session, match_id: int, league_id: int | None = None,
+                 reference: ReferenceData | None = None) -> None:
+    """Create all the objects of a match. reference is shared by the matches of a batch"""
     logger.info(f'Process replay for {match_id}')
-
-    db_session: Session = get_sync_db_session()
+    reference = reference or ReferenceData(db_session)
 
     game = db_session.get(Game, match_id)
     if game:
@@ -151,8 +152,7 @@ def process_game_data(match_id: int, league_id: int | None = None):
     match_folder_path = Path(f'{BASE_PATH}/{match_id}/')
     json_path = Path(f'{BASE_PATH}/{match_id}/{match_id}.json')
 
-    with open(json_path, "r") as match_json:
-        game_data = json.load(match_json)
+    game_data = load_json_file(json_path)
 
     if not league_id:
         league_id = game_data['league']['leagueid']
@@ -167,13 +167,10 @@ def process_game_data(match_id: int, league_id: int | None = None):
     players_dict = process_players(db_session, game_data['players'])
 
     # DATA POOLS
-    heroes_all = get_all_sqlmodel_objs(db_session, Hero)
-    heroes_dict: Dict[int, Hero] = {x.id: x for x in heroes_all}  # "hero_id": 78,
+    heroes_dict: Dict[int, Hero] = reference.get_heroes_dict()  # "hero_id": 78,
 
     # APPROXIMATION POSITIONS
-    approx_pos: dict = get_positions_approximations(db_session=db_session,
-                                                    model=PositionApproximation,
-                                                    league_id=league_id)
+    approx_pos: dict = reference.get_positions_approximations(league_id)
 
     # INITIAL DATA CREATION
     player_data_dict = dict()
@@ -275,7 +272,8 @@ def process_game_data(match_id: int, league_id: int | None = None):
                                                                  match_replay_folder_path=match_folder_path,
                                                                  PTD_objs_dict=PTD_objs_dict,
                                                                  additional_player_data=player_data_dict,
-                                                                 logger=logger, )
+                                                                 logger=logger,
+                                                                 reference=reference, )
 
     logger.info(f"Creating Game object...")
     PGD_objs = []
@@ -320,9 +318,17 @@ def process_game_data(match_id: int, league_id: int | None = None):
         game_start_time=game_data['start_time'],
         duration=game_data['duration'],
         replay_url=game_data['replay_url'],
+
+        broken_replay=False,
     )
 
     db_session.add(game)
     db_session.commit()
-    db_session.close()
     logger.info("Parsing complete")
+
+
+@shared_task(name='process_game_data', ignore_result=True)
+def process_game_data(match_id: int, league_id: int | None = None):
+    db_session: Session = get_sync_db_session()
+    process_game(db_session, match_id, league_id)
+    db_session.close()
@@ -1,4 +1,4 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Mapping
 
 import pandas as pd
 
@@ -45,12 +45,12 @@ def _fill_hero_deaths(db_session, hero_deaths: List[dict], MPD: MatchPlayersData
                 death_time=hero_death['death_time'],
 
                 kill_dire=hero_death['kill_dire'],
-                killer_hero_id=killer['hero_id'],
-                killer_player_id=killer['player_id'],
+                killer_hero_id=killer.hero_id,
+                killer_player_id=killer.player_id,
 
                 victim_dire=hero_death['victim_dire'],
-                victim_hero_id=victim['hero_id'],
-                victim_player_id=victim['player_id'], )
+                victim_hero_id=victim.hero_id,
+                victim_player_id=victim.player_id, )
 
         else:  # the hero died from something else
             victim = MPD[hero_death['victim_slot']]
@@ -62,8 +62,8 @@ def _fill_hero_deaths(db_session, hero_deaths: List[dict], MPD: MatchPlayersData
                 kill_dire=hero_death['kill_dire'],
 
                 victim_dire=hero_death['victim_dire'],
-                victim_hero_id=victim['hero_id'],
-                victim_player_id=victim['player_id'], )
+                victim_hero_id=victim.hero_id,
+                victim_player_id=victim.player_id, )
 
         hero_deaths_obj.append(hero_death_obj)
         db_session.add(hero_death_obj)
@@ -71,7 +71,7 @@ def _fill_hero_deaths(db_session, hero_deaths: List[dict], MPD: MatchPlayersData
     return hero_deaths_obj
 
 
-def _get_building_dict(db_session, ) -> dict:
+def get_building_dict(db_session, ) -> dict:
     igb_objs: List[InGameBuilding] = get_all_sqlmodel_objs(db_session, InGameBuilding)
     igb_dict = dict()
     for igb_obj in igb_objs:
@@ -86,8 +86,9 @@ def _get_building_dict(db_session, ) -> dict:
     return igb_dict
 
 
-def _fill_building_kill(db_session, building_kill: Dict[str, list | dict], ) -> Dict[str, BuildingData]:
-    igb_dict = _get_building_dict(db_session)
+def _fill_building_kill(db_session,
+                        building_kill: Dict[str, list | dict],
+                        igb_dict: dict, ) -> Dict[str, BuildingData]:
     output_dict = dict()
     for is_dire, side in [(True, 'dire'), (False, 'sentinel')]:
         bk_died_name = f'{side}_died'
@@ -165,19 +166,21 @@ def _fill_building_kill(db_session, building_kill: Dict[str, list | dict], ) ->
 
 def process_additional_replay_data(db_session,
                                    match: MatchAnalyser,
-                                   match_data: Dict[str, pd.DataFrame],
-                                   ptd_dict: Dict[int, PerformanceTotalData], ) -> Dict[str, Any]:
-    avg_rosh_death_time, roshan_deaths = process_roshan_deaths(match_data['roshan_deaths'],
-                                                               players_to_slot=match.players.get_name_slot_dict())
+                                   match_data: Mapping[str, pd.DataFrame],
+                                   ptd_dict: Dict[int, PerformanceTotalData],
+                                   building_dict: Optional[dict] = None, ) -> Dict[str, Any]:
+    """:param building_dict: see get_building_dict, loaded if it's not given"""
+    avg_rosh_death_time, roshan_deaths = process_roshan_deaths(match_data['roshan_deaths'])
     roshan_death_objs = _fill_roshan_deaths(db_session=db_session, roshan_deaths=roshan_deaths)
 
-    player_data, ftk_dire, hero_deaths = process_hero_deaths(match_data['hero_deaths'],
-                                                             players_to_slot=match.players.get_name_slot_dict())
+    player_data, ftk_dire, hero_deaths = process_hero_deaths(match_data['hero_deaths'])
     hero_death_objs = _fill_hero_deaths(db_session=db_session, hero_deaths=hero_deaths, MPD=match.players)
 
     player_building, dire_lost_first_tower, building_kill = process_building(match_data['building_kill'],
                                                                              pos_to_slot=match.players.get_pos_to_slot_by_side())
-    building_stats_objs = _fill_building_kill(db_session=db_session, building_kill=building_kill, )
+    building_stats_objs = _fill_building_kill(db_session=db_session,
+                                              building_kill=building_kill,
+                                              igb_dict=building_dict or get_building_dict(db_session), )
 
     for player_slot in range(10):
         this_pperf_obj = ptd_dict[player_slot]
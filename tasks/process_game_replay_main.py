@@ -1,16 +1,16 @@
-import re
-from typing import Dict, List
+from logging import Logger
+from typing import Collection, Dict, List, Optional, Mapping
 
+import numpy as np
 import pandas as pd
 
 from models import PerformanceDataType, PerformanceTotalData, ComparisonType, \
     PerformanceWindowData, GamePerformance
 from replay_parsing import MatchAnalyser, MatchSplitter, process_interval_windows, process_pings_windows, \
     process_wards_windows, process_deward_windows, process_damage_windows, TotalPerformanceAnalyser, \
-    process_xp_windows, process_gold_windows, postprocess_data, MatchPlayersData
-from utils import get_both_slot_values, combine_slot_dicts, get_obj_from_list, get_all_sqlmodel_objs, \
-    to_dec
-from parsing_utils.pd_helpers import iterate_df
+    process_economy_windows, postprocess_data, MatchPlayersData, MetricCube, run_processors
+from utils import get_obj_from_list, get_all_sqlmodel_objs, to_dec
+from utils.metrics import PROCESSOR_SECONDS
 from replay_parsing import PerformanceMaskHandler
 
 
@@ -18,8 +18,10 @@ PMH = PerformanceMaskHandler()
 
 
 def _get_PDT_objects(db_session,
-                     column_to_category_obj: Dict[str, str], ) -> Dict[str, PerformanceDataType]:
-    PDT_objs = get_all_sqlmodel_objs(db_session, PerformanceDataType, )
+                     column_to_category_obj: Dict[str, str],
+                     PDT_objs: Optional[List[PerformanceDataType]] = None, ) -> Dict[str, PerformanceDataType]:
+    if PDT_objs is None:
+        PDT_objs = get_all_sqlmodel_objs(db_session, PerformanceDataType, )
     PDT_dict = dict()
     for column_name, category_obj_name in column_to_category_obj.items():
         PDT_obj: PerformanceDataType = get_obj_from_list(PDT_objs, name=category_obj_name)
@@ -33,28 +35,36 @@ def _get_PDT_objects(db_session,
     return PDT_dict
 
 
-def _fill_basic_PWDs(db_session,
-                     final_data: pd.DataFrame,
-                     PDT_dict: Dict[str, PerformanceDataType],
-                     PTD_dict: Dict[int, PerformanceTotalData],
-                     model_fields: List[str],
-                     ) -> Dict[int, GamePerformance]:
-    window_data_by_slot = {x: [] for x in range(10)}
-
-    for index, line in iterate_df(final_data, use_offset=False):
-        data_name, slot_text = index
-        wit_type, wi_name = data_name.split('|')
-        _, slot_num = get_both_slot_values(slot_text)
-
-        pwd_dict = {x: to_dec(line[x]) for x in model_fields}
+def _get_window_data(db_session,
+                     values: np.ndarray,
+                     data_types: List[PerformanceDataType],
+                     columns: List[str], ) -> List[PerformanceWindowData]:
+    """Window data of every row of a (metric, window) array, inf and NaN are None"""
+    objects = values.astype(object)
+    objects[~np.isfinite(values)] = None
 
-        pwd_dict['data_type'] = PDT_dict[wi_name]
+    window_objs = []
+    for data_type, metric_values in zip(data_types, objects.tolist()):
+        pwd_dict = {column: to_dec(value) for column, value in zip(columns, metric_values)}
+        pwd_dict['data_type'] = data_type
 
         PMH.set_empty_status(pwd_dict)
         pwd_obj = PerformanceWindowData(**pwd_dict)
         db_session.add(pwd_obj)
 
-        window_data_by_slot[slot_num].append(pwd_obj)
+        window_objs.append(pwd_obj)
+
+    return window_objs
+
+
+def _fill_basic_PWDs(db_session,
+                     final_data: MetricCube,
+                     PDT_dict: Dict[str, PerformanceDataType],
+                     PTD_dict: Dict[int, PerformanceTotalData],
+                     ) -> Dict[int, GamePerformance]:
+    data_types = [PDT_dict[name] for name in final_data.parsing_names]
+    window_data_by_slot = {x: _get_window_data(db_session, final_data.values[x], data_types, final_data.windows)
+                           for x in range(10)}
 
     game_performance_objs_dict = dict()
     for slot_num, pwd_objs in window_data_by_slot.items():
@@ -75,36 +85,22 @@ def _fill_comparison_pws(db_session,
                          comparison_data: Dict[int, list],
                          PerfTotalData_dict: Dict[int, PerformanceTotalData],
                          match: MatchAnalyser,
-                         PDT_dict: Dict[str, PerformanceDataType],
-                         model_fields: List[str], ) -> Dict[int, List[GamePerformance]]:
+                         final_data: MetricCube,
+                         PDT_dict: Dict[str, PerformanceDataType], ) -> Dict[int, List[GamePerformance]]:
 
     players_data = match.players
+    data_types = [PDT_dict[name] for name in final_data.parsing_names]
 
     TPA = TotalPerformanceAnalyser(PerfTotalData_dict)
     # WINDOW DATA
 
     game_performance_objs = {x: [] for x in range(10)}
-    # we iterate over list that contains two types of dfs: flat and perc comparisons
+    # we iterate over list that contains two types of comparisons: flat and perc
     for slot, slot_item in comparison_data.items():
         for item in slot_item:
-            df = item['df']
             is_flat = item['is_flat']
-        # iterate over these dfs one by one
-            window_objs = []
-            # iterate over data in these dfs
-            for index, line in iterate_df(df, use_offset=False):
-                w_type, w_name = line['data'].split('|')
-
-                pwd_dict = {x: to_dec(line[x]) for x in model_fields}
-                data_type_obj = PDT_dict[w_name]
-
-                pwd_dict['data_type'] = data_type_obj
-
-                PMH.set_empty_status(pwd_dict)
-                ppws_obj = PerformanceWindowData(**pwd_dict)
-
-                db_session.add(ppws_obj)
-                window_objs.append(ppws_obj)
+            # (metric, window) values of the metrics and windows of final_data
+            window_objs = _get_window_data(db_session, item['values'], data_types, final_data.windows)
 
             # TOTAL DATA
             comparandum_slot = item['slot_comparandum']
@@ -119,14 +115,14 @@ def _fill_comparison_pws(db_session,
                     flat=is_flat,
                     basic=True,
 
-                    player_cpd_id=comparandum_data['player_id'],
-                    player_cps_id=comparans_data['player_id'],
+                    player_cpd_id=comparandum_data.player_id,
+                    player_cps_id=comparans_data.player_id,
 
-                    hero_cpd_id=comparandum_data['hero_id'],
-                    hero_cps_id=comparans_data['hero_id'],
+                    hero_cpd_id=comparandum_data.hero_id,
+                    hero_cps_id=comparans_data.hero_id,
 
-                    pos_cpd_id=comparandum_data['position_id'],
-                    pos_cps_id=comparans_data['position_id'],
+                    pos_cpd_id=comparandum_data.position_id,
+                    pos_cps_id=comparans_data.position_id,
                 )
                 db_session.add(CT_obj)
 
@@ -138,13 +134,13 @@ def _fill_comparison_pws(db_session,
                     flat=is_flat,
                     basic=False,
 
-                    player_cpd_id=comparandum_data['player_id'],
-                    hero_cpd_id=comparandum_data['hero_id'],
-                    pos_cpd_id=comparandum_data['position_id'],
+                    player_cpd_id=comparandum_data.player_id,
+                    hero_cpd_id=comparandum_data.hero_id,
+                    pos_cpd_id=comparandum_data.position_id,
                 )
                 db_session.add(CT_obj)
 
-                opponents: List[int] = players_data[comparandum_slot]['opponents']
+                opponents: List[int] = list(players_data[comparandum_slot].opponents)
                 ctp_data = TPA.compare_to_many(comparandum_slot, comparans_list=opponents, flat=is_flat)
 
 
@@ -168,46 +164,48 @@ def _fill_comparison_pws(db_session,
 
 def process_main_replay_data(db_session,
                              match: MatchAnalyser,
-                             match_data: Dict[str, pd.DataFrame],
+                             match_data: Mapping[str, pd.DataFrame],
                              MS: MatchSplitter,
                              PerTotalData_dict: Dict[int, PerformanceTotalData],
+                             PDT_objs: Optional[List[PerformanceDataType]] = None,
+                             processor_workers: int = 0,
+                             processor_processes: Collection[str] = (),
+                             logger: Optional[Logger] = None,
                              ) -> Dict[int, List[GamePerformance]]:
-    interval = process_interval_windows(match_data['interval'], MS)
-
-    pings = process_pings_windows(match_data['pings'], MS)
-
-    wards = process_wards_windows(match_data['wards'], MS)
-    deward = process_deward_windows(match_data['deward'], MS,
-                                    players=match.get_players(),
-                                    players_to_slot=match.players.get_name_slot_dict(), )
-
-    damage = process_damage_windows(match_data['damage'], MS, players=match.get_players(), )
-    xp = process_xp_windows(match_data['xp'], MS, players_to_slot=match.players.get_name_slot_dict(), )
-    gold = process_gold_windows(match_data['gold'], MS, players_to_slot=match.players.get_name_slot_dict(), )
-
-    match_info = combine_slot_dicts(interval, pings, wards, deward, damage, xp, gold, )
-
-    column_to_category_obj: Dict[str, str] = {x['_parsing_name']: x['_db_name'] for x in match_info['_0'].values()}
-    PTD_dict = _get_PDT_objects(db_session, column_to_category_obj)
-
+    # processors read their own frames, see run_processors
+    outputs, timings = run_processors({
+        'interval': (process_interval_windows, (match_data['interval'], MS)),
+        'pings': (process_pings_windows, (match_data['pings'], MS)),
+        'wards': (process_wards_windows, (match_data['wards'], MS)),
+        'deward': (process_deward_windows, (match_data['deward'], MS)),
+        'damage': (process_damage_windows, (match_data['damage'], MS, match.get_players())),
+        'economy': (process_economy_windows, (match_data['gold'], match_data['xp'], MS)),
+    }, workers=processor_workers, in_processes=processor_processes)
+
+    for name, seconds in timings.items():
+        PROCESSOR_SECONDS.labels(processor=name).observe(seconds)
+    if logger:
+        logger.info(f'Processors: {", ".join(f"{name} {seconds:.3f}s" for name, seconds in timings.items())}')
+
+    match_info = MetricCube.concat(*outputs.values())
+
+    column_to_category_obj: Dict[str, str] = match_info.column_to_category
+    PTD_dict = _get_PDT_objects(db_session, column_to_category_obj, PDT_objs)
+
+    # windows and totals of the metrics, window data are written from the (slot, metric, window) array
     filled_totals_data, comparison_data = postprocess_data(match_info, match.get_players_object(), MS, )
 
-    # all fields in window data are Decimal's
-    fields = [x for x in PerformanceWindowData.schema()['properties'].keys()
-              if not re.search(r'(^|_)id$', x)]
-
     GP_basic_dict = _fill_basic_PWDs(db_session=db_session,
                                      final_data=filled_totals_data,
                                      PDT_dict=PTD_dict,
-                                     PTD_dict=PerTotalData_dict,
-                                     model_fields=fields)
+                                     PTD_dict=PerTotalData_dict, )
 
     GP_comparison_dict = _fill_comparison_pws(db_session=db_session,
                                               comparison_data=comparison_data,
                                               match=match,
+                                              final_data=filled_totals_data,
                                               PerfTotalData_dict=PerTotalData_dict,
-                                              PDT_dict=PTD_dict,
-                                              model_fields=fields)
+                                              PDT_dict=PTD_dict, )
 
     all_GPs = dict()
     for x in range(10):
@@ -0,0 +1,53 @@
+import os
+from typing import Dict, List
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from dotenv import load_dotenv
+from sqlmodel import Session
+
+from db import get_sync_db_session
+from tasks.download_replay import get_match_replay
+from tasks.process_game import process_game
+from tasks.reference_data import ReferenceData
+from tasks.validate_game_replay import check_game_replay
+
+
+load_dotenv()
+
+# matches of a league processed by one task. 1 - a chain of tasks for every match
+PROCESS_GAMES_BATCH_SIZE = int(os.getenv('PROCESS_GAMES_BATCH_SIZE', default='1') or 1)
+
+logger = get_task_logger(__name__)
+
+
+@shared_task(name='process_games_batch', ignore_result=True)
+def process_games_batch(match_ids: List[int],
+                        league_id: int | None = None,
+                        first_parser: bool = True, ) -> Dict[str, List[int]]:
+    """get_match_replay, validate_game_replay and process_game_data for several matches of a league with one
+    session. Reference data is loaded once for the batch. A failed match is rolled back and the batch goes on"""
+    logger.info(f'Process batch of {len(match_ids)} matches')
+
+    db_session: Session = get_sync_db_session()
+    output = {'processed': [], 'broken': [], 'failed': [], }
+    try:
+        reference = ReferenceData(db_session)
+        for match_id in match_ids:
+            try:
+                get_match_replay(match_id=match_id, first_parser=first_parser)
+                if check_game_replay(db_session, match_id, league_id):
+                    output['broken'].append(match_id)
+                    continue
+
+                process_game(db_session, match_id, league_id, reference=reference)
+                output['processed'].append(match_id)
+            except Exception as e:
+                db_session.rollback()
+                logger.exception(f'Match {match_id} of the batch is not processed: {repr(e)}')
+                output['failed'].append(match_id)
+    finally:
+        db_session.close()
+
+    logger.info(f'Batch complete: {", ".join(f"{k} {len(v)}" for k, v in output.items())}')
+    return output
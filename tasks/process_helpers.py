@@ -10,6 +10,8 @@ from models import Game, League
 from tasks.create_league import get_or_create_league, update_league_obj_dates
 from tasks.process_game import process_game_data
 from tasks.download_replay import get_match_replay
+from tasks.process_games_batch import process_games_batch, PROCESS_GAMES_BATCH_SIZE
+from tasks.validate_game_replay import validate_game_replay
 from tasks_agg.approximate_positions import approximate_positions
 from utils import bool_pool
 
@@ -20,7 +22,9 @@ logger = get_task_logger(__name__)
 def process_game_helper(match_id: int, league_id: int | None = None, get_chain: bool = False) -> Optional[chain]:
     first_parser = next(bool_pool)
 
+    # broken replays stop the chain before any data of the game is written
     match_chain = (get_match_replay.si(match_id=match_id, first_parser=first_parser) |
+                   validate_game_replay.si(match_id=match_id, league_id=league_id) |
                    process_game_data.si(match_id=match_id, league_id=league_id))
     if get_chain:
         return match_chain
@@ -39,15 +43,20 @@ def process_league(league_obj: League | None = None,
     league_match_data = r.json()
 
     db_league_games: Dict[int, Game] = {x.id: x for x in league_obj.games}
-    new_games_found = 0
-    for idx, game in enumerate(league_match_data):
-        if game['match_id'] in db_league_games and not overwrite:
-            continue
-        else:
-            process_game_helper(match_id=game['match_id'],
+    new_match_ids = [game['match_id'] for game in league_match_data
+                     if game['match_id'] not in db_league_games or overwrite]
+
+    if PROCESS_GAMES_BATCH_SIZE > 1:
+        for start in range(0, len(new_match_ids), PROCESS_GAMES_BATCH_SIZE):
+            process_games_batch.delay(match_ids=new_match_ids[start:start + PROCESS_GAMES_BATCH_SIZE],
+                                      league_id=league_obj.id,
+                                      first_parser=next(bool_pool), )
+    else:
+        for match_id in new_match_ids:
+            process_game_helper(match_id=match_id,
                                 league_id=league_obj.id, )
 
-            new_games_found += 1
+    new_games_found = len(new_match_ids)
 
     approximate_positions.s(league_id=league_id)
     return new_games_found
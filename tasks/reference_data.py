@@ -0,0 +1,63 @@
+from typing import Dict, List, Optional
+
+from models import Hero, PerformanceDataType, PositionApproximation
+from replay_parsing import HeroNameIndex
+from tasks.process_game_replay_addtitional import get_building_dict
+from utils import get_all_sqlmodel_objs, get_positions_approximations
+
+
+_hero_name_index: Optional[HeroNameIndex] = None
+
+
+def get_hero_name_index(db_session) -> HeroNameIndex:
+    """Heroes are loaded once per worker process"""
+    global _hero_name_index
+    if _hero_name_index is None:
+        heroes = get_all_sqlmodel_objs(db_session, Hero)
+        if not heroes:
+            return HeroNameIndex()
+        _hero_name_index = HeroNameIndex.from_heroes(heroes)
+    return _hero_name_index
+
+
+class ReferenceData:
+    """Objects that don't change between the matches processed with one session: heroes, performance data types,
+    in-game buildings and position approximations of the leagues. Everything is loaded on the first use,
+    so the matches of a batch (see process_games_batch) load it once"""
+    def __init__(self, db_session):
+        self.db_session = db_session
+
+        self._heroes: Optional[Dict[int, Hero]] = None
+        self._PDT_objs: Optional[List[PerformanceDataType]] = None
+        self._buildings: Optional[dict] = None
+        self._positions: Dict[int, Dict[int, int]] = dict()  # league_id -> approximations
+
+
+    def get_heroes_dict(self) -> Dict[int, Hero]:
+        if self._heroes is None:
+            self._heroes = {x.id: x for x in get_all_sqlmodel_objs(self.db_session, Hero)}
+        return self._heroes
+
+
+    def get_hero_names(self) -> HeroNameIndex:
+        return get_hero_name_index(self.db_session)
+
+
+    def get_PDT_objs(self) -> List[PerformanceDataType]:
+        if self._PDT_objs is None:
+            self._PDT_objs = get_all_sqlmodel_objs(self.db_session, PerformanceDataType)
+        return self._PDT_objs
+
+
+    def get_building_dict(self) -> dict:
+        if self._buildings is None:
+            self._buildings = get_building_dict(self.db_session)
+        return self._buildings
+
+
+    def get_positions_approximations(self, league_id: int) -> Dict[int, int]:
+        if league_id not in self._positions:
+            self._positions[league_id] = get_positions_approximations(db_session=self.db_session,
+                                                                      model=PositionApproximation,
+                                                                      league_id=league_id)
+        return self._positions[league_id]
@@ -0,0 +1,102 @@
+from pathlib import Path
+from typing import List
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from sqlmodel import Session
+
+from db import get_sync_db_session
+from models import Game
+from replay_parsing import validate_replay, check_replay_tail
+from tasks.create_league import get_or_create_league
+from tasks.download_replay import BASE_REPLAY_PATH
+from tasks.proces_game_replay import PROCESSED_EVENTS, get_match_analyser
+from tasks.reference_data import get_hero_name_index
+from utils.json_decoder import load_json_file
+from utils.replay_files import find_replay
+
+
+logger = get_task_logger(__name__)
+
+
+class BrokenReplayError(Exception):
+    pass
+
+
+def _get_team_name(game_data: dict, side: str) -> str:
+    # OpenDota data of some matches has no {side}_team, process_game_data adds it with fix_odota_data
+    team = game_data.get(f'{side}_team', None) or dict()
+    return team.get('name', None) or game_data.get(f'{side}_name', None) or side
+
+
+def mark_game_broken(db_session, match_id: int, game_data: dict, league_id: int | None = None) -> Game:
+    """Game without any data, so the match is not processed again with its league"""
+    game = db_session.get(Game, match_id)
+    if game:
+        db_session.delete(game)
+        db_session.commit()
+
+    if not league_id:
+        league_id = (game_data.get('league', None) or dict()).get('leagueid', None) or game_data['leagueid']
+    league_obj = get_or_create_league(league_id=league_id, db_session=db_session)
+
+    game = Game(
+        id=match_id,
+
+        league=league_obj,
+        league_id=league_obj.id,
+        name=f"{_get_team_name(game_data, 'radiant')} vs {_get_team_name(game_data, 'dire')}",
+
+        patch=game_data['patch'],
+        dire_win=(not game_data['radiant_win']),
+
+        first_ten_kills_dire=False,
+        dire_lost_first_tower=False,
+
+        game_start_time=game_data['start_time'],
+        duration=game_data['duration'],
+        replay_url=game_data['replay_url'],
+
+        broken_replay=True,
+    )
+
+    db_session.add(game)
+    db_session.commit()
+    return game
+
+
+def check_game_replay(db_session, match_id: int, league_id: int | None = None) -> List[str]:
+    """Problems of the replay of a match (see validate_replay). The game is marked as broken if there are any"""
+    match_folder_path = Path(BASE_REPLAY_PATH) / str(match_id)
+    match_path = find_replay(match_folder_path, match_id)
+
+    if match_path is None:
+        problems = ['No replay file']
+    else:
+        # nothing is parsed for an incomplete replay
+        problems = check_replay_tail(match_path)
+
+    if not problems:
+        # the events of process_game_data are parsed with its settings, it loads the cached parse
+        match = get_match_analyser(match_path, match_id, get_hero_name_index(db_session))
+        problems = validate_replay(match, events=PROCESSED_EVENTS, check_tail=False)
+
+    if problems:
+        logger.error(f"Replay of match {match_id} is broken: {problems}")
+        mark_game_broken(db_session, match_id, load_json_file(match_folder_path / f'{match_id}.json'), league_id)
+    return problems
+
+
+@shared_task(name='validate_game_replay', ignore_result=True)
+def validate_game_replay(match_id: int, league_id: int | None = None) -> int:
+    """Runs between get_match_replay and process_game_data. A broken replay marks the game and stops the chain
+    before process_game_data writes anything"""
+    logger.info(f'Validate replay for {match_id}')
+
+    db_session: Session = get_sync_db_session()
+    problems = check_game_replay(db_session, match_id, league_id)
+    db_session.close()
+
+    if problems:
+        raise BrokenReplayError(f"Replay of match {match_id} is broken")
+    return match_id
@@ -0,0 +1,118 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from replay_parsing.modules import MatchSplitter, PlayerInfo
+from replay_parsing.modules.unit_codes import get_name_codes
+from replay_parsing.processors import process_damage_windows
+
+
+MOCK_WINDOWS = [
+    SimpleNamespace(name='l2', window_type='lane', exists=True, start_time=0, end_time=120, minutes=2),
+    SimpleNamespace(name='l4', window_type='lane', exists=True, start_time=120, end_time=240, minutes=2),
+    SimpleNamespace(name='l6', window_type='lane', exists=True, start_time=240, end_time=300, minutes=1),
+    SimpleNamespace(name='g15', window_type='game', exists=True, start_time=0, end_time=300, minutes=5),
+    SimpleNamespace(name='g30', window_type='game', exists=False, start_time=None, end_time=None, minutes=0),
+]
+
+MOCK_PLAYERS = [PlayerInfo(slot=0, slot_text='_0', side='sentinel', hero_npc_name='npc_dota_hero_axe'),
+                PlayerInfo(slot=5, slot_text='_5', side='dire', hero_npc_name='npc_dota_hero_lion')]
+
+MOCK_NAMES = ['npc_dota_hero_axe', 'npc_dota_hero_lion', 'npc_dota_creep_badguys_melee',
+              'npc_dota_creep_goodguys_melee', 'npc_dota_badguys_tower1_mid']
+
+AXE, LION, CREEP, GOOD_CREEP, TOWER = range(len(MOCK_NAMES))
+
+# time, value, sourcename, targetname, targetsourcename, attackerhero, targethero, attackerillusion, targetillusion
+MOCK_DAMAGE = [
+    (10, 100, AXE, LION, LION, True, True, False, False),
+    (30, 50, AXE, CREEP, CREEP, True, False, False, False),
+    (65, 20, GOOD_CREEP, LION, LION, False, True, False, False),
+    (70, 40, AXE, TOWER, TOWER, True, False, False, False),
+    (80, 25, AXE, LION, LION, False, True, False, False),  # by a summon of axe
+    (100, 60, TOWER, AXE, AXE, False, True, False, False),
+    (110, 30, LION, AXE, AXE, True, False, False, True),  # to an illusion of axe
+    (130, 300, AXE, LION, LION, True, True, False, False),
+    (200, 10, AXE, CREEP, CREEP, True, False, False, False),
+    (230, 90, LION, AXE, AXE, True, True, False, False),
+]
+
+# values of the DataFrame implementation before the bincount one. Mean and median of the minutes are swapped
+# (g15 of to_heroes of slot 0: minute sums 100, 25, 300 in 3 of 5 minutes). l6 exists without damage, g30 doesn't
+MOCK_EXPECTED = {
+    (0, 'to_all'): {
+        'sum': [215, 310, 0, 525, None],
+        'mean': [107.5, 155, 0, 86, None],
+        'median': [107.5, 155, 0, 105, None],
+        'dmg_inst': [4, 2, 0, 6, None],
+    },
+    (0, 'to_heroes'): {
+        'sum': [125, 300, 0, 425, None],
+        'mean': [62.5, 150, 0, 60, None],
+        'median': [62.5, 150, 0, 85, None],
+        'dmg_inst': [2, 1, 0, 3, None],
+    },
+    (0, 'with_summons'): {'sum': [25, 0, 0, 25, None], 'mean': [12.5, 0, 0, 5, None]},
+    (0, 'to_buildings'): {'sum': [40, 0, 0, 40, None], 'dmg_inst': [1, 0, 0, 1, None]},
+    (0, 'to_creatures'): {'sum': [50, 10, 0, 60, None], 'mean': [25, 5, 0, 12, None]},
+    (0, 'from_buildings'): {'sum': [60, 0, 0, 60, None], 'median': [30, 0, 0, 12, None]},
+    (0, 'from_all'): {'sum': [90, 90, 0, 180, None], 'mean': [45, 45, 0, 36, None]},
+    (5, 'to_illusions'): {'sum': [30, 0, 0, 30, None], 'mean': [15, 0, 0, 6, None]},
+    (5, 'from_creatures'): {'sum': [45, 0, 0, 45, None], 'dmg_inst': [2, 0, 0, 2, None]},
+    (5, 'from_all'): {
+        'sum': [145, 300, 0, 445, None],
+        'mean': [72.5, 150, 0, 60, None],
+        'median': [72.5, 150, 0, 89, None],
+        'dmg_inst': [3, 1, 0, 4, None],
+    },
+    (5, 'with_summons'): {'sum': [0, 0, 0, 0, None], 'dmg_inst': [0, 0, 0, 0, None]},
+}
+
+
+def _get_damage_df(rows: list) -> pd.DataFrame:
+    slots, categories = get_name_codes(MOCK_NAMES, {player.hero_npc_name: player.slot for player in MOCK_PLAYERS})
+    df = pd.DataFrame(rows, columns=['time', 'value', 'sourcename', 'targetname', 'targetsourcename', 'attackerhero',
+                                     'targethero', 'attackerillusion', 'targetillusion'])
+    return df.assign(sourceslot=slots[df['sourcename']], sourcecategory=categories[df['sourcename']],
+                     targetcategory=categories[df['targetname']], targetsourceslot=slots[df['targetsourcename']])
+
+
+def _get_windows(cube, slot: int, metric: str) -> list:
+    values = cube.values[slot, cube.get_positions([metric])[0],
+                         cube.get_window_positions([window.name for window in MOCK_WINDOWS])]
+    return [None if np.isnan(value) else value for value in values.tolist()]
+
+
+class DamageWindowsTest(unittest.TestCase):
+    def test_window_values(self):
+        MS = MatchSplitter(game_length=300, match_windows=MOCK_WINDOWS)
+        cube = process_damage_windows(_get_damage_df(MOCK_DAMAGE), MS, MOCK_PLAYERS)
+
+        for (slot, damage_type), aggs in MOCK_EXPECTED.items():
+            for agg_type, expected in aggs.items():
+                values = _get_windows(cube, slot, f'damage|{damage_type}__{agg_type}')
+                for value, expected_value in zip(values, expected):
+                    if expected_value is None:
+                        self.assertIsNone(value, (slot, damage_type, agg_type))
+                    else:
+                        self.assertAlmostEqual(value, expected_value, msg=(slot, damage_type, agg_type))
+
+
+    def test_totals_by_second(self):
+        # hits of one second are one row with their count, see event_buffers.EventAccumulator
+        MS = MatchSplitter(game_length=300, match_windows=MOCK_WINDOWS)
+        rows = MOCK_DAMAGE + [(130, 50, AXE, LION, LION, True, True, False, False)]
+        expected = process_damage_windows(_get_damage_df(rows), MS, MOCK_PLAYERS)
+
+        totals = _get_damage_df(MOCK_DAMAGE).assign(count=1)
+        totals.loc[totals['time'] == 130, ['value', 'count']] = [350, 2]
+        cube = process_damage_windows(totals, MS, MOCK_PLAYERS)
+
+        np.testing.assert_array_equal(cube.values, expected.values)
+        self.assertEqual(_get_windows(cube, 0, 'damage|to_heroes__dmg_inst'), [2, 2, 0, 4, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
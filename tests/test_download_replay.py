@@ -0,0 +1,163 @@
+import json
+import tempfile
+import unittest
+from functools import partial
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+import requests
+
+from replay_parsing.modules.match_analyser import MatchAnalyser
+from tasks.download_replay import _iter_lines, parse_replay, get_match_replay, _jsonl_exists_and_valid, \
+    PARSER_CONNECT_TIMEOUT, PARSER_READ_TIMEOUT
+from utils.replay_files import open_replay, get_replay_path
+
+
+MOCK_HEROES = ['Axe', 'Lion', 'Lina', 'Sven', 'Tiny', 'Riki', 'Viper', 'Razor', 'Clinkz', 'Ursa']
+
+MOCK_LINES = [
+    *[f'{{"time":{time},"type":"interval","slot":{slot},"unit":"CDOTA_Unit_Hero_{hero}","hero_id":{slot + 1},'
+      f'"gold":{time * 10}}}' for time in range(0, 200, 20) for slot, hero in enumerate(MOCK_HEROES)],
+    '{"time":30,"type":"DOTA_COMBATLOG_GOLD","value":40,"targetname":"npc_dota_hero_axe","gold_reason":13}',
+    '{"time":31,"type":"DOTA_COMBATLOG_DAMAGE","value":5,"attackername":"npc_dota_hero_axe",'
+    '"targetname":"npc_dota_hero_lion","sourcename":"npc_dota_hero_axe","targetsourcename":"npc_dota_hero_lion",'
+    '"attackerhero":true,"targethero":true}',
+    '{"time":200,"type":"cosmetics","key":"{}"}',
+    '{"time":200,"type":"dotaplus","key":"{}"}',
+    '{"time":200,"type":"epilogue","key":"{}"}',
+]
+
+MOCK_OUTPUT = ('\n'.join(MOCK_LINES) + '\n').encode()
+
+
+def _get_response(chunks: list) -> mock.MagicMock:
+    response = mock.MagicMock()
+    response.__enter__.return_value = response
+    response.iter_content.return_value = iter(chunks)
+    return response
+
+
+def _split(data: bytes, size: int) -> list:
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+class IterLinesTest(unittest.TestCase):
+    def test_lines_across_chunks(self):
+        chunks = [b'{"a":', b'1}\n{"b"', b':2}\n', b'\n{"c":3}\n']
+
+        self.assertListEqual(list(_iter_lines(chunks)), [b'{"a":1}\n', b'{"b":2}\n', b'\n', b'{"c":3}\n'])
+
+
+    def test_last_line_without_newline(self):
+        self.assertListEqual(list(_iter_lines([b'{"a":1}\n{"b"', b':2}'])), [b'{"a":1}\n', b'{"b":2}'])
+        self.assertListEqual(list(_iter_lines([])), [])
+
+
+class ParseReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.dem_file = Path(self.folder.name) / '1.dem'
+        self.dem_file.write_bytes(b'demo')
+        self.replay_file = Path(self.folder.name) / '1.jsonl'
+
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+
+    def _parse(self, response: mock.MagicMock) -> bool:
+        with mock.patch('tasks.download_replay.requests.post', return_value=response) as post:
+            output = parse_replay(self.dem_file, self.replay_file, match_id=1)
+
+        self.assertEqual(post.call_args.kwargs['timeout'], (PARSER_CONNECT_TIMEOUT, PARSER_READ_TIMEOUT))
+        return output
+
+
+    def test_fed_lines_match_file_parse(self):
+        # odd chunk size, so lines are split between the chunks
+        self.assertTrue(self._parse(_get_response(_split(MOCK_OUTPUT, 97))))
+        self.assertEqual(self.replay_file.read_bytes(), MOCK_OUTPUT)
+
+        # frames of the cache saved by finish_feed
+        with mock.patch('replay_parsing.modules.match_analyser.ReplayScanner', side_effect=AssertionError):
+            fed = MatchAnalyser(self.replay_file)
+            fed_frames = fed.get_match_data()
+
+        parsed = MatchAnalyser(self.replay_file, use_cache=False)
+        parsed_frames = parsed.get_match_data()
+
+        self.assertSetEqual(set(fed_frames), set(parsed_frames))
+        for table_name, frame in parsed_frames.items():
+            pd.testing.assert_frame_equal(fed_frames[table_name], frame)
+        self.assertEqual(fed.match_windows, parsed.match_windows)
+        self.assertListEqual(fed.get_players(), parsed.get_players())
+
+
+    def test_incomplete_output(self):
+        output = ('\n'.join(MOCK_LINES[:-2]) + '\n').encode()
+
+        self.assertFalse(self._parse(_get_response(_split(output, 97))))
+        self.assertListEqual(list(Path(self.folder.name).glob('1.*jsonl*')), [])
+
+
+    def test_failed_response(self):
+        def chunks():
+            yield MOCK_OUTPUT[:500]
+            raise requests.exceptions.ChunkedEncodingError('connection reset')
+
+        response = _get_response([])
+        response.iter_content.return_value = chunks()
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            self._parse(response)
+        self.assertListEqual(list(Path(self.folder.name).glob('1.*jsonl*')), [])
+
+
+class ReplayFileTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.match_folder = Path(self.folder.name) / '1'
+        self.match_folder.mkdir()
+
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+
+    def test_valid_replay(self):
+        for compression in ['none', 'gzip']:
+            path = get_replay_path(self.match_folder, 1, compression=compression)
+            with open_replay(path, 'wb') as file:
+                file.write(MOCK_OUTPUT)
+            self.assertTrue(_jsonl_exists_and_valid(path))
+
+            with open_replay(path, 'wb') as file:
+                file.write(MOCK_OUTPUT[:-100])
+            self.assertFalse(_jsonl_exists_and_valid(path))
+            self.assertFalse(path.exists())
+
+
+    def test_invalid_raw_replay_is_written_compressed(self):
+        (self.match_folder / '1.json').write_text(json.dumps({'replay_url': 'http://replay/1.dem.bz2'}))
+        (self.match_folder / '1.dem.bz2').write_bytes(b'bz2')
+        (self.match_folder / '1.dem').write_bytes(b'dem')
+        raw_file = self.match_folder / '1.jsonl'
+        raw_file.write_bytes(MOCK_OUTPUT[:-100])
+
+        def parse(dem_file, replay_file, port, match_id):
+            with open_replay(replay_file, 'wb') as file:
+                file.write(MOCK_OUTPUT)
+            return True
+
+        with mock.patch('tasks.download_replay.BASE_REPLAY_PATH', self.folder.name), \
+                mock.patch('tasks.download_replay.get_replay_path', partial(get_replay_path, compression='gzip')), \
+                mock.patch('tasks.download_replay.parse_replay', side_effect=parse) as parse_mock:
+            self.assertEqual(get_match_replay(1), 1)
+
+        self.assertEqual(parse_mock.call_args.args[1], self.match_folder / '1.jsonl.gz')
+        self.assertFalse(raw_file.exists())
+        self.assertTrue(_jsonl_exists_and_valid(self.match_folder / '1.jsonl.gz'))
+
+
+if __name__ == '__main__':
+    unittest.main()
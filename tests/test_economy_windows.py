@@ -0,0 +1,72 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from replay_parsing.modules import MatchSplitter
+from replay_parsing.processors import process_economy_windows
+
+
+MOCK_WINDOWS = [
+    SimpleNamespace(name='l2', window_type='lane', exists=True, start_time=0, end_time=120, minutes=2),
+    SimpleNamespace(name='l4', window_type='lane', exists=True, start_time=120, end_time=240, minutes=2),
+    SimpleNamespace(name='g15', window_type='game', exists=True, start_time=0, end_time=900, minutes=15),
+    SimpleNamespace(name='g30', window_type='game', exists=False, start_time=None, end_time=None, minutes=None),
+]
+
+MOCK_GOLD = pd.DataFrame({'time': [10, 20, 130, 300, 50],
+                          'value': [40.0, 60.0, 100.0, 25.0, 600.0],
+                          'targetslot': [0, 0, 3, 3, 1],
+                          'gold_reason': [13, 13, 12, 17, 0]})
+
+MOCK_XP = pd.DataFrame({'time': [10, 130, 130, 1000],
+                        'value': [57, 120, 0, 30],
+                        'targetslot': [2, 2, 5, 5],
+                        'xp_reason': [2, 1, 1, 0]})
+
+# values of the gold and xp processors before the grouped ones in l2, l4 and g15. Starting gold (reason 0) is
+# skipped, xp out of the windows isn't counted, zero xp is written but has no rate. Other windows of the existing
+# ones are 0, g30 doesn't exist
+MOCK_EXPECTED = {
+    (0, 'gold|gold for killing creeps'): [100, 0, 100],
+    (0, 'gold|gold for killing creeps pm'): [50, 0, 100 / 15],
+    (3, 'gold|gold for killing heroes'): [0, 100, 100],
+    (3, 'gold|gold for killing heroes pm'): [0, 50, 100 / 15],
+    (3, 'gold|gold runes'): [0, 0, 25],
+    (3, 'gold|gold runes pm'): [0, 0, 25 / 15],
+    (2, 'xp|xp for heroes'): [0, 120, 120],
+    (2, 'xp|xp for heroes pm'): [0, 60, 8],
+    (2, 'xp|xp for creeps'): [57, 0, 57],
+    (2, 'xp|xp for creeps pm'): [28.5, 0, 3.8],
+}
+
+
+class EconomyWindowsTest(unittest.TestCase):
+    def test_window_values(self):
+        MS = MatchSplitter(game_length=900, match_windows=MOCK_WINDOWS)
+        cube = process_economy_windows(MOCK_GOLD.copy(), MOCK_XP.copy(), MS)
+
+        windows = cube.get_window_positions([window.name for window in MOCK_WINDOWS])
+        expected = np.zeros((10, len(cube.metrics), len(windows)))
+        expected[..., -1] = np.nan
+        for (slot, metric), values in MOCK_EXPECTED.items():
+            expected[slot, cube.get_positions([metric])[0], :-1] = values
+
+        np.testing.assert_allclose(cube.values[..., windows], expected)
+        self.assertIn('xp|xp for heroes', cube.metrics)
+        self.assertIn('gold|gold for assist', cube.metrics)
+
+
+    def test_counts_of_accumulated_rows(self):
+        # rows of per second totals (see event_buffers.EventAccumulator) give the same sums
+        MS = MatchSplitter(game_length=900, match_windows=MOCK_WINDOWS)
+        gold = pd.DataFrame({'time': [10, 130, 300, 50], 'value': [100.0, 100.0, 25.0, 600.0], 'count': [2, 1, 1, 1],
+                             'targetslot': [0, 3, 3, 1], 'gold_reason': [13, 12, 17, 0]})
+
+        np.testing.assert_array_equal(process_economy_windows(gold, MOCK_XP.assign(count=1), MS).values,
+                                      process_economy_windows(MOCK_GOLD.copy(), MOCK_XP.copy(), MS).values)
+
+
+if __name__ == '__main__':
+    unittest.main()
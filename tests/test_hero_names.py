@@ -0,0 +1,44 @@
+import unittest
+from types import SimpleNamespace
+
+from replay_parsing.modules.descriptors import PlayerInfo
+from replay_parsing.modules.hero_names import HeroNameIndex
+
+
+MOCK_HEROES = [
+    SimpleNamespace(id=2, npc_name='npc_dota_hero_axe', npc_name_alias=None, cdota_name='CDOTA_Unit_Hero_Axe'),
+    SimpleNamespace(id=26, npc_name='npc_dota_hero_lion', npc_name_alias=None, cdota_name=None),
+    SimpleNamespace(id=21, npc_name='npc_dota_hero_windrunner', npc_name_alias='npc_dota_hero_windranger',
+                    cdota_name='CDOTA_Unit_Hero_Windrunner'),
+]
+
+MOCK_PLAYERS = [
+    PlayerInfo(slot=0, slot_text='_0', side='sentinel', hero_id=2, hero_name_cdota='CDOTA_Unit_Hero_Axe'),
+    PlayerInfo(slot=1, slot_text='_1', side='sentinel', hero_id=21, hero_name_cdota='CDOTA_Unit_Hero_Windrunner'),
+    PlayerInfo(slot=5, slot_text='_5', side='dire', hero_id=74, hero_name_cdota='CDOTA_Unit_Hero_Invoker'),
+]
+
+
+class HeroNameIndexTest(unittest.TestCase):
+    def test_resolve(self):
+        index = HeroNameIndex.from_heroes(MOCK_HEROES)
+        names = ['npc_dota_hero_windranger', 'npc_dota_hero_axe', 'npc_dota_hero_windrunner',
+                 'npc_dota_hero_invoker', 'npc_dota_hero_lion', 'npc_dota_hero_unknown_unit']
+        resolution = index.resolve(MOCK_PLAYERS, names)
+
+        self.assertDictEqual(resolution['slots'], {
+            'npc_dota_hero_axe': 0,
+            'npc_dota_hero_windrunner': 1,
+            'npc_dota_hero_windranger': 1,
+            'npc_dota_hero_invoker': 5,
+        })
+        self.assertListEqual(list(resolution['slots'])[:2], ['npc_dota_hero_axe', 'npc_dota_hero_windrunner'])
+        self.assertListEqual(resolution['normalised'], ['npc_dota_hero_invoker'])
+        self.assertListEqual(resolution['unresolved'], ['npc_dota_hero_lion', 'npc_dota_hero_unknown_unit'])
+
+
+    def test_empty_index(self):
+        resolution = HeroNameIndex().resolve(MOCK_PLAYERS, ['npc_dota_hero_axe', 'npc_dota_hero_windrunnerr'])
+
+        self.assertListEqual(resolution['normalised'], ['npc_dota_hero_axe'])
+        self.assertListEqual(resolution['fuzzy'], ['npc_dota_hero_windrunnerr'])
@@ -0,0 +1,73 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from replay_parsing.modules.match_splitter import MatchSplitter
+from replay_parsing.processors.interval import aggregate_interval_windows
+from replay_parsing.windows import INTERVAL_WINDOWS
+
+
+MOCK_WINDOWS = [
+    SimpleNamespace(name='l2', window_type='lane', exists=True, start_time=0, end_time=150),
+    SimpleNamespace(name='l4', window_type='lane', exists=True, start_time=150, end_time=200),
+    SimpleNamespace(name='g15', window_type='game', exists=True, start_time=0, end_time=200),
+]
+
+MOCK_TIME = np.arange(1, 201)
+
+MOCK_SLOT_COLUMNS = [
+    {'gold': 2 * MOCK_TIME, 'xp': MOCK_TIME, 'lh': MOCK_TIME // 5, 'kills': MOCK_TIME // 50,
+     'deaths': MOCK_TIME // 100, 'assists': MOCK_TIME // 30, 'x': MOCK_TIME * 1.0, 'y': MOCK_TIME * 0.0,
+     'camps_stacked': MOCK_TIME // 70, 'creeps_stacked': MOCK_TIME // 90,
+     'teamfight_participation': (MOCK_TIME % 10) / 10},
+    {'gold': 3 * MOCK_TIME + 100 * (MOCK_TIME // 60), 'xp': 2 * MOCK_TIME, 'lh': MOCK_TIME // 4,
+     'kills': MOCK_TIME // 100, 'deaths': MOCK_TIME // 40, 'assists': 0, 'x': MOCK_TIME * 2.0, 'y': MOCK_TIME * 1.0,
+     'camps_stacked': 0, 'creeps_stacked': MOCK_TIME // 60, 'teamfight_participation': 0.5},
+]
+
+MOCK_ZERO_COLUMNS = ['level', 'obs_placed', 'sen_placed', 'rune_pickups', 'towers_killed', 'roshans_killed',
+                     'networth']
+
+# values of the per window implementation before the grouped one, groups are (l2, 0), (l2, 1), (l4, 0), (l4, 1),
+# (g15, 0), (g15, 1). l4 is shorter than a minute, so there are no per minute gains
+MOCK_EXPECTED = {
+    ('gold', 'max'): [300, 650, 400, 900, 400, 900],
+    ('gold', 'gained_pm_median'): [120, 280, np.nan, np.nan, 120, 280],
+    ('gold', 'gained_pw'): [298, 647, 98, 247, 398, 897],
+    ('gold', 'avg_(by_length)_pm'): [119.2, 258.8, 117.6, 296.4, 119.4, 269.1],
+    ('gold', 'max_global_perc'): [300 / 950, 650 / 950, 400 / 1300, 900 / 1300, 400 / 1300, 900 / 1300],
+    ('xp', 'max_global_perc'): [1 / 3, 2 / 3, 1 / 3, 2 / 3, 1 / 3, 2 / 3],
+    ('kills', 'max_global_perc'): [3 / 4, 1 / 4, 2 / 3, 1 / 3, 2 / 3, 1 / 3],
+    ('deaths', 'max_global_perc'): [1 / 4, 3 / 4, 2 / 7, 5 / 7, 2 / 7, 5 / 7],
+    ('movement', 'sum'): [149, 745, 49, 245, 199, 995],
+    ('movement', 'avg_(by_length)_pm'): [59.6, 298, 58.8, 294, 59.7, 298.5],
+    ('kda', 'max'): [5.5, 1, 7, 2, 7, 2],
+    ('stacked', 'max'): [3, 2, 4, 3, 4, 3],
+    ('teamfight_participation', 'avg'): [0.45, 0.5, 0.45, 0.5, 0.45, 0.5],
+    ('teamfight_participation', 'min'): [0, 0.5, 0, 0.5, 0, 0.5],
+}
+
+
+def _get_mock_df() -> pd.DataFrame:
+    df = pd.concat([pd.DataFrame({'time': MOCK_TIME, 'slot': slot, **columns})
+                    for slot, columns in enumerate(MOCK_SLOT_COLUMNS)])
+    df = df.sort_values(['time', 'slot'], kind='stable').reset_index(drop=True)
+    return df.assign(**{column: 0 for column in MOCK_ZERO_COLUMNS})
+
+
+class IntervalAggregationTest(unittest.TestCase):
+    def test_window_values(self):
+        MS = MatchSplitter(game_length=200, match_windows=MOCK_WINDOWS)
+        windows, slots, values = aggregate_interval_windows(_get_mock_df(), MS, INTERVAL_WINDOWS.values())
+
+        np.testing.assert_array_equal(windows, [0, 0, 1, 1, 2, 2])
+        np.testing.assert_array_equal(slots, [0, 1, 0, 1, 0, 1])
+        for aggregation, expected in MOCK_EXPECTED.items():
+            np.testing.assert_allclose(values[aggregation], expected, err_msg=str(aggregation))
+        self.assertSetEqual(set(values), set(INTERVAL_WINDOWS.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import dataclasses
+import unittest
+
+from replay_parsing.modules.match_analyser import MatchPlayersData
+
+
+MOCK_POSITIONS = [1, 2, 3, 4, 5, 3, 2, 1, 5, 4]
+
+
+class MatchPlayersDataTest(unittest.TestCase):
+    def test_opponents(self):
+        players = MatchPlayersData()
+        players.set_position_from_list(MOCK_POSITIONS)
+
+        self.assertTupleEqual(players[0].opponents, (5, 7))
+        self.assertTupleEqual(players[1].opponents, (6, ))
+        self.assertTupleEqual(players[9].opponents, (3, 4))
+        self.assertEqual(players[8].position_name, players[4].position_name)
+
+
+    def test_players_are_replaced(self):
+        players = MatchPlayersData()
+        player = players[0]
+        players.update_slot_info(0, hero_id=2)
+
+        self.assertIsNone(player.hero_id)
+        self.assertEqual(players[0].hero_id, 2)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            players[0].hero_id = 3
@@ -0,0 +1,42 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from replay_parsing.modules.match_splitter import MatchSplitter
+
+
+MOCK_WINDOWS = [
+    SimpleNamespace(name='l2', window_type='lane', exists=True, start_time=0, end_time=2),
+    SimpleNamespace(name='l4', window_type='lane', exists=True, start_time=2, end_time=4),
+    SimpleNamespace(name='g15', window_type='game', exists=True, start_time=0, end_time=3),
+    SimpleNamespace(name='g30', window_type='game', exists=False, start_time=None, end_time=None),
+]
+
+MOCK_DF = pd.DataFrame({'time': [0, 1, 2, 3, 4, 5], 'value': [1, 2, 3, 4, 5, 6]})
+
+
+class MatchSplitterTest(unittest.TestCase):
+    def setUp(self):
+        self.MS = MatchSplitter(game_length=5, match_windows=MOCK_WINDOWS)
+
+
+    def test_window_codes(self):
+        game, lane = self.MS.get_window_codes(MOCK_DF['time'].to_numpy())
+
+        np.testing.assert_array_equal(lane, [-1, 0, 0, 1, 1, -1])
+        np.testing.assert_array_equal(game, [-1, 2, 2, 2, -1, -1])
+
+
+    def test_assign_windows(self):
+        sums = self.MS.assign_windows(MOCK_DF).groupby('window')['value'].sum().to_dict()
+
+        self.assertDictEqual(sums, {0: 5, 1: 9, 2: 9})
+
+
+    def test_base_values(self):
+        values = dict(zip(self.MS.window_values_names, self.MS.get_base_values().tolist()))
+
+        self.assertEqual(values['l4'], 0)
+        self.assertTrue(np.isnan(values['g30']))
@@ -0,0 +1,61 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from replay_parsing.modules.match_splitter import MatchSplitter
+from replay_parsing.modules.metric_cube import MetricCube
+
+
+MOCK_WINDOWS = [
+    SimpleNamespace(name='l2', window_type='lane', exists=True, start_time=0, end_time=120, minutes=2),
+    SimpleNamespace(name='g15', window_type='game', exists=True, start_time=0, end_time=900, minutes=15),
+    SimpleNamespace(name='g30', window_type='game', exists=False, start_time=None, end_time=None, minutes=None),
+]
+
+MOCK_WARDS_WINDOWS = {'placed_db': 'placed'}
+MOCK_INTERVAL_WINDOWS = {'gold_db': ('gold', 'max')}
+
+
+def _add_name(name: str) -> str:
+    return f'mock|{name}'
+
+
+class MetricCubeTest(unittest.TestCase):
+    def setUp(self):
+        self.MS = MatchSplitter(game_length=900, match_windows=MOCK_WINDOWS)
+
+
+    def test_fill_windows(self):
+        cube = MetricCube.from_windows(self.MS, MOCK_WARDS_WINDOWS, _add_name)
+        values = np.arange(30).reshape(3, 10)
+
+        cube.fill_windows(self.MS, 'mock|placed', values, mask=values % 10 < 2)
+
+        positions = cube.get_window_positions(['l2', 'g15', 'g30', 'l4'])
+        np.testing.assert_array_equal(cube.values[1, 0, positions], [1, 11, np.nan, 0])
+        np.testing.assert_array_equal(cube.values[2, 0, positions], [0, 0, np.nan, 0])
+
+
+    def test_concat(self):
+        cube = MetricCube.concat(MetricCube.from_windows(self.MS, MOCK_WARDS_WINDOWS, _add_name),
+                                 MetricCube.from_windows(self.MS, MOCK_INTERVAL_WINDOWS, _add_name))
+
+        self.assertListEqual(cube.metrics, ['mock|placed', 'mock|gold__max'])
+        self.assertDictEqual(cube.column_to_category, {'placed': 'placed_db', 'gold__max': 'gold_db'})
+        self.assertEqual(cube.values.shape, (10, 2, len(self.MS.window_values_names)))
+        self.assertListEqual(cube.get_positions(['mock|gold__max']), [1])
+
+        with self.assertRaises(ValueError):
+            MetricCube.concat(cube, MetricCube.from_windows(self.MS, MOCK_WARDS_WINDOWS, _add_name))
+
+
+    def test_unknown_metric(self):
+        cube = MetricCube.from_windows(self.MS, MOCK_WARDS_WINDOWS, _add_name)
+
+        with self.assertRaises(KeyError):
+            cube.get_positions(['mock|unknown'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from types import SimpleNamespace
+
+import pandas as pd
+
+from replay_parsing.modules.match_splitter import MatchSplitter
+from replay_parsing.modules.metric_cube import MetricCube
+from replay_parsing.modules.metric_plan import MetricPlan, MetricSpec
+
+
+MOCK_WINDOWS = [
+    SimpleNamespace(name='l2', window_type='lane', exists=True, start_time=0, end_time=120, minutes=2),
+    SimpleNamespace(name='g15', window_type='game', exists=True, start_time=0, end_time=900, minutes=15),
+]
+
+MOCK_DF = pd.DataFrame({'time': [10, 20, 300, 30],
+                        'slot': [0, 0, 0, 4],
+                        'target': [1, 2, 3, -1],
+                        'reason': [1, 2, 1, 1],
+                        'value': [10, 20, 30, 40]})
+
+MOCK_SPECS = [
+    MetricSpec('events', table='events'),
+    MetricSpec('first', table='events', reducer='sum', value='value', where=('reason', 1)),
+    MetricSpec('first pm', table='events', reducer='sum', value='value', where=('reason', 1), per_minute=True),
+    MetricSpec('second avg', table='events', reducer='mean', value='value', where=('reason', 2)),
+    MetricSpec('targeted', table='events', slot='target'),
+]
+
+
+def _get_windows(cube: MetricCube, slot: int, metric: str) -> dict:
+    values = cube.values[slot, cube.get_positions([metric])[0], cube.get_window_positions(['l2', 'g15'])]
+    return dict(zip(['l2', 'g15'], values.tolist()))
+
+
+class MetricPlanTest(unittest.TestCase):
+    def test_passes(self):
+        plan = MetricPlan(MOCK_SPECS)
+
+        self.assertListEqual([(x.slot, x.where_column, x.where_values) for x in plan.passes],
+                             [('slot', None, ()), ('slot', 'reason', (1, 2)), ('target', None, ())])
+
+
+    def test_execute(self):
+        MS = MatchSplitter(900, MOCK_WINDOWS)
+        cube = MetricCube.from_windows(MS, {spec.name: spec.name for spec in MOCK_SPECS}, lambda name: name)
+        cube = MetricPlan(MOCK_SPECS).execute({'events': MOCK_DF}, MS, cube, lambda name: name)
+
+        self.assertDictEqual(_get_windows(cube, 0, 'events'), {'l2': 2, 'g15': 3})
+        self.assertDictEqual(_get_windows(cube, 0, 'first'), {'l2': 10, 'g15': 40})
+        self.assertDictEqual(_get_windows(cube, 0, 'first pm'), {'l2': 5.0, 'g15': 40 / 15})
+        self.assertDictEqual(_get_windows(cube, 4, 'second avg'), {'l2': 0, 'g15': 0})
+        self.assertDictEqual(_get_windows(cube, 0, 'second avg'), {'l2': 20.0, 'g15': 20.0})
+        self.assertDictEqual(_get_windows(cube, 3, 'targeted'), {'l2': 0, 'g15': 1})
+
+
+    def test_counts_of_accumulated_rows(self):
+        MS = MatchSplitter(900, MOCK_WINDOWS)
+        cube = MetricCube.from_windows(MS, {spec.name: spec.name for spec in MOCK_SPECS}, lambda name: name)
+        cube = MetricPlan(MOCK_SPECS).execute({'events': MOCK_DF.assign(count=[1, 4, 2, 1])}, MS, cube,
+                                              lambda name: name)
+
+        self.assertDictEqual(_get_windows(cube, 0, 'events'), {'l2': 5, 'g15': 7})
+        self.assertDictEqual(_get_windows(cube, 0, 'first'), {'l2': 10, 'g15': 40})
+        self.assertDictEqual(_get_windows(cube, 0, 'second avg'), {'l2': 5.0, 'g15': 5.0})
+
+
+    def test_unknown_reducer(self):
+        with self.assertRaises(NameError):
+            MetricPlan([MetricSpec('x', table='events', reducer='median', value='value')])
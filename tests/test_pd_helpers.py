@@ -0,0 +1,21 @@
+import unittest
+
+import pandas as pd
+
+from parsing_utils.pd_helpers import iterate_df
+
+
+MOCK_DF = pd.DataFrame({'time': [10, 20], 'value': [1.5, None], 'data': ['gold', 'xp']}, index=[3, 4])
+
+
+class IterateDfTest(unittest.TestCase):
+    def test_rows(self):
+        rows = list(iterate_df(MOCK_DF))
+
+        self.assertListEqual([index for index, _ in rows], [4, 5])
+        self.assertDictEqual(rows[0][1], {'time': 10, 'value': 1.5, 'data': 'gold'})
+        self.assertIs(type(rows[0][1]['time']), int)
+
+
+    def test_matches_to_dict(self):
+        self.assertDictEqual(dict(iterate_df(MOCK_DF[['time']], use_offset=False)), MOCK_DF[['time']].T.to_dict())
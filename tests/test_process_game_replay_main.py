@@ -0,0 +1,45 @@
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+import numpy as np
+
+from models import PerformanceDataType
+from replay_parsing.modules.metric_cube import MetricCube
+from tasks.process_game_replay_main import _fill_basic_PWDs, PMH
+
+
+MOCK_COLUMNS = ['l2', 'g15', 'g30', 'ltotal', 'gtotal']
+
+MOCK_SLOT_VALUES = np.array([[2, 2.345, np.nan, 2, 2.345],
+                             [0, np.inf, np.nan, 0, -1.5]])
+
+# windows of the values: decimals of 2 places (the float 2.345 is a bit higher than 2.345), zero isn't converted,
+# inf and NaN are None
+MOCK_EXPECTED = [
+    ('placed_db', [Decimal('2.00'), Decimal('2.35'), None, Decimal('2.00'), Decimal('2.35')]),
+    ('gold_db', [0, None, None, 0, Decimal('-1.50')]),
+]
+
+
+class FillWindowDataTest(unittest.TestCase):
+    def test_basic_window_data(self):
+        values = np.zeros((10, 2, len(MOCK_COLUMNS)))
+        values[3] = MOCK_SLOT_VALUES
+        cube = MetricCube(metrics=['mock|placed', 'mock|gold__max'], parsing_names=['placed', 'gold__max'],
+                          db_names=['placed_db', 'gold_db'], windows=MOCK_COLUMNS, values=values)
+        PDT_dict = {'placed': PerformanceDataType(name='placed_db'), 'gold__max': PerformanceDataType(name='gold_db')}
+
+        # masks of the empty windows are set by PerformanceMaskHandler
+        with mock.patch.object(PMH, 'set_empty_status') as set_empty_status:
+            output = _fill_basic_PWDs(mock.MagicMock(), cube, PDT_dict, {x: mock.MagicMock() for x in range(10)})
+
+        self.assertEqual(set_empty_status.call_count, 20)
+        self.assertListEqual(list(output), list(range(10)))
+        self.assertListEqual([(x.data_type.name, [getattr(x, column) for column in MOCK_COLUMNS])
+                              for x in output[3].window_data], MOCK_EXPECTED)
+        self.assertListEqual([x.l2 for x in output[0].window_data], [0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from unittest import mock
+
+from tasks.process_games_batch import process_games_batch
+
+
+MOCK_MATCH_IDS = [1, 2, 3, 4]
+
+MOCK_BROKEN_MATCH_ID = 3
+
+MOCK_FAILED_MATCH_ID = 2
+
+
+def _process_game(db_session, match_id, league_id, reference):
+    # the objects of the match are added before the processor fails
+    db_session.add(match_id)
+    if match_id == MOCK_FAILED_MATCH_ID:
+        raise ValueError('Processor failed')
+
+
+class ProcessGamesBatchTest(unittest.TestCase):
+    def _run(self) -> tuple:
+        db_session = mock.MagicMock()
+        patches = {
+            'get_sync_db_session': mock.MagicMock(return_value=db_session),
+            'ReferenceData': mock.MagicMock(),
+            'get_match_replay': mock.MagicMock(),
+            'check_game_replay': mock.MagicMock(side_effect=lambda session, match_id, league_id:
+                                                ['No replay file'] if match_id == MOCK_BROKEN_MATCH_ID else []),
+            'process_game': mock.MagicMock(side_effect=_process_game),
+            'logger': mock.MagicMock(),
+        }
+        with mock.patch.multiple('tasks.process_games_batch', **patches):
+            output = process_games_batch(MOCK_MATCH_IDS, league_id=10)
+        return output, db_session, patches
+
+
+    def test_failed_match_is_rolled_back(self):
+        output, db_session, patches = self._run()
+
+        self.assertDictEqual(output, {'processed': [1, 4], 'broken': [3], 'failed': [2]})
+        self.assertListEqual([x.args[0] for x in db_session.add.call_args_list], [1, 2, 4])
+        self.assertListEqual([x[0] for x in db_session.method_calls if x[0] in ['add', 'rollback', 'close']],
+                             ['add', 'add', 'rollback', 'add', 'close'])
+        patches['logger'].exception.assert_called_once()
+        self.assertIn('Match 2', patches['logger'].exception.call_args.args[0])
+
+
+    def test_session_is_closed_on_error(self):
+        db_session = mock.MagicMock()
+        with mock.patch('tasks.process_games_batch.get_sync_db_session', return_value=db_session), \
+                mock.patch('tasks.process_games_batch.ReferenceData', side_effect=ValueError('No database')):
+            with self.assertRaises(ValueError):
+                process_games_batch(MOCK_MATCH_IDS)
+        db_session.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
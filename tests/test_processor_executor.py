@@ -0,0 +1,31 @@
+import operator
+import unittest
+
+from replay_parsing.processors.executor import run_processors
+
+
+MOCK_CALLS = {
+    'add': (operator.add, (1, 2)),
+    'mul': (operator.mul, (3, 4)),
+    'pow': (pow, (2, 10)),
+}
+
+
+class ProcessorExecutorTest(unittest.TestCase):
+    def _check(self, **kwargs):
+        outputs, timings = run_processors(MOCK_CALLS, **kwargs)
+
+        self.assertListEqual(list(outputs.items()), [('add', 3), ('mul', 12), ('pow', 1024)])
+        self.assertListEqual(list(timings), list(MOCK_CALLS))
+
+
+    def test_sequential(self):
+        self._check()
+
+
+    def test_threads(self):
+        self._check(workers=2)
+
+
+    def test_processes(self):
+        self._check(workers=2, in_processes=['pow'])
@@ -0,0 +1,93 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from replay_parsing.modules.match_analyser import MatchAnalyser
+from replay_parsing.modules.replay_cache import save_replay_cache, load_replay_cache, get_cache_path
+
+
+MOCK_TABLES = {
+    'gold': {
+        'time': np.array([1, 2, 3], dtype=np.int64),
+        'value': np.array([10, 20, 30], dtype=np.int64),
+        'targetname': np.array([0, 1, 0], dtype=np.int32),
+    },
+}
+
+MOCK_NAMES = ['npc_dota_hero_axe', 'npc_dota_hero_lion']
+
+MOCK_META = {'game_total_length': 3}
+
+MOCK_REPLAY_LINES = [f'{{"time":{time},"type":"interval","slot":0,"unit":"CDOTA_Unit_Hero_Axe","hero_id":2}}'
+                     for time in range(10, 300, 30)]
+
+MOCK_WINDOWS = [(1, 'w1', 'lane', -90, 100), (2, 'w2', 'lane', 100, 400)]
+
+
+class ReplayCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.replay_path = Path(self.folder.name) / '1.jsonl'
+        self.replay_path.write_text('{"time":1,"type":"interval"}\n')
+
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+
+    def test_roundtrip(self):
+        save_replay_cache(self.replay_path, MOCK_TABLES, MOCK_NAMES, MOCK_META)
+        cache = load_replay_cache(self.replay_path)
+
+        self.assertListEqual(cache['names'], MOCK_NAMES)
+        self.assertDictEqual(cache['meta'], MOCK_META)
+        for column, values in MOCK_TABLES['gold'].items():
+            np.testing.assert_array_equal(cache['tables']['gold'][column], values)
+
+
+    def test_changed_replay(self):
+        save_replay_cache(self.replay_path, MOCK_TABLES, MOCK_NAMES, MOCK_META)
+        self.replay_path.write_text('{"time":1,"type":"interval"}\n{"time":2,"type":"interval"}\n')
+        self.assertIsNone(load_replay_cache(self.replay_path))
+
+
+    def test_broken_cache(self):
+        get_cache_path(self.replay_path).write_bytes(b'not a cache')
+        self.assertIsNone(load_replay_cache(self.replay_path))
+
+
+    def test_windows_of_the_analyser(self):
+        self.replay_path.write_text('\n'.join(MOCK_REPLAY_LINES) + '\n')
+        MatchAnalyser(self.replay_path).get_match_data()
+
+        with mock.patch('replay_parsing.modules.match_analyser.ReplayScanner', side_effect=AssertionError):
+            match = MatchAnalyser(self.replay_path, windows=MOCK_WINDOWS)
+            match.get_match_data()
+
+        self.assertListEqual([(x.name, x.start_time, x.end_time) for x in match.match_windows],
+                             [('w1', 40, 70), ('w2', 100, 280)])
+        self.assertEqual(match.game_length, 280)
+
+
+    def test_lazy_frames_of_a_partial_parse(self):
+        self.replay_path.write_text('\n'.join(MOCK_REPLAY_LINES) + '\n')
+        events = {'interval': ['time', 'slot'], 'pings': ['time', 'slot']}
+        match = MatchAnalyser(self.replay_path)
+        frames = match.get_match_data(events=events)
+
+        self.assertListEqual(list(frames), ['interval', 'pings'])
+        self.assertEqual(match.memory_usage, 0)
+        self.assertListEqual(frames['interval'].columns.tolist(), ['time', 'slot'])
+        self.assertGreater(match.memory_usage, 0)
+        self.assertIs(frames['interval'], match.get_match_data(events=events)['interval'])
+        with self.assertRaises(KeyError):
+            frames['gold']
+
+        # the cached partial parse has the columns of these events, but not the ones of a full parse
+        with mock.patch('replay_parsing.modules.match_analyser.ReplayScanner', side_effect=AssertionError):
+            self.assertEqual(len(MatchAnalyser(self.replay_path).get_match_data(events={'pings': ['slot']})), 2)
+            with self.assertRaises(AssertionError):
+                MatchAnalyser(self.replay_path).get_match_data()
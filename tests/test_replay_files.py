@@ -0,0 +1,39 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils.replay_files import open_replay, find_replay, get_replay_path, read_replay_tail, zstandard
+
+
+MOCK_LINES = [b'{"time":1,"type":"interval"}\n', b'{"time":2,"type":"epilogue"}\n']
+
+
+class ReplayFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+
+    def test_roundtrip(self):
+        compressions = ['none', 'gzip'] + (['zstd'] if zstandard is not None else [])
+        for match_id, compression in enumerate(compressions):
+            path = get_replay_path(self.folder.name, match_id, compression=compression)
+            with open_replay(path, 'wb') as file:
+                for line in MOCK_LINES:
+                    file.write(line)
+
+            self.assertEqual(find_replay(self.folder.name, match_id), path)
+            with open_replay(path) as file:
+                self.assertListEqual(list(file), MOCK_LINES)
+
+            self.assertEqual(read_replay_tail(path, size=len(MOCK_LINES[-1])), MOCK_LINES[-1])
+            if compression != 'none':
+                self.assertNotEqual(path.read_bytes(), b''.join(MOCK_LINES))
+
+
+    def test_no_replay(self):
+        self.assertIsNone(find_replay(self.folder.name, 1))
+        self.assertRaises(ValueError, get_replay_path, Path(self.folder.name), 1, 'bz2')
@@ -0,0 +1,123 @@
+import json
+import unittest
+
+from replay_parsing.modules.replay_lines import get_line_type, EVENT_TYPES, EVENT_SCHEMAS, LineDecoder
+from utils.json_decoder import msgspec
+
+
+MOCK_DATA_ONE = (
+    b'{"time":-89,"type":"interval","slot":0,"unit":"CDOTA_Unit_Hero_Axe","hero_id":2}\n',
+    b'interval',
+)
+
+MOCK_DATA_TWO = (
+    b'{"time":10,"type":"cosmetics","key":"{\\"type\\":\\"interval\\"}"}\n',
+    b'cosmetics',
+)
+
+MOCK_DATA_THREE = (
+    b'{"time": 600, "type": "DOTA_COMBATLOG_MODIFIER_ADD", "value": 0}\n',
+    b'DOTA_COMBATLOG_MODIFIER_ADD',
+)
+
+
+class ReplayLinesTest(unittest.TestCase):
+    def test_data_one(self):
+        line, line_type = MOCK_DATA_ONE
+        self.assertEqual(get_line_type(line), line_type)
+        self.assertIn(get_line_type(line), EVENT_TYPES)
+
+
+    def test_data_two(self):
+        line, line_type = MOCK_DATA_TWO
+        self.assertEqual(get_line_type(line), line_type)
+        self.assertNotIn(get_line_type(line), EVENT_TYPES)
+
+
+    def test_data_three(self):
+        line, line_type = MOCK_DATA_THREE
+        self.assertEqual(get_line_type(line), line_type)
+        self.assertNotIn(get_line_type(line), EVENT_TYPES)
+
+
+    def test_no_type(self):
+        self.assertIsNone(get_line_type(b'{"time":1}\n'))
+
+
+# a line of every schema, the extra fields are decoded only by the stdlib decoder
+MOCK_SCHEMA_LINES = {
+    b'interval': b'{"time":12,"type":"interval","slot":0,"unit":"CDOTA_Unit_Hero_Axe","hero_id":2,"gold":600,'
+                 b'"x":80.5,"stuns":1.2}',
+    b'pings': b'{"time":40,"type":"pings","slot":3,"key":0}',
+    b'obs': b'{"time":50,"type":"obs","slot":4,"ehandle":77,"x":120.0}',
+    b'sen_left': b'{"time":60,"type":"sen_left","ehandle":78,"entityleft":true,"attackername":"npc_dota_hero_lion",'
+                 b'"z":1}',
+    b'DOTA_COMBATLOG_DAMAGE': b'{"time":70,"type":"DOTA_COMBATLOG_DAMAGE","value":5,"attackername":"npc_dota_hero_axe",'
+                              b'"targetname":"npc_dota_hero_lion","attackerhero":true,"targethero":true,'
+                              b'"stun_duration":0.0}',
+    b'DOTA_COMBATLOG_GOLD': b'{"time":80,"type":"DOTA_COMBATLOG_GOLD","value":50,"targetname":"npc_dota_hero_lion",'
+                            b'"gold_reason":13,"slot":5}',
+}
+
+MOCK_SCHEMA_VALUES = {
+    b'interval': {'time': 12, 'type': 'interval', 'slot': 0, 'unit': 'CDOTA_Unit_Hero_Axe', 'hero_id': 2,
+                  'gold': 600.0, 'x': 80.5},
+    b'pings': {'time': 40, 'type': 'pings', 'slot': 3},
+    b'obs': {'time': 50, 'type': 'obs', 'slot': 4, 'ehandle': 77},
+    b'sen_left': {'time': 60, 'type': 'sen_left', 'ehandle': 78, 'entityleft': True,
+                  'attackername': 'npc_dota_hero_lion'},
+    b'DOTA_COMBATLOG_DAMAGE': {'time': 70, 'type': 'DOTA_COMBATLOG_DAMAGE', 'value': 5,
+                               'attackername': 'npc_dota_hero_axe', 'targetname': 'npc_dota_hero_lion',
+                               'attackerhero': True, 'targethero': True},
+    b'DOTA_COMBATLOG_GOLD': {'time': 80, 'type': 'DOTA_COMBATLOG_GOLD', 'value': 50,
+                             'targetname': 'npc_dota_hero_lion', 'gold_reason': 13},
+}
+
+# value of a combat log line doesn't fit the schema
+MOCK_UNEXPECTED_LINE = b'{"time":90,"type":"DOTA_COMBATLOG_XP","value":"12","targetname":"npc_dota_hero_axe"}'
+
+
+@unittest.skipIf(msgspec is None, "msgspec is not installed")
+class LineDecoderTest(unittest.TestCase):
+    def setUp(self):
+        self.decoder = LineDecoder('msgspec')
+
+
+    def test_schema_lines(self):
+        for line_type, line in MOCK_SCHEMA_LINES.items():
+            with self.subTest(line_type=line_type):
+                self.assertEqual(get_line_type(line), line_type)
+                self.assertDictEqual(self.decoder.decode(line, line_type), MOCK_SCHEMA_VALUES[line_type])
+
+
+    def test_every_event_type_has_schema(self):
+        self.assertSetEqual(set(EVENT_SCHEMAS), set(EVENT_TYPES))
+
+
+    def test_unexpected_shape_is_decoded_fully(self):
+        output = self.decoder.decode(MOCK_UNEXPECTED_LINE, b'DOTA_COMBATLOG_XP')
+
+        self.assertDictEqual(output, json.loads(MOCK_UNEXPECTED_LINE))
+
+
+    def test_unknown_type_is_decoded_fully(self):
+        line = b'{"time":10,"type":"DOTA_COMBATLOG_MODIFIER_ADD","value":0,"stack_count":2}'
+
+        self.assertDictEqual(self.decoder.decode(line, get_line_type(line)), json.loads(line))
+        self.assertDictEqual(self.decoder.decode(line), json.loads(line))
+
+
+    def test_malformed_line(self):
+        line = b'{"time":10,"type":"interval","slot":'
+
+        with self.assertRaises(msgspec.DecodeError):
+            self.decoder.decode(line, b'interval')
+
+
+    def test_stdlib_backend(self):
+        decoder = LineDecoder('json')
+        line = MOCK_SCHEMA_LINES[b'interval']
+
+        self.assertDictEqual(decoder.decode(line, b'interval'), json.loads(line))
+        with self.assertRaises(json.JSONDecodeError):
+            decoder.decode(b'{"time":', b'interval')
@@ -0,0 +1,176 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from replay_parsing.modules.event_buffers import EVENT_COLUMNS, NO_NAME, arrays_to_frame
+from replay_parsing.modules.match_analyser import get_event_columns
+from replay_parsing.processors import get_consumed_events, process_deward_windows, process_pings_windows
+from replay_parsing.modules.replay_scanner import ReplayScanner, merge_chunks, split_replay, _scan_chunk, \
+    check_memory_budget, MemoryBudgetException
+
+
+MOCK_LINES = [
+    '{"time":-89,"type":"interval","slot":0,"unit":"CDOTA_Unit_Hero_Axe","hero_id":2,"gold":0}',
+    '{"time":10,"type":"obs","slot":3,"ehandle":77}',
+    '{"time":11,"type":"DOTA_COMBATLOG_DAMAGE","value":5,"attackername":"npc_dota_hero_axe",'
+    '"targetname":"npc_dota_hero_lion","sourcename":"npc_dota_hero_axe","targetsourcename":"npc_dota_hero_lion",'
+    '"inflictor":"dota_unknown","attackerhero":true,"targethero":true}',
+    '{"time":12,"type":"interval","slot":0,"unit":"CDOTA_Unit_Hero_Axe","hero_id":2,"gold":100}',
+    '{"time":20,"type":"obs_left","ehandle":77,"entityleft":true,"attackername":"npc_dota_hero_lion"}',
+    '{"time":21,"type":"DOTA_COMBATLOG_GOLD","value":50,"targetname":"npc_dota_hero_lion","gold_reason":0}',
+    '{"time":30,"type":"DOTA_COMBATLOG_GOLD","value":0,"targetname":"npc_dota_hero_lion","gold_reason":5}',
+    '{"time":31,"type":"DOTA_COMBATLOG_GOLD","value":70,"targetname":"npc_dota_hero_lion","gold_reason":0}',
+    '{"time":32,"type":"interval","slot":5,"unit":"CDOTA_Unit_Hero_Lion","hero_id":26,"gold":300}',
+]
+
+# combat log lines without inflictor/sourcename/targetsourcename and without a value
+MOCK_SPARSE_LINES = [
+    '{"time":11,"type":"DOTA_COMBATLOG_DAMAGE","value":5,"attackername":"npc_dota_hero_axe",'
+    '"targetname":"npc_dota_hero_lion","targetsourcename":"npc_dota_hero_lion"}',
+    '{"time":12,"type":"DOTA_COMBATLOG_DAMAGE","attackername":"npc_dota_hero_axe","targetname":"npc_dota_hero_lion"}',
+    '{"time":13,"type":"DOTA_COMBATLOG_DAMAGE","value":7,"attackername":"npc_dota_hero_lion",'
+    '"targetname":"npc_dota_hero_axe","sourcename":"npc_dota_hero_lion","inflictor":"lion_impale"}',
+]
+
+# hits of the same units in one second are one row, damage between creeps isn't kept
+MOCK_DAMAGE_LINES = [
+    *['{"time":40,"type":"DOTA_COMBATLOG_DAMAGE","value":%d,"attackername":"npc_dota_hero_axe",'
+      '"targetname":"npc_dota_creep_badguys_melee","sourcename":"npc_dota_hero_axe",'
+      '"targetsourcename":"npc_dota_creep_badguys_melee","attackerhero":true}' % value for value in [10, 20, 30]],
+    '{"time":40,"type":"DOTA_COMBATLOG_DAMAGE","value":15,"attackername":"npc_dota_creep_goodguys_melee",'
+    '"targetname":"npc_dota_creep_badguys_melee","sourcename":"npc_dota_creep_goodguys_melee",'
+    '"targetsourcename":"npc_dota_creep_badguys_melee"}',
+    '{"time":41,"type":"DOTA_COMBATLOG_DAMAGE","value":40,"attackername":"npc_dota_hero_axe",'
+    '"targetname":"npc_dota_creep_badguys_melee","sourcename":"npc_dota_hero_axe",'
+    '"targetsourcename":"npc_dota_creep_badguys_melee","attackerhero":true}',
+    '{"time":41,"type":"DOTA_COMBATLOG_GOLD","value":40,"targetname":"npc_dota_hero_axe","gold_reason":13}',
+    '{"time":41,"type":"DOTA_COMBATLOG_GOLD","value":45,"targetname":"npc_dota_hero_axe","gold_reason":13}',
+]
+
+
+class ReplayScannerTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.replay_path = Path(self.folder.name) / '1.jsonl'
+        self.replay_path.write_text('\n'.join(MOCK_LINES) + '\n')
+
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+
+    def test_chunks_are_merged_as_one_pass(self):
+        scanner = ReplayScanner()
+        scanner.scan_file(self.replay_path)
+        expected = scanner.get_result()
+
+        for parts in [2, 4, len(MOCK_LINES)]:
+            chunks = [_scan_chunk(self.replay_path, start, end) for start, end in split_replay(self.replay_path, parts)]
+            result = merge_chunks(chunks)
+
+            self.assertDictEqual(result['heroes'], expected['heroes'])
+            for table_name, columns in EVENT_COLUMNS.items():
+                frame = arrays_to_frame(result['tables'][table_name], columns, result['name_table'])
+                expected_frame = arrays_to_frame(expected['tables'][table_name], columns, expected['name_table'])
+                self.assertTrue(frame.equals(expected_frame), table_name)
+
+
+    def test_ward_slot_and_gold_stop(self):
+        scanner = ReplayScanner()
+        scanner.scan_file(self.replay_path)
+        result = scanner.get_result()
+
+        self.assertListEqual(result['tables']['deward']['slot'].tolist(), [3])
+        self.assertListEqual(result['tables']['gold']['value'].tolist(), [50])
+        self.assertListEqual(sorted(result['heroes']), [0, 5])
+
+
+    def test_selected_columns(self):
+        columns = get_event_columns(get_consumed_events(process_deward_windows))
+        scanner = ReplayScanner(columns=columns)
+        scanner.scan_file(self.replay_path)
+        result = scanner.get_result()
+
+        self.assertListEqual(sorted(result['tables']), ['deward', 'interval'])
+        self.assertListEqual(list(result['tables']['deward']), ['time', 'slot', 'type', 'attackername'])
+        self.assertListEqual(result['tables']['deward']['slot'].tolist(), [3])
+        self.assertListEqual(result['tables']['interval']['time'].tolist(), [-89, 12])
+
+
+    def test_hero_names_of_selected_tables(self):
+        scanner = ReplayScanner()
+        scanner.scan_file(self.replay_path)
+        expected = scanner.get_result()['hero_npc_names']
+
+        columns = get_event_columns(get_consumed_events(process_pings_windows))
+        scanner = ReplayScanner(columns=columns)
+        scanner.scan_file(self.replay_path)
+        chunks = [_scan_chunk(self.replay_path, start, end, columns)
+                  for start, end in split_replay(self.replay_path, 4)]
+
+        self.assertListEqual(sorted(expected), ['npc_dota_hero_axe', 'npc_dota_hero_lion'])
+        self.assertListEqual(sorted(scanner.get_result()['hero_npc_names']), sorted(expected))
+        self.assertListEqual(sorted(merge_chunks(chunks, columns)['hero_npc_names']), sorted(expected))
+
+
+    def test_frame_dtypes(self):
+        scanner = ReplayScanner()
+        scanner.scan_file(self.replay_path)
+        result = scanner.get_result()
+        frame = arrays_to_frame(result['tables']['damage'], EVENT_COLUMNS['damage'], result['name_table'])
+
+        self.assertEqual(frame['time'].dtype, np.int32)
+        self.assertEqual(frame['attackerhero'].dtype, np.bool_)
+        self.assertEqual(frame['targetname'].dtype.name, 'category')
+        self.assertListEqual(frame['targetname'].tolist(), ['npc_dota_hero_lion'])
+
+
+    def test_sparse_lines(self):
+        self.replay_path.write_text('\n'.join(MOCK_SPARSE_LINES) + '\n')
+        scanner = ReplayScanner()
+        scanner.scan_file(self.replay_path)
+        expected = scanner.get_result()
+        damage = expected['tables']['damage']
+
+        self.assertListEqual(damage['value'].tolist(), [5, 7])
+        self.assertListEqual(expected['name_table'].decode(damage['sourcename']).tolist(),
+                             [None, 'npc_dota_hero_lion'])
+        self.assertListEqual(damage['targetsourcename'][1:].tolist(), [NO_NAME])
+        self.assertListEqual(expected['name_table'].decode(damage['inflictor']).tolist(), [None, 'lion_impale'])
+
+        frame = arrays_to_frame(damage, EVENT_COLUMNS['damage'], expected['name_table'])
+        self.assertListEqual(frame['inflictor'].isna().tolist(), [True, False])
+
+        chunks = [_scan_chunk(self.replay_path, start, end) for start, end in split_replay(self.replay_path, 3)]
+        result = merge_chunks(chunks)
+        self.assertTrue(arrays_to_frame(result['tables']['damage'], EVENT_COLUMNS['damage'],
+                                        result['name_table']).equals(frame))
+
+
+    def test_totals_by_second(self):
+        self.replay_path.write_text('\n'.join(MOCK_DAMAGE_LINES) + '\n')
+        scanner = ReplayScanner()
+        scanner.scan_file(self.replay_path)
+        tables = scanner.get_result()['tables']
+
+        self.assertListEqual(tables['damage']['time'].tolist(), [40, 41])
+        self.assertListEqual(tables['damage']['value'].tolist(), [60, 40])
+        self.assertListEqual(tables['damage']['count'].tolist(), [3, 1])
+        self.assertListEqual(tables['gold']['value'].tolist(), [85])
+        self.assertListEqual(tables['gold']['count'].tolist(), [2])
+        self.assertNotIn('npc_dota_creep_goodguys_melee', scanner.name_table.names)
+
+        # a second split between two chunks has a row in each of them
+        chunks = [_scan_chunk(self.replay_path, start, end) for start, end in split_replay(self.replay_path, 2)]
+        damage = merge_chunks(chunks)['tables']['damage']
+        self.assertEqual(damage['value'].sum(), 100)
+        self.assertEqual(damage['count'].sum(), 4)
+
+
+    def test_memory_budget(self):
+        check_memory_budget(100, None)
+        check_memory_budget(100, 100)
+        with self.assertRaises(MemoryBudgetException):
+            check_memory_budget(101, 100)
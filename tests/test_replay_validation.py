@@ -0,0 +1,78 @@
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+
+from replay_parsing.modules.match_analyser import MatchAnalyser
+from replay_parsing.modules.replay_cache import get_cache_path
+from replay_parsing.modules.replay_validation import validate_replay
+
+
+MOCK_HEROES = ['Axe', 'Lion', 'Lina', 'Sven', 'Tiny', 'Riki', 'Viper', 'Razor', 'Clinkz', 'Ursa']
+
+MOCK_EPILOGUE = '{"time":3,"type":"epilogue","key":"{}"}'
+
+
+def _get_lines(skip_slot: int | None = None) -> list:
+    lines = []
+    for time in range(3):
+        for slot, hero in enumerate(MOCK_HEROES):
+            if slot == skip_slot:
+                continue
+            lines.append(f'{{"time":{time},"type":"interval","slot":{slot},"unit":"CDOTA_Unit_Hero_{hero}",'
+                         f'"hero_id":{slot + 1},"gold":0}}')
+            lines.append(f'{{"time":{time},"type":"DOTA_COMBATLOG_GOLD","value":1,'
+                         f'"targetname":"npc_dota_hero_{hero.lower()}","gold_reason":13}}')
+    return lines
+
+
+class ReplayValidationTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.replay_path = Path(self.folder.name) / '1.jsonl'
+
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+
+    def _validate(self, lines: list) -> list:
+        self.replay_path.write_text('\n'.join(lines) + '\n')
+        return validate_replay(MatchAnalyser(self.replay_path, use_cache=False))
+
+
+    def test_valid_replay(self):
+        self.assertListEqual(self._validate(_get_lines() + [MOCK_EPILOGUE]), [])
+
+
+    def test_incomplete_replay(self):
+        self.assertListEqual(self._validate(_get_lines()), ["Replay doesn't end with the epilogue line"])
+
+
+    def test_missing_slot(self):
+        problems = self._validate(_get_lines(skip_slot=3) + [MOCK_EPILOGUE])
+
+        self.assertEqual(len(problems), 2)
+        self.assertIn('slot 3', problems[0])
+        self.assertIn('slot 3', problems[1])
+
+
+    def test_parse_is_cached(self):
+        self.replay_path.write_text('\n'.join(_get_lines() + [MOCK_EPILOGUE]) + '\n')
+        events = {'gold': ['value', 'targetslot', 'gold_reason']}
+        self.assertListEqual(validate_replay(MatchAnalyser(self.replay_path), events=events), [])
+        self.assertTrue(get_cache_path(self.replay_path).is_file())
+
+        # processing of the events loads the cache without scanning the replay
+        with mock.patch('replay_parsing.modules.match_analyser.ReplayScanner', side_effect=AssertionError):
+            gold = MatchAnalyser(self.replay_path).get_match_data(events=events)['gold']
+        self.assertEqual(gold['count'].sum(), 30)
+        self.assertEqual(gold['value'].sum(), 30)
+
+
+    def test_tail_is_checked_first(self):
+        self.replay_path.write_text('\n'.join(_get_lines()) + '\n')
+        match = MatchAnalyser(self.replay_path)
+        with mock.patch.object(match, 'get_match_data', side_effect=AssertionError):
+            self.assertListEqual(validate_replay(match), ["Replay doesn't end with the epilogue line"])
+        self.assertFalse(get_cache_path(self.replay_path).is_file())
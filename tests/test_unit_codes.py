@@ -0,0 +1,20 @@
+import unittest
+
+from replay_parsing.modules.unit_codes import get_name_codes, NO_SLOT, UNIT_HERO, UNIT_BUILDING, UNIT_CREEP, \
+    UNIT_ROSHAN, UNIT_OTHER
+
+
+MOCK_NAMES = ['npc_dota_hero_axe', 'npc_dota_goodguys_tower1_mid', 'npc_dota_creep_badguys_melee',
+              'npc_dota_roshan', 'npc_dota_hero_windranger', 'dota_unknown', 'npc_dota_badguys_fort']
+
+MOCK_NAME_TO_SLOT = {'npc_dota_hero_axe': 0, 'npc_dota_hero_windrunner': 7, 'npc_dota_hero_windranger': 7}
+
+
+class UnitCodesTest(unittest.TestCase):
+    def test_name_codes(self):
+        slots, categories = get_name_codes(MOCK_NAMES, MOCK_NAME_TO_SLOT)
+
+        # the last codes are of a missing name
+        self.assertListEqual(slots.tolist(), [0, NO_SLOT, NO_SLOT, NO_SLOT, 7, NO_SLOT, NO_SLOT, NO_SLOT])
+        self.assertListEqual(categories.tolist(), [UNIT_HERO, UNIT_BUILDING, UNIT_CREEP, UNIT_ROSHAN, UNIT_HERO,
+                                                   UNIT_OTHER, UNIT_BUILDING, UNIT_OTHER])
@@ -0,0 +1,72 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from replay_parsing.modules.match_analyser import MatchAnalyser
+from replay_parsing.modules.replay_cache import get_cache_path
+from tasks.proces_game_replay import PROCESSED_EVENTS
+from tasks.validate_game_replay import check_game_replay
+
+
+MOCK_HEROES = ['Axe', 'Lion', 'Lina', 'Sven', 'Tiny', 'Riki', 'Viper', 'Razor', 'Clinkz', 'Ursa']
+
+MOCK_LINES = [
+    *[f'{{"time":{time},"type":"interval","slot":{slot},"unit":"CDOTA_Unit_Hero_{hero}","hero_id":{slot + 1}}}'
+      for time in range(3) for slot, hero in enumerate(MOCK_HEROES)],
+    *[f'{{"time":2,"type":"DOTA_COMBATLOG_GOLD","value":1,"targetname":"npc_dota_hero_{hero.lower()}",'
+      f'"gold_reason":13}}' for hero in MOCK_HEROES],
+]
+
+MOCK_EPILOGUE = '{"time":3,"type":"epilogue","key":"{}"}'
+
+
+class CheckGameReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.match_folder = Path(self.folder.name) / '1'
+        self.match_folder.mkdir()
+        self.replay_path = self.match_folder / '1.jsonl'
+
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+
+    def _check(self, lines: list) -> tuple:
+        self.replay_path.write_text('\n'.join(lines) + '\n')
+        with mock.patch('tasks.validate_game_replay.BASE_REPLAY_PATH', self.folder.name), \
+                mock.patch('tasks.validate_game_replay.get_hero_name_index', return_value=None) as names, \
+                mock.patch('tasks.validate_game_replay.mark_game_broken') as mark_broken, \
+                mock.patch('tasks.validate_game_replay.load_json_file'), \
+                mock.patch('tasks.proces_game_replay.REPLAY_MEMORY_BUDGET_MB', 1), \
+                mock.patch('tasks.proces_game_replay.REPLAY_MEMORY_BUDGET_ACTION', 'fail'), \
+                mock.patch.object(MatchAnalyser, 'get_match_data', autospec=True,
+                                  side_effect=MatchAnalyser.get_match_data) as parse_mock:
+            problems = check_game_replay(None, 1)
+        return problems, names, mark_broken, parse_mock
+
+
+    def test_incomplete_replay_is_not_parsed(self):
+        problems, names, mark_broken, parse_mock = self._check(MOCK_LINES)
+
+        self.assertListEqual(problems, ["Replay doesn't end with the epilogue line"])
+        names.assert_not_called()
+        parse_mock.assert_not_called()
+        mark_broken.assert_called_once()
+        self.assertFalse(get_cache_path(self.replay_path).is_file())
+
+
+    def test_processed_events_are_parsed_with_the_budget(self):
+        problems, names, mark_broken, parse_mock = self._check(MOCK_LINES + [MOCK_EPILOGUE])
+
+        self.assertListEqual(problems, [])
+        mark_broken.assert_not_called()
+        match, events = parse_mock.call_args.args[0], parse_mock.call_args.kwargs['events']
+        self.assertEqual(match.memory_budget, 2 ** 20)
+        self.assertTrue(all(set(columns) <= set(events[table]) for table, columns in PROCESSED_EVENTS.items()))
+        self.assertTrue(get_cache_path(self.replay_path).is_file())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from replay_parsing.modules import MatchSplitter
+from replay_parsing.processors import process_wards_windows, process_deward_windows
+
+
+MOCK_WINDOWS = [
+    SimpleNamespace(name='l2', window_type='lane', exists=True, start_time=0, end_time=120, minutes=2),
+    SimpleNamespace(name='g15', window_type='game', exists=True, start_time=0, end_time=900, minutes=15),
+    SimpleNamespace(name='g30', window_type='game', exists=False, start_time=None, end_time=None, minutes=None),
+]
+
+# the type columns are categoricals of the name table
+MOCK_NAMES = ['npc_dota_hero_axe', 'obs', 'sen', 'obs_left', 'sen_left']
+
+MOCK_WARDS = pd.DataFrame({'time': [10, 20, 130, 50],
+                           'slot': [0, 0, 0, 3],
+                           'type': pd.Categorical(['obs', 'obs', 'sen', 'sen'], categories=MOCK_NAMES)})
+
+# a ward killed by slot 5, a ward of slot 0 killed by itself, a ward without a hero killer (-1 is not a slot)
+# and two wards of slot 1 killed by slot 6, one of them after l2
+MOCK_DEWARD = pd.DataFrame({'time': [30, 40, 60, 100, 200],
+                            'slot': [0, 0, 0, 1, 1],
+                            'attackerslot': [5, 0, -1, 6, 6],
+                            'type': pd.Categorical(['obs_left', 'obs_left', 'obs_left', 'sen_left', 'sen_left'],
+                                                   categories=MOCK_NAMES)})
+
+# values in l2 (2 minutes) and g15 (15 minutes)
+MOCK_EXPECTED_WARDS = {
+    (0, 'wards|placed_wards_obs'): [2, 2],
+    (0, 'wards|placed_wards_sen'): [0, 1],
+    (3, 'wards|placed_wards_sen'): [1, 1],
+}
+
+MOCK_EXPECTED_DEWARD = {
+    (0, 'wards|was_dewarded_obs'): [3, 3],
+    (0, 'wards|was_dewarded_perc_obs'): [2 / 3, 2 / 3],
+    (5, 'wards|killed_obs'): [1, 1],
+    (5, 'wards|killed_obs_pm'): [0.5, 1 / 15],
+    (0, 'wards|killed_obs'): [0, 0],
+    (1, 'wards|was_dewarded_sen'): [1, 2],
+    (1, 'wards|was_dewarded_perc_sen'): [1, 1],
+    (6, 'wards|killed_sen'): [1, 2],
+    (6, 'wards|killed_sen_pm'): [0.5, 2 / 15],
+    (6, 'wards|was_dewarded_sen'): [0, 0],
+}
+
+
+class WardsWindowsTest(unittest.TestCase):
+    def setUp(self):
+        self.MS = MatchSplitter(game_length=900, match_windows=MOCK_WINDOWS)
+
+
+    def _assert_values(self, cube, expected: dict):
+        windows = cube.get_window_positions([window.name for window in MOCK_WINDOWS])
+        for (slot, metric), values in expected.items():
+            position = cube.get_positions([metric])[0]
+            np.testing.assert_allclose(cube.values[slot, position, windows], [*values, np.nan], err_msg=metric)
+
+
+    def test_placed_wards(self):
+        self._assert_values(process_wards_windows(MOCK_WARDS.copy(), self.MS), MOCK_EXPECTED_WARDS)
+
+
+    def test_dewards(self):
+        cube = process_deward_windows(MOCK_DEWARD.copy(), self.MS)
+        self._assert_values(cube, MOCK_EXPECTED_DEWARD)
+        # the ward without a hero killer is not a kill of any slot
+        positions = cube.get_positions(['wards|killed_obs'])
+        windows = cube.get_window_positions(['l2', 'g15'])
+        self.assertEqual(np.nansum(cube.values[:, positions][..., windows]), 2)
+
+
+    def test_types_of_strings(self):
+        # the ward types of a frame without the name table categories
+        wards = MOCK_WARDS.assign(type=MOCK_WARDS['type'].astype(str))
+        np.testing.assert_array_equal(process_wards_windows(wards, self.MS).values,
+                                      process_wards_windows(MOCK_WARDS.copy(), self.MS).values)
+
+
+if __name__ == '__main__':
+    unittest.main()
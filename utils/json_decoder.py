@@ -0,0 +1,60 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable
+
+from dotenv import load_dotenv
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+load_dotenv()
+
+# auto / msgspec / orjson / json. Auto picks the fastest installed backend
+JSON_DECODER = os.getenv('JSON_DECODER', default='auto') or 'auto'
+
+BACKENDS_ORDER = ['msgspec', 'orjson', 'json']
+
+
+def get_available_backends() -> list[str]:
+    available = {
+        'msgspec': msgspec is not None,
+        'orjson': orjson is not None,
+        'json': True,
+    }
+    return [name for name in BACKENDS_ORDER if available[name]]
+
+
+def get_backend(name: str = JSON_DECODER) -> str:
+    available_backends = get_available_backends()
+    if name == 'auto':
+        return available_backends[0]
+
+    if name not in available_backends:
+        raise ValueError(f"JSON decoder {name} is not available. Available decoders: {available_backends}")
+    return name
+
+
+def get_loads(backend: str) -> Callable[[bytes | str], Any]:
+    if backend == 'msgspec':
+        return msgspec.json.decode
+    elif backend == 'orjson':
+        return orjson.loads
+    return json.loads
+
+
+JSON_BACKEND = get_backend()
+loads = get_loads(JSON_BACKEND)
+
+
+def load_json_file(path: str | Path) -> Any:
+    with open(path, 'rb') as file:
+        return loads(file.read())
@@ -0,0 +1,45 @@
+import os
+
+from dotenv import load_dotenv
+
+try:
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
+
+
+load_dotenv()
+
+# port of the prometheus endpoint of a celery worker. Metrics are not exported if it's empty
+METRICS_PORT = os.getenv('METRICS_PORT', default='')
+
+
+class _NoMetric:
+    """Used when prometheus_client is not installed"""
+    def labels(self, *args, **kwargs) -> '_NoMetric':
+        return self
+
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+
+    def observe(self, amount: float) -> None:
+        pass
+
+
+if prometheus_client is not None:
+    HERO_NAMES_COUNTER = prometheus_client.Counter('replay_hero_names',
+                                                   'Npc hero names of replays by the way they were resolved',
+                                                   ['resolution'])
+    PROCESSOR_SECONDS = prometheus_client.Histogram('replay_processor_seconds',
+                                                    'Time of the replay processors of a match',
+                                                    ['processor'])
+else:
+    HERO_NAMES_COUNTER = _NoMetric()
+    PROCESSOR_SECONDS = _NoMetric()
+
+
+def start_metrics_server() -> None:
+    if METRICS_PORT and prometheus_client is not None:
+        prometheus_client.start_http_server(int(METRICS_PORT))
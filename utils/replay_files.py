@@ -0,0 +1,93 @@
+import gzip
+import io
+import os
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from dotenv import load_dotenv
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+load_dotenv()
+
+# none / gzip / zstd. Compression of the new replay files, existing files are read in any format
+REPLAY_COMPRESSION = os.getenv('REPLAY_COMPRESSION', default='none') or 'none'
+REPLAY_COMPRESSION_LEVEL = int(os.getenv('REPLAY_COMPRESSION_LEVEL', default='3') or 3)
+
+# bytes read from the end of a replay to check its last lines
+REPLAY_TAIL_SIZE = 2 ** 20
+
+# errors of damaged (e.g. partially written) compressed files
+REPLAY_READ_ERRORS = (OSError, EOFError) + ((zstandard.ZstdError, ) if zstandard is not None else ())
+
+COMPRESSION_SUFFIXES = {
+    'none': '',
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+
+def get_compression(path: str | Path) -> str:
+    suffix = Path(path).suffix
+    for compression, compression_suffix in COMPRESSION_SUFFIXES.items():
+        if compression_suffix and suffix == compression_suffix:
+            return compression
+    return 'none'
+
+
+def _check_compression(compression: str) -> None:
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown replay compression {compression}. Available: {list(COMPRESSION_SUFFIXES)}")
+    if compression == 'zstd' and zstandard is None:
+        raise ValueError("zstandard is not installed")
+
+
+def get_replay_path(folder: str | Path, match_id: int, compression: str = REPLAY_COMPRESSION) -> Path:
+    """Path of a new replay file"""
+    _check_compression(compression)
+    return Path(folder) / f'{match_id}.jsonl{COMPRESSION_SUFFIXES[compression]}'
+
+
+def find_replay(folder: str | Path, match_id: int) -> Optional[Path]:
+    """Existing replay file of a match in any format. The configured format is checked first"""
+    compressions = [REPLAY_COMPRESSION] + [x for x in COMPRESSION_SUFFIXES if x != REPLAY_COMPRESSION]
+    for compression in compressions:
+        path = Path(folder) / f'{match_id}.jsonl{COMPRESSION_SUFFIXES[compression]}'
+        if path.is_file():
+            return path
+    return None
+
+
+def open_replay(path: str | Path, mode: str = 'rb', level: int = REPLAY_COMPRESSION_LEVEL) -> BinaryIO:
+    """Open a replay in binary mode ('rb' / 'wb'). The file is (de)compressed on the fly based on its suffix"""
+    compression = get_compression(path)
+    _check_compression(compression)
+
+    if compression == 'gzip':
+        return gzip.open(path, mode, compresslevel=level)
+
+    if compression == 'zstd':
+        file = open(path, mode)
+        if mode == 'rb':
+            return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(file, closefd=True))
+        return zstandard.ZstdCompressor(level=level).stream_writer(file, closefd=True)
+
+    return open(path, mode)
+
+
+def read_replay_tail(path: str | Path, size: int = REPLAY_TAIL_SIZE) -> bytes:
+    """Last size bytes of the replay data. Compressed replays can't be read from the end, so they are streamed"""
+    if get_compression(path) == 'none':
+        with open(path, 'rb') as file:
+            file.seek(max(os.path.getsize(path) - size, 0))
+            return file.read()
+
+    tail = b''
+    with open_replay(path) as file:
+        for chunk in iter(lambda: file.read(size), b''):
+            tail = (tail + chunk)[-size:]
+    return tail